@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Extracts the MdLs of a range of terms without the interactive menu.
+Terms are fetched, parsed and extracted in parallel by a pool of processes,
+the wards of all MdLs are resolved at once and every term is written to the
+MdL store in one transaction.
+
+    python batch_extract.py --terms 14-17
+    python batch_extract.py --terms 17 --workers 0 --profile cprofile
+
+A summary of timers and counters (see scraper_lib/_instrument.py) is printed
+at the end; --profile runs everything under cProfile or pyinstrument, which
+only sees the worker processes if --workers is 0.
+Exits with status 1 if any term failed.
+'''
+
+import sys
+import time
+import argparse
+
+
+def _parse_terms(text) -> list:
+    '''
+    '14-17' -> [14, 15, 16, 17], '14,16' -> [14, 16]
+    Raises argparse.ArgumentTypeError for anything else, so it can be used
+    as the type of an argument.
+    '''
+    terms = list()
+    try:
+        for part in text.split(','):
+            if '-' in part:
+                first, last = part.split('-')
+                terms.extend(range(int(first), int(last) + 1))
+            elif part.strip():
+                terms.append(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid terms '{text}', expected e.g. '14-17' or '14,16'")
+    if not terms:
+        raise argparse.ArgumentTypeError(f"no terms in '{text}'")
+    return terms
+
+
+def _extract_term(legislature) -> tuple:
+    '''
+    Runs in a worker process.
+    Returns legislature, the MdLs packed as MdL_records (see
+    scraper_lib/_record_codec.py, None if failed) and a dict with the
+    timings, the count of table rows or the error and the worker's
+    instruments.
+    '''
+    from extract_mdl_wiki import Collector_MdLs, NoNameException,\
+        NoPartyException
+    from person import MdL_record
+    from scraper_lib._record_codec import packb
+    from scraper_lib._instrument import _get_instruments
+
+    instruments = _get_instruments()
+    before = instruments.snapshot()
+    report = dict()
+    try:
+        start = time.perf_counter()
+        collector = Collector_MdLs(str(legislature))
+        func_dict = collector._create_dict()
+        if collector.legislature not in func_dict:
+            raise KeyError(f'No extractor for term {legislature}')
+        tables = collector.collect_tables()
+        report['parse'] = time.perf_counter() - start
+        report['rows'] = sum(len(table) for table in tables.values())
+
+        start = time.perf_counter()
+        extract_tables = func_dict[collector.legislature]
+        # records are sent back to the parent process column by column
+        packed = packb(MdL_record.from_mdl(mdl)
+                       for mdl in extract_tables(collector, tables))
+        report['extract'] = time.perf_counter() - start
+    except (Exception, NoNameException, NoPartyException) as e:
+        report['error'] = repr(e)
+        packed = None
+    report['instruments'] = instruments.since(before)
+
+    return legislature, packed, report
+
+
+def _reports(terms, workers):
+    '''
+    Yields the results of _extract_term for all terms, computed by a pool of
+    processes or, with workers=0, one after the other in this process.
+    '''
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    if workers == 0:
+        for term in terms:
+            yield _extract_term(term)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_extract_term, term): term for term in terms}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as e:
+                # a worker died, the terms not done by then have failed
+                yield futures[future], None, {
+                    'error': repr(e),
+                    'instruments': {'counters': {}, 'timers': {}}}
+
+
+def run(terms, workers=None, wards=True) -> int:
+    '''
+    Returns the number of terms that failed.
+    '''
+    from scraper_lib._mdl_store import MdL_Store
+    from scraper_lib._ward_resolver import _normalize_ward
+    from person import enrich
+    from scraper_lib._record_codec import unpackb
+    from scraper_lib._instrument import _get_instruments
+
+    instruments = _get_instruments()
+    failed = 0
+    with MdL_Store() as store:
+        for legislature, packed, report in _reports(terms, workers):
+            if workers != 0:
+                instruments.merge(report['instruments'])
+            mdls = unpackb(packed) if packed is not None else None
+            if mdls is None:
+                print(f'term {legislature}: failed, '
+                      f'{report.get("error", "records not readable")}')
+                failed += 1
+                continue
+
+            start = time.perf_counter()
+            # the store is keyed by the normalized ward with or without
+            # the ward details
+            for mdl in mdls:
+                mdl.electoral_ward = _normalize_ward(mdl.electoral_ward,
+                                                     mdl.last_name)
+            if wards:
+                enrich(mdls)
+            report['wards'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            count = store.write_term(legislature, mdls)
+            report['store'] = time.perf_counter() - start
+
+            print(f'term {legislature}: {report["rows"]} rows, {count} MdLs, '
+                  f'parse {report["parse"]:.2f}s, '
+                  f'extract {report["extract"]:.2f}s, '
+                  f'wards {report["wards"]:.2f}s, '
+                  f'store {report["store"]:.2f}s')
+
+    return failed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Extract MdLs of several terms into the MdL store.')
+    parser.add_argument('--terms', type=_parse_terms, default='14-17',
+                        help="terms to extract, e.g. '14-17' or '14,16'")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes, 0 for none')
+    parser.add_argument('--no-wards', action='store_true',
+                        help="don't look up ward_no and voter_count")
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'],
+                        default=None, help='run under a profiler')
+    args = parser.parse_args(argv)
+
+    from scraper_lib._instrument import _get_instruments, _profiled
+
+    start = time.perf_counter()
+    with _profiled(args.profile):
+        failed = run(args.terms, args.workers,
+                     wards=not args.no_wards)
+    print(f'done in {time.perf_counter() - start:.2f}s, {failed} failed')
+    print(_get_instruments().summary())
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
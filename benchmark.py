@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Benchmarks of the extraction hot paths over the frozen pages in ./fixtures/
+(lists of MdLs of terms 14 - 17 and a few Landtagswahlkreis pages). Nothing
+is downloaded: the fixtures are loaded into a temporary page cache that is
+used offline.
+
+    python benchmark.py                 run and compare to the baseline
+    python benchmark.py --save          run and save results as baseline
+    python benchmark.py --check         exit with 1 if anything regressed
+
+Every benchmark reports operations per second (an operation being a page,
+a name, an MdL, ... as named in parentheses) and the peak of memory
+allocated by python objects during one run.
+'''
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+FIXTURE_LOC = './fixtures/'
+BASELINE_LOC = './benchmark_baseline.json'
+URL_BASE = 'https://de.wikipedia.org/wiki/'
+TERMS = ['14', '15', '16', '17']
+
+
+def _measure(func, repeat) -> tuple:
+    '''
+    Returns the best time out of repeat runs of func, the result of the
+    last run and the peak of memory allocated by python objects during one
+    more run.
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, result, peak
+
+
+def _load_fixtures(cache_dir):
+    '''
+    Stores all fixture pages in a page cache in cache_dir and makes it the
+    process' shared cache, offline.
+    '''
+    from scraper_lib import _page_cache
+
+    cache = _page_cache.PageCache(cache_dir, offline=True)
+    for file_name in sorted(os.listdir(FIXTURE_LOC)):
+        if file_name.endswith('.html'):
+            with open(FIXTURE_LOC + file_name, 'rb') as fin:
+                cache.put(URL_BASE + file_name[:-len('.html')], fin.read())
+    _page_cache._PAGE_CACHE['./data/page_cache/'] = cache
+    return cache
+
+
+def _bench_pages(repeat) -> dict:
+    from extract_mdl_wiki import Collector_MdLs
+
+    results = dict()
+    for term in TERMS:
+        collector = Collector_MdLs(term)
+        for parser in ['soup', 'iterparse']:
+            results[f'collect_tables[{parser}] term {term}'] = _measure(
+                lambda: collector.collect_tables(parser=parser,
+                                                 use_cache=False) and 1,
+                repeat)
+
+        tables = collector.collect_tables()
+        extract_tables = collector._create_dict()[term]
+        results[f'extract_tables term {term} (MdLs)'] = _measure(
+            lambda: len(list(extract_tables(collector, tables))), repeat)
+
+    return results
+
+
+def _bench_names(repeat) -> dict:
+    from extract_mdl_wiki import Collector_MdLs
+    from scraper_lib._name_parser import _get_name_parser
+    from scraper_lib.list_of_peertitles import peertitles
+
+    collector = Collector_MdLs('17')
+    tables = collector.collect_tables()
+    names = [row[1]['text'] for table in tables.values() for row in table
+             if len(row) > 4]
+    wards = [row[4]['text'] for table in tables.values() for row in table
+             if len(row) > 4]
+    parser = _get_name_parser(peertitles)
+
+    def parse_cold():
+        parser.cache.clear()
+        for name in names:
+            collector._extract_names(name)
+        return len(names)
+
+    def parse_warm():
+        for name in names:
+            collector._extract_names(name)
+        return len(names)
+
+    def electoral_wards():
+        for ward in wards:
+            collector.mk_electoral_ward(collector.CITIES, ward)
+        return len(wards)
+
+    return {'_extract_names cold (names)': _measure(parse_cold, repeat),
+            '_extract_names memoized (names)': _measure(parse_warm, repeat),
+            'mk_electoral_ward (wards)': _measure(electoral_wards, repeat)}
+
+
+def _bench_mdls(repeat, work_dir) -> dict:
+    import shelve
+    import pickle
+    from person import MdL, MdL_record
+    from scraper_lib._record_codec import packb, unpackb
+    from extract_mdl_wiki import Collector_MdLs
+    from scraper_lib._mdl_store import MdL_Store, _mdl_key
+
+    collector = Collector_MdLs('17')
+    tables = collector.collect_tables()
+    mdls = list(collector.extract_tables_16(tables))
+    fields = [(mdl.legislature, mdl.first_name, mdl.last_name,
+               mdl.middle_name_1, mdl.middle_name_2, mdl.electoral_ward,
+               mdl.party, mdl.peer_preposition, mdl.peer_title)
+              for mdl in mdls]
+
+    def construct():
+        for legislature, first_name, last_name, middle_name_1,\
+                middle_name_2, electoral_ward, party, peer_preposition,\
+                peer_title in fields:
+            MdL(legislature, first_name, last_name, middle_name_1,
+                middle_name_2, electoral_ward=electoral_ward, party=party,
+                peer_preposition=peer_preposition, peer_title=peer_title)
+        return len(fields)
+
+    def persist_shelve():
+        with shelve.open(os.path.join(work_dir, 'shelve_17')) as db:
+            for mdl in mdls:
+                db[_mdl_key(mdl)] = mdl
+        return len(mdls)
+
+    def persist_store():
+        with MdL_Store(os.path.join(work_dir, 'mdls.db')) as store:
+            return store.write_term('17', mdls)
+
+    records = [MdL_record.from_mdl(mdl) for mdl in mdls]
+    pickled = pickle.dumps(mdls)
+    packed = packb(records)
+
+    def load_pickle():
+        return len(pickle.loads(pickled))
+
+    def load_records():
+        return len(unpackb(packed))
+
+    return {'MdL construction (MdLs)': _measure(construct, repeat),
+            'MdL_record from_mdl (MdLs)': _measure(
+                lambda: len([MdL_record.from_mdl(mdl) for mdl in mdls]),
+                repeat),
+            'shelve persistence (MdLs)': _measure(persist_shelve, repeat),
+            'store write_term (MdLs)': _measure(persist_store, repeat),
+            'pickle loads (MdLs)': _measure(load_pickle, repeat),
+            'record unpackb (MdLs)': _measure(load_records, repeat)}
+
+
+def _bench_wards(repeat) -> dict:
+    from scraper_lib._page_cache import _get_page_cache
+    from scraper_lib._ward_resolver import _parse_ward_details
+
+    cache = _get_page_cache()
+    pages = [cache.text(URL) for URL in cache.urls()
+             if 'Landtagswahlkreis_' in URL]
+
+    def parse():
+        for text in pages:
+            _parse_ward_details(text)
+        return len(pages)
+
+    return {'ward details (pages)': _measure(parse, repeat)}
+
+
+def run(repeat=5) -> dict:
+    '''
+    Runs all benchmarks. Returns a dict name -> {'ops_per_sec', 'peak_bytes'}.
+    '''
+    results = dict()
+    with tempfile.TemporaryDirectory() as work_dir:
+        _load_fixtures(os.path.join(work_dir, 'page_cache') + '/')
+        measured = dict()
+        measured.update(_bench_pages(repeat))
+        measured.update(_bench_names(repeat))
+        measured.update(_bench_mdls(repeat, work_dir))
+        measured.update(_bench_wards(repeat))
+    for name, (seconds, ops, peak) in measured.items():
+        results[name] = {'ops_per_sec': ops / seconds, 'peak_bytes': peak}
+    return results
+
+
+def compare(results, baseline, tolerance=0.25) -> list:
+    '''
+    Prints results next to baseline. Returns the names of benchmarks that
+    are more than tolerance slower than their baseline.
+    '''
+    regressions = list()
+    for name, result in results.items():
+        line = (f'{name:<45} {result["ops_per_sec"]:12.1f} ops/s '
+                f'{result["peak_bytes"] / 2**20:8.2f} MiB')
+        if name in baseline:
+            ratio = result['ops_per_sec'] / baseline[name]['ops_per_sec']
+            line += f'   {ratio:6.2f}x baseline'
+            if ratio < 1 - tolerance:
+                line += '   REGRESSION'
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark extraction over the fixture pages.')
+    parser.add_argument('--save', action='store_true',
+                        help=f'save the results as baseline ({BASELINE_LOC})')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 if a benchmark regressed')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    baseline = dict()
+    if os.path.isfile(BASELINE_LOC):
+        with open(BASELINE_LOC, 'r', encoding='utf-8') as fin:
+            baseline = json.load(fin)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(BASELINE_LOC, 'w', encoding='utf-8') as fout:
+            json.dump(results, fout, indent=2, sort_keys=True)
+        print(f'Saved baseline to {BASELINE_LOC}')
+    if args.check and regressions:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Exports the MdLs, their electoral wards and the contributions of the
+plenary protocols from the MdL store to Parquet files, one directory per
+legislature (hive partitioning), so they can be scanned by pyarrow,
+pandas, polars or duckdb without unpickling anything:
+
+    ./data/parquet/mdls/legislature=17/part-0.parquet
+    ./data/parquet/wards/legislature=17/part-0.parquet
+    ./data/parquet/contributions/legislature=17/part-0.parquet
+
+    python export_parquet.py
+    python export_parquet.py --terms 14-17 --only mdls,wards
+
+Party, electoral ward and the other columns with few distinct values are
+dictionary encoded. Contributions are written batch by batch, a term is
+never held in memory at once. Exporting a term again replaces its files.
+Needs pyarrow (pip install pyarrow).
+'''
+
+import os
+import sys
+import json
+import time
+import argparse
+
+PARQUET_LOC = './data/parquet/'
+DATASETS = ['mdls', 'wards', 'contributions']
+BATCH_SIZE = 10000
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _schemas(pa) -> dict:
+    '''Columns of every dataset, legislature is in the directory name.'''
+    text = pa.string()
+    category = pa.dictionary(pa.int32(), pa.string())
+    return {
+        'mdls': pa.schema([
+            ('key', text), ('person_id', pa.int64()),
+            ('first_name', text), ('last_name', text),
+            ('middle_name_1', text), ('middle_name_2', text),
+            ('maiden_name', text), ('peer_title', category),
+            ('peer_preposition', category), ('academic_title', category),
+            ('gender', category), ('electoral_ward', category),
+            ('ward_no', pa.int32()), ('voter_count', pa.int64()),
+            ('minister', text), ('party', category),
+            ('parties', pa.list_(text)), ('offices', pa.list_(text)),
+            ('parl_pres', pa.bool_()), ('parl_vicePres', pa.bool_())]),
+        'wards': pa.schema([
+            ('electoral_ward', category), ('ward_no', pa.int32()),
+            ('voter_count', pa.int64()), ('mdls', pa.int32())]),
+        'contributions': pa.schema([
+            ('contri_id', pa.int64()), ('protocol_nr', category),
+            ('session_no', pa.int32()), ('cal_date', pa.date32()),
+            ('seq', pa.int32()), ('sub_seq', pa.int32()),
+            ('topic', text), ('speaker', category), ('key', category),
+            ('last_name', category), ('first_name', category),
+            ('academic_title', category), ('peer_title', category),
+            ('peer_preposition', category), ('party', category),
+            ('office', category), ('type_of_contri', category),
+            ('page_from', text), ('page_to', text), ('pages', text),
+            ('URL_salt', category), ('content', pa.large_string())]),
+    }
+
+
+def _date(cal_date):
+    '''dd.mm.yyyy -> datetime.date, None if there is none.'''
+    import datetime
+
+    try:
+        day, month, year = cal_date.split('.')
+        return datetime.date(int(year), int(month), int(day))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _mdl_rows(store, legislature):
+    from scraper_lib._mdl_store import COLUMNS
+
+    columns = [column for column in COLUMNS if column != 'legislature']
+    for row in store.conn.execute(
+            f'SELECT {", ".join(columns)}, person_id FROM mdls '
+            'WHERE legislature = ? ORDER BY rowid', (int(legislature),)):
+        row = dict(row)
+        row['parties'] = json.loads(row['parties'])
+        row['offices'] = json.loads(row['offices'])
+        row['parl_pres'] = bool(row['parl_pres'])
+        row['parl_vicePres'] = bool(row['parl_vicePres'])
+        yield row
+
+
+def _ward_rows(store, legislature):
+    from scraper_lib._ward_resolver import NO_WARD
+
+    for row in store.conn.execute(
+            'SELECT electoral_ward, MAX(ward_no) AS ward_no, '
+            'MAX(voter_count) AS voter_count, COUNT(*) AS mdls FROM mdls '
+            'WHERE legislature = ? AND electoral_ward IS NOT NULL '
+            f'AND electoral_ward NOT IN ({", ".join("?" for _ in NO_WARD)}) '
+            'GROUP BY electoral_ward ORDER BY electoral_ward',
+            [int(legislature)] + NO_WARD):
+        yield dict(row)
+
+
+def _contribution_rows(store, legislature):
+    cursor = store.conn.cursor()
+    cursor.execute(
+        'SELECT c.contri_id, c.protocol_nr, c.session_no, c.cal_date, c.seq,'
+        ' c.sub_seq, s.topic, c.speaker, c.key, c.last_name, c.first_name, '
+        'c.academic_title, c.peer_title, c.peer_preposition, c.party, '
+        'c.office, c.type_of_contri, c.page_from, c.page_to, c.pages, '
+        'c.URL_salt, c.content FROM contributions c '
+        'LEFT JOIN session_subs s '
+        'ON s.protocol_nr = c.protocol_nr AND s.seq = c.sub_seq '
+        'WHERE c.legislature = ? ORDER BY c.session_no, c.seq',
+        (int(legislature),))
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            row = dict(row)
+            row['cal_date'] = _date(row['cal_date'])
+            yield row
+
+
+ROWS = {'mdls': _mdl_rows, 'wards': _ward_rows,
+        'contributions': _contribution_rows}
+
+
+def _batches(rows, size):
+    batch = list()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = list()
+    if batch:
+        yield batch
+
+
+def export_term(store, dataset, legislature, out_dir=PARQUET_LOC,
+                compression='zstd') -> int:
+    '''
+    Writes a dataset of a term to out_dir/dataset/legislature=N/, replacing
+    what was there. Returns the number of rows written, nothing is written
+    for none.
+    '''
+    pa = _pyarrow()
+    schema = _schemas(pa)[dataset]
+    part_dir = os.path.join(out_dir, dataset, f'legislature={legislature}')
+    file_loc = os.path.join(part_dir, 'part-0.parquet')
+
+    count = 0
+    writer = None
+    try:
+        for batch in _batches(ROWS[dataset](store, legislature), BATCH_SIZE):
+            if writer is None:
+                os.makedirs(part_dir, exist_ok=True)
+                # dictionary pages for the categorical columns only
+                writer = pa.parquet.ParquetWriter(
+                    file_loc + '.part', schema, compression=compression,
+                    use_dictionary=[field.name for field in schema
+                                    if pa.types.is_dictionary(field.type)])
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if os.path.isdir(part_dir):
+        for file_name in os.listdir(part_dir):
+            if file_name.endswith('.parquet'):
+                os.remove(os.path.join(part_dir, file_name))
+        if count:
+            os.replace(file_loc + '.part', file_loc)
+        elif not os.listdir(part_dir):
+            os.rmdir(part_dir)
+
+    return count
+
+
+def _terms(store) -> list:
+    return [row[0] for row in store.conn.execute(
+        'SELECT legislature FROM mdls UNION '
+        'SELECT legislature FROM contributions ORDER BY legislature')]
+
+
+def run(terms=None, datasets=DATASETS, out_dir=PARQUET_LOC,
+        compression='zstd') -> int:
+    '''
+    Exports datasets of terms (None for all terms in the store).
+    Returns the number of rows written.
+    '''
+    from scraper_lib._mdl_store import MdL_Store
+
+    total = 0
+    with MdL_Store() as store:
+        for legislature in terms or _terms(store):
+            counts = list()
+            for dataset in datasets:
+                start = time.perf_counter()
+                count = export_term(store, dataset, legislature, out_dir,
+                                    compression)
+                counts.append(f'{count} {dataset} '
+                              f'({time.perf_counter() - start:.2f}s)')
+                total += count
+            print(f'term {legislature}: ' + ', '.join(counts))
+
+    return total
+
+
+def main(argv=None) -> int:
+    from batch_extract import _parse_terms
+
+    parser = argparse.ArgumentParser(
+        description='Export MdLs, wards and contributions to Parquet.')
+    parser.add_argument('--terms', type=_parse_terms, default=None,
+                        help="terms to export, e.g. '14-17', default all")
+    parser.add_argument('--only', default=','.join(DATASETS),
+                        help='datasets to export, e.g. mdls,wards')
+    parser.add_argument('--out', default=PARQUET_LOC)
+    parser.add_argument('--compression', default='zstd',
+                        choices=['zstd', 'snappy', 'gzip', 'none'])
+    args = parser.parse_args(argv)
+
+    if _pyarrow() is None:
+        print('The Parquet export needs pyarrow: pip install pyarrow')
+        return 1
+    datasets = [dataset for dataset in args.only.split(',') if dataset]
+    unknown = set(datasets) - set(DATASETS)
+    if unknown:
+        print(f'Unknown datasets {", ".join(sorted(unknown))}, choose from '
+              f'{", ".join(DATASETS)}')
+        return 1
+
+    start = time.perf_counter()
+    total = run(args.terms, datasets, args.out, args.compression)
+    print(f'{total} rows in {time.perf_counter() - start:.2f}s to {args.out}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,22 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import re
 import string
 from bs4 import BeautifulSoup
 from scraper_lib.ask_for_wahlperiode import ask_for_wahlperiode
-from scraper_lib._extract_staedte import _make_list_of_cities
+from scraper_lib._extract_staedte import _get_gazetteer
 from scraper_lib.list_of_peertitles import peertitles
-from scraper_lib._extract_vornamen import _get_vornamenListe
-from person import MdL
+from scraper_lib._extract_vornamen import _get_vornamen_index
+from scraper_lib._name_parser import _get_name_parser
+from scraper_lib._instrument import _get_instruments
+from person import MdL, enrich
+
+# stored with the tables in the page cache; raise it whenever _table_rows
+# or the table search change what is extracted from a page
+TABLES_VERSION = 1
+# the number a ward's name ends with: "Soest III"
+WARD_NO = re.compile(r'\s[IVX]+$')
 
 
 class NoNameException(BaseException):
@@ -23,9 +32,10 @@ class Collector_MdLs:
         self.legislature = legislature
         self.parties = ['CDU', 'SPD', 'FDP', 'Grüne', 'PIRATEN', 'AfD',
                         'GRÜNE', 'Linke']
-        self.CITIES = _make_list_of_cities()
+        self.CITIES = _get_gazetteer()
 
-    def collect_tables(self) -> dict:
+    def collect_tables(self, parser='iterparse', use_cache=True,
+                       bsObj=None) -> dict:
         '''
         Note: The layout of the wikipedia pages changed inbetween and I tried
         to parse the new content, however I still used the .soup objects I had
@@ -37,92 +47,213 @@ class Collector_MdLs:
         latest change seems to have been motivated by standardizing the topic's
         appearance, so terms 14 - 17 look similar now and a lot of code can be
         spared.
+
+        The tables are returned as lists of rows, each row a list of cells
+        (see _table_rows). They are stored next to the cached page, so as long
+        as the page is unchanged the html doesn't have to be parsed again.
+        With parser='iterparse' the page is streamed through lxml and only the
+        two tables are built (see _stream_tables), parser='soup' builds the
+        whole document with BeautifulSoup.
+        bsObj is the page's html if it has been read already.
         '''
-        bsObj = self._get_bsObj()
+        from scraper_lib._page_cache import _get_page_cache
+
+        instruments = _get_instruments()
+        cache = _get_page_cache()
+        URL = self._get_URL()
+        if bsObj is None:
+            bsObj = self._get_bsObj()
+        if bsObj is None:
+            return dict()
+        if use_cache:
+            tables = cache.tables(URL, TABLES_VERSION)
+            if tables is not None:
+                instruments.count('tables from cache')
+                return tables
+
+        with instruments.timer(f'collect_tables [{parser}]'):
+            if parser == 'soup':
+                tables = self._soup_tables(bsObj)
+            else:
+                tables = self._stream_tables(bsObj)
+        instruments.count('rows parsed',
+                          sum(len(table) for table in tables.values()))
+
+        cache.store_tables(URL, tables, TABLES_VERSION)
+        return tables
+
+    def _soup_tables(self, bsObj) -> dict:
         soup = BeautifulSoup(bsObj, 'lxml')
         tables = dict()
         for h2 in soup.find_all('h2'):
             try:
                 if 'Ausgeschiedene' in h2.text:
                     table = h2.find_next('table')
-                    tables['Ausgeschiedene Abgeordnete'] = table
+                    tables['Ausgeschiedene Abgeordnete'] =\
+                        self._table_rows(table)
                 elif 'Abgeordnete' in h2.text:
                     table = h2.find_next('table')
-                    tables['Abgeordnete'] = table
+                    tables['Abgeordnete'] = self._table_rows(table)
             except AttributeError:
                 pass
 
         return tables
 
-    def show_mdls(self) -> bool:
-        import shelve
-        import os
+    def _stream_tables(self, bsObj) -> dict:
+        '''
+        Same result as _soup_tables, but the page is read with lxml's
+        iterparse: elements are discarded as soon as they are closed unless
+        they belong to a table following one of the two headings, and parsing
+        stops after both tables have been read.
+        '''
+        from io import BytesIO
+        from lxml import etree
 
-        PATH = './data/shelves/'
-        db_name = f'nrw_mdls_term_{self.legislature}'
+        TABLES = ['Abgeordnete', 'Ausgeschiedene Abgeordnete']
+        tables = dict()
+        pending = list()
+        depth = 0
+        # the text of a heading is mostly inside a span, which must not be
+        # cleared before the heading has been read
+        heading = 0
+        source = BytesIO(bsObj.encode('utf-8'))
+        for event, element in etree.iterparse(source, events=('start', 'end'),
+                                              html=True, encoding='utf-8'):
+            if event == 'start':
+                if element.tag == 'table' and (pending or depth):
+                    depth += 1
+                elif element.tag == 'h2':
+                    heading += 1
+                continue
+
+            if element.tag == 'table' and depth:
+                depth -= 1
+                if depth == 0:
+                    rows = self._element_rows(element)
+                    for key in pending:
+                        tables[key] = rows
+                    pending = list()
+                    if all(key in tables for key in TABLES):
+                        break
+            elif element.tag == 'h2':
+                heading -= 1
+                if depth:
+                    continue
+                text = ''.join(element.itertext())
+                if 'Ausgeschiedene' in text:
+                    pending.append('Ausgeschiedene Abgeordnete')
+                elif 'Abgeordnete' in text:
+                    pending.append('Abgeordnete')
+
+            if not depth and not heading:
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
 
-        if not os.path.isfile(PATH + db_name):
-            print(f'No file {PATH + db_name}.')
-            return False
-        db = shelve.open(PATH + db_name)
-        klist = list(db.keys())
+        return tables
 
-        for i, key in enumerate(klist):
-            print(str(i).rjust(3, ' '), key)
-            print(db[key])
-        db.close()
+    def _element_rows(self, table) -> list:
+        '''
+        Like _table_rows, for a table parsed by lxml.
+        '''
+        rows = list()
+        for row in table.iter('tr'):
+            cells = list()
+            for col in row.iter('td'):
+                cells.append({'text': ''.join(col.itertext()),
+                              'links': [''.join(a.itertext())
+                                        for a in col.iter('a')],
+                              'spans': [''.join(span.itertext())
+                                        for span in col.iter('span')],
+                              'head': col.text})
+            rows.append(cells)
+
+        return rows
+
+    def _table_rows(self, table) -> list:
+        '''
+        Turns a html table into a list of rows, each row being a list of its
+        cells (td). Of every cell the extractors need the text, the texts of
+        its links and spans and the leading string ('head', None if the cell
+        starts with a tag).
+        '''
+        from bs4 import NavigableString
 
-        return True
+        rows = list()
+        for row in table.find_all('tr'):
+            cells = list()
+            for col in row.find_all('td'):
+                head = None
+                if col.contents and isinstance(col.contents[0],
+                                               NavigableString):
+                    head = str(col.contents[0])
+                cells.append({'text': col.text,
+                              'links': [a.text for a in col.find_all('a')],
+                              'spans': [span.text for span in
+                                        col.find_all('span')],
+                              'head': head})
+            rows.append(cells)
+
+        return rows
+
+    def _get_store(self):
+        '''
+        Opens the MdL store; if it has no MdLs yet, the shelves of earlier
+        versions are migrated into it.
+        '''
+        from scraper_lib._mdl_store import MdL_Store
 
-    def show_specific_MdL(self) -> bool:
-        import shelve
-        import os
+        store = MdL_Store()
+        if not store.count():
+            store.migrate_shelves()
+        return store
 
-        PATH = './data/shelves/'
-        db_name = f'nrw_mdls_term_{self.legislature}'
+    def show_mdls(self) -> bool:
+        with self._get_store() as store:
+            mdls = store.mdls(self.legislature)
+            if not mdls:
+                print(f'No MdLs of term {self.legislature} in store.')
+                return False
+            for i, (key, mdl) in enumerate(mdls):
+                print(str(i).rjust(3, ' '), key)
+                print(mdl)
 
-        if not os.path.isfile(PATH + db_name):
-            print(f'No file {PATH + db_name}.')
-            return False
-        with shelve.open(PATH + db_name) as db:
-            klist = list(db.keys())
+        return True
+
+    def show_specific_MdL(self) -> bool:
+        with self._get_store() as store:
+            if not store.count(self.legislature):
+                print(f'No MdLs of term {self.legislature} in store.')
+                return False
             while True:
                 identifier = input('\nLast or first name, city? => ')
                 if not identifier:
                     break
-                for key in klist:
-                    if identifier in key:
-                        print(db[key])
+                for key, mdl in store.search(identifier, self.legislature):
+                    print(mdl)
 
         return True
 
     def show_MdLs_of_same_party(self) -> bool:
-        import shelve
-        import os
-
-        PATH = './data/shelves/'
-        db_name = f'nrw_mdls_term_{self.legislature}'
         parties = {'14': ['CDU', 'SPD', 'FDP', 'Grüne', 'Fraktionslos'],
                    '15': ['CDU', 'SPD', 'FDP', 'Grüne', 'Linke'],
                    '16': ['CDU', 'SPD', 'FDP', 'GRÜNE', 'PIRATEN'],
                    '17': ['CDU', 'SPD', 'FDP', 'GRÜNE', 'AfD', 'fraktionslos']}
 
-        if not os.path.isfile(PATH + db_name):
-            print(f'No file {PATH + db_name}.')
-            return False
-        with shelve.open(PATH + db_name) as db:
-            klist = list(db.keys())
+        with self._get_store() as store:
+            if not store.count(self.legislature):
+                print(f'No MdLs of term {self.legislature} in store.')
+                return False
             while True:
                 identifier = input('\nWhich party? => ')
                 counter = 1
                 if identifier not in parties[self.legislature]:
                     print(f'No party {identifier} in term {self.legislature}')
                     break
-                for key in klist:
-                    if identifier in db[key].parties:
-                        print(counter, end=' ')
-                        print(db[key])
-                        counter += 1
+                for key, mdl in store.of_party(identifier, self.legislature):
+                    print(counter, end=' ')
+                    print(mdl)
+                    counter += 1
 
         return True
 
@@ -131,21 +262,21 @@ class Collector_MdLs:
 
         '''
         table = tables['Abgeordnete']
-        for row in table.find_all('tr'):
+        for row in table:
             index_col = 0
-            for col in row.find_all('td'):
+            for col in row:
                 if index_col == 0:
-                    col_text = col.text
+                    col_text = col['text']
                     if '!' in col_text:
-                        col_text = col.text.split('!')[-1]
+                        col_text = col_text.split('!')[-1]
                     first_name, middle_name_1, middle_name_2,\
                         last_name, peer_preposition, peer_title =\
                         self._extract_names(col_text)
                 elif index_col == 2:
-                    party = self._make_party(col.text)
+                    party = self._make_party(col['text'])
                 elif index_col == 4:
                     electoral_ward =\
-                        self.mk_electoral_ward(self.CITIES, col.text)
+                        self.mk_electoral_ward(self.CITIES, col['text'])
                 index_col += 1
             try:
                 mdl = MdL(self.legislature, first_name, last_name,
@@ -161,57 +292,57 @@ class Collector_MdLs:
 
     def extract_tables_15(self, tables) -> MdL:
         table = tables['Abgeordnete']
-        tbody = table.find_next('tbody')
         try:
             index_rows = 0
-            for row in tbody.find_all('tr'):
+            for row in table:
                 # print(f'index_rows: {index_rows} **************************')
                 index_cols = 0
-                for col in row.find_all('td'):
-                    # print(f'col.contents {index_cols}: {col.contents}')
+                for col in row:
+                    # print(f'col {index_cols}: {col}')
                     try:
-                        for tag_a in col.find_all('a'):
-                            if (self._is_first_name(tag_a.text) and
+                        for tag_a in col['links']:
+                            if (self._is_first_name(tag_a) and
                                 index_cols < 2):
                                 first_name, middle_name_1, middle_name_2,\
                                     last_name, peer_preposition,\
                                     peer_title =\
-                                    self._extract_names(tag_a.text)
+                                    self._extract_names(tag_a)
                                 continue
-                            elif self._is_city(self.CITIES, tag_a.text):
+                            elif self._is_city(self.CITIES, tag_a):
                                 electoral_ward = self.mk_electoral_ward(
-                                    self.CITIES, tag_a.text)
+                                    self.CITIES, tag_a)
                                 continue
-                            elif self._is_kreis(tag_a.text):
-                                electoral_ward = tag_a.text
+                            elif self._is_kreis(tag_a):
+                                electoral_ward = tag_a
                                 continue
                     except TypeError:
                         pass
                     except IndexError:
                         pass
                     try:
-                        for tag_span in col.find_all('span'):
-                            if self._is_first_name(tag_span.text) and index_cols < 2:
+                        for tag_span in col['spans']:
+                            if self._is_first_name(tag_span) and index_cols < 2:
                                 first_name, middle_name_1, middle_name_2,\
                                         last_name, peer_preposition,\
                                         peer_title = self._extract_names(
-                                            tag_span.text)
+                                            tag_span)
                                 continue
-                            elif self._is_city(self.CITIES, tag_span.text):
+                            elif self._is_city(self.CITIES, tag_span):
                                 electoral_ward = self.mk_electoral_ward(
-                                    self.CITIES, tag_span.text)
+                                    self.CITIES, tag_span)
                                 continue
-                            elif self._is_kreis(tag_span.text):
+                            elif self._is_kreis(tag_span):
                                 electoral_ward = self.mk_electoral_ward(
-                                    self.CITIES, tag_span.text)
+                                    self.CITIES, tag_span)
                                 continue
                     except TypeError:
                         pass
                     except IndexError:
                         pass
                     try:
-                        if col.contents[0].strip() in self.parties:
-                            party = self._make_party(col.contents[0])
+                        if col['head'] and \
+                                col['head'].strip() in self.parties:
+                            party = self._make_party(col['head'])
                     except TypeError:
                         pass
                     except IndexError:
@@ -233,25 +364,24 @@ class Collector_MdLs:
 
     def extract_tables_16(self, tables) -> MdL:
         for key, table in tables.items():
-            print(key)
             index_rows = 0
-            for row in table.find_all('tr'):
+            for row in table:
                 # print(index_rows)
                 index_col = 0
-                for col in row.find_all('td'):
+                for col in row:
                     # print(col)
                     if index_col == 1:
-                        col_text = col.text
+                        col_text = col['text']
                         if '!' in col_text:
-                            col_text = col.text.split('!')[-1]
+                            col_text = col_text.split('!')[-1]
                         first_name, middle_name_1, middle_name_2,\
                             last_name, peer_preposition, peer_title =\
                             self._extract_names(col_text)
                     elif index_col == 3:
-                        party = self._make_party(col.text)
+                        party = self._make_party(col['text'])
                     elif index_col == 4:
                         electoral_ward =\
-                            self.mk_electoral_ward(self.CITIES, col.text)
+                            self.mk_electoral_ward(self.CITIES, col['text'])
                     index_col += 1
                 index_rows += 1
                 try:
@@ -261,32 +391,45 @@ class Collector_MdLs:
                               party=party,
                               peer_preposition=peer_preposition,
                               peer_title=peer_title)
-                    print(mdl)
-                    print()
                     yield mdl
                 except UnboundLocalError:
                     pass
-        import sys
-        sys.exit()
 
-    def _get_bsObj(self) -> str:
-        URL = f'https://de.wikipedia.org/wiki/Liste_der_Mitglieder_des_Landtages_Nordrhein-Westfalen_({self.legislature}._Wahlperiode)'
-        file_name = URL.split('/')[-1] + '.soup'
-        FILE_LOC = './data/soup_objects/' + file_name
+    def _create_dict(self):
+        func_dict = {'14': Collector_MdLs.extract_tables_14,
+                     '15': Collector_MdLs.extract_tables_15,
+                     '16': Collector_MdLs.extract_tables_16,
+                     '17': Collector_MdLs.extract_tables_16}
+        return func_dict
 
-        try:
-            with open(FILE_LOC, "r", encoding="utf-8") as fin:
-                bsObj = fin.read()
-        except FileNotFoundError as e:
-            print(e)
+    def _get_URL(self) -> str:
+        return f'https://de.wikipedia.org/wiki/Liste_der_Mitglieder_des_Landtages_Nordrhein-Westfalen_({self.legislature}._Wahlperiode)'
+
+    def _get_bsObj(self) -> str:
+        '''
+        Returns the html of the term's list of MdLs from the page cache,
+        downloading it if it isn't cached yet.
+        '''
+        from scraper_lib._page_cache import _get_page_cache
+
+        URL = self._get_URL()
+        cache = _get_page_cache()
+        meta, body = cache.lookup(URL)
+        if body is None:
+            import os
+            # soup objects saved by earlier versions
+            file_loc = './data/soup_objects/' + URL.split('/')[-1] + '.soup'
+            if os.path.isfile(file_loc):
+                with open(file_loc, 'r', encoding='utf-8') as fin:
+                    return fin.read()
             from wiki_scraper import Loader
             loader = Loader()
-            if loader.download_bsObj(URL):
-                bsObj = self._get_bsObj()
-            else:
+            if not loader.download_bsObj(URL):
                 print('didnt work')
+                return None
+            meta, body = cache.lookup(URL)
 
-        return bsObj
+        return body.decode(meta['encoding'], errors='replace')
 
     def _standardize_words(self, text) -> list:
         words = text.split(' ')
@@ -304,20 +447,22 @@ class Collector_MdLs:
 
     def _is_city(self, CITIES, text) -> bool:
         words = self._standardize_words(text)
-        word = words[0]
-        if word in CITIES:
-            return True
-        elif '-' in word:
-            words = word.split('-')
-            word_1 = words[0]
-            word_2 = words[1]
-            if word_1 in CITIES or word_2 in CITIES:
-                return True
-            if len(words) == 3:
-                word_3 = words[2]
-                if word_3 in CITIES:
-                    return True
-        return False
+        # "Bad Honnef I", "Soest-Süd", "Hochsauerlandkreis II – Soest III"
+        return CITIES.match(' '.join(words)) is not None or \
+            CITIES.is_city(words[0]) or \
+            self._is_compound_ward(CITIES, ' '.join(words))
+
+    def _is_compound_ward(self, CITIES, text) -> bool:
+        '''
+        True for wards of several parts like "Hochsauerlandkreis II – Soest
+        III", each starting with a city or a Kreis and ending with its
+        number, but not for "Rhein-Sieg-Kreis I".
+        '''
+        parts = CITIES.SEPARATORS.split(text)
+        return len(parts) > 1 and all(
+            WARD_NO.search(part) and
+            (CITIES.cities_in(part) or self._is_kreis(part))
+            for part in parts)
 
     def mk_electoral_ward(self, CITIES, text) -> str:
         words = self._standardize_words(text)
@@ -331,6 +476,11 @@ class Collector_MdLs:
             elif len(words) > 1:
                 words = words[1:]
         electoral_ward = ' '.join(words)
+        if self._is_compound_ward(CITIES, electoral_ward):
+            # named with ' – ' between the parts like the ward's page,
+            # whichever dash the list uses
+            electoral_ward = ' – '.join(
+                CITIES.SEPARATORS.split(electoral_ward))
         return electoral_ward
 
     def _make_party(self, text) -> str:
@@ -353,18 +503,11 @@ class Collector_MdLs:
         It would be nice if unknown first names could be added to the list of
         first names, but this would blow up this function's purpose.
         '''
-        first_names = _get_vornamenListe()
+        first_names = _get_vornamen_index()
 
         words = self._standardize_words(text)
         word = words[0]
-        if word in first_names:
-            return True
-        elif '-' in word:
-            if word.split('-')[0] in first_names:
-                return True
-            elif word.split('-')[-1] in first_names:
-                return True
-        return False
+        return first_names.is_first_name(word)
 
     def _is_middle_name(self, words) -> bool:
         word = words.split(' ')[1].strip()
@@ -378,94 +521,17 @@ class Collector_MdLs:
         return False
 
     def _extract_names(self, text):
-        words = self._standardize_words(text)
-        # print('words in extract_names:', words)
-        middle_name_1 = None
-        middle_name_2 = None
-        preposition = None
-        peer_title = None
-        word_1 = words[0]
-        word_2 = words[1]
-
-        if len(words) == 2:
-            if self._is_first_name(word_1):
-                first_name = word_1
-                last_name = word_2
-            else:
-                raise NoNameException
-        elif len(words) == 3:
-            word_3 = words[-1]
-            if self._is_first_name(word_1) and self._is_first_name(word_2):
-                first_name = word_1
-                middle_name_1 = word_2
-                last_name = word_3
-            elif self._is_preposition(word_2):
-                first_name = word_1
-                preposition = word_2
-                last_name = word_3
-            elif word_1 in peertitles:
-                peer_title = word_1
-                first_name = word_2
-                last_name = word_3
-            elif word_2 in peertitles:
-                first_name = word_1
-                peer_title = word_2
-                last_name = word_3
-            elif '-' in word_2:
-                first_name = word_1
-                words_2 = word_2.split('-')
-                if words_2[-1] in ['von', 'van', 'de', 'zu']:
-                    last_name = ' '.join([word_2, word_3])
-            elif word_3 == 'last_word':
-                first_name = word_1
-                last_name = word_2
-            else:
-                first_name = word_1
-                last_name = ' '.join([word_2, word_3])
-        elif len(words) == 4:
-            word_3 = words[2]
-            if word_3[0] in string.punctuation:
-                word_3 = word_3[1:]
-            word_4 = words[-1]
-            if self._is_first_name(word_1):
-                first_name = word_1
-            elif word_1 in peertitles:
-                peer_title = word_1
-                if self._is_first_name(word_2):
-                    first_name = word_2
-            if word_2 in peertitles:
-                peer_title = word_2
-                if self._is_preposition(word_3):
-                    preposition = word_3
-                    last_name = word_4
-                else:
-                    last_name = ' '.join([word_3, word_4])
-            elif self._is_first_name(word_2):
-                middle_name_1 = word_2
-                if self._is_first_name(word_3):
-                    middle_name_2 = word_3
-                    last_name = word_4
-                elif self._is_preposition(word_3):
-                    preposition = word_3
-                    last_name = word_4
-                else:
-                    last_name = ' '.join([word_3, word_4])
-            elif self._is_preposition(word_2):
-                if self._is_preposition(word_3):
-                    preposition = ' '.join([word_2, word_3])
-                    last_name = word_4
-                elif '-' in word_3:
-                    words_3 = word_3.split('-')
-                    if words_3[-1] in ['von', 'van', 'de', 'zu']:
-                        last_name = ' '.join([word_3, word_4])
-                else:
-                    preposition = word_2
-                    last_name = ' '.join([word_3, word_4])
-            elif not self._is_preposition(word_2) and self._is_preposition(word_3):
-                preposition = word_3
-                last_name = word_4
-
-        return first_name, middle_name_1, middle_name_2, last_name, preposition, peer_title
+        '''
+        Returns first_name, middle_name_1, middle_name_2, last_name,
+        preposition and peer_title of a name (see NameParser).
+        '''
+        _get_instruments().count('names parsed')
+        parsed = _get_name_parser(peertitles).parse(text)
+        if parsed is None:
+            raise NoNameException(text)
+
+        return parsed.first_name, parsed.middle_name_1, parsed.middle_name_2,\
+            parsed.last_name, parsed.preposition, parsed.peer_title
 
 
 class Menu(Collector_MdLs):
@@ -484,7 +550,7 @@ class Menu(Collector_MdLs):
         self.DIR_LOC = './data/soup_objects/'
         self.parties = ['CDU', 'SPD', 'FDP', 'Grüne', 'PIRATEN', 'AfD',
                         'GRÜNE', 'Linke']
-        self.CITIES = _make_list_of_cities()
+        self.CITIES = _get_gazetteer()
 
     def display_menu(self) -> None:
         print("""
@@ -529,13 +595,6 @@ class Menu(Collector_MdLs):
         tables = Collector_MdLs.collect_tables(self)
         return tables
 
-    def _create_dict(self):
-        func_dict = {'14': Collector_MdLs.extract_tables_14,
-                     '15': Collector_MdLs.extract_tables_15,
-                     '16': Collector_MdLs.extract_tables_16,
-                     '17': Collector_MdLs.extract_tables_16}
-        return func_dict
-
     def extract_tables_14(self, tables) -> MdL:
         for mdl in Collector_MdLs.extract_tables_14(self, tables):
             yield mdl
@@ -549,26 +608,22 @@ class Menu(Collector_MdLs):
             yield mdl
 
     def shelve_mdls(self) -> None:
-        import shelve
-        import os
-
+        '''
+        Extracts the MdLs of the chosen term and writes them to the MdL store
+        in one transaction, replacing what was stored for that term before.
+        '''
         tables = self.collect_tables()
-        PATH = './data/shelves/'
-        if not os.path.exists(PATH):
-            os.mkdir(PATH)
-        filename = f'nrw_mdls_term_{self.legislature}'
-        print(filename)
-        db = shelve.open(PATH + filename)
         func_dict = self._create_dict()
         extract_tables = func_dict[self.legislature]
 
-        for mdl in extract_tables(self, tables):
-            key = f'{mdl.last_name}_{mdl.first_name}_{mdl.electoral_ward}_{mdl.legislature}'
-            print(key)
+        mdls = list(extract_tables(self, tables))
+        enrich(mdls)
+
+        for mdl in mdls:
             print(mdl)
-            db[key] = mdl
-        db.close()
-        print(f'Shelved MdLs for term {self.legislature}')
+        with self._get_store() as store:
+            count = store.write_term(self.legislature, mdls)
+        print(f'Shelved {count} MdLs for term {self.legislature}')
 
 
 if __name__ == "__main__":
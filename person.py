@@ -5,6 +5,8 @@ from dataclasses import dataclass, field
 from inspect import signature
 from typing import List
 
+from scraper_lib._instrument import _get_instruments
+
 
 # https://gist.github.com/jhazelwo/86124774833c6ab8f973323cb9c7e251
 class QuietError(Exception):
@@ -133,44 +135,42 @@ class _Politician_default:
     party: str = field(default=None)
     parties: List[str] = field(default_factory=lambda: [])
 
+    def is_enriched(self) -> bool:
+        '''
+        True if there is nothing (more) to look up for ward_no and
+        voter_count.
+        '''
+        return self.electoral_ward in ['ew', 'Landesliste'] or \
+            self.ward_no != 'None'
+
+    def enrich(self):
+        '''
+        Looks up ward_no and voter_count of this politician's ward, unless
+        they are known already. Construction never does this, for many
+        politicians at once use enrich(politicians).
+        '''
+        if not self.is_enriched():
+            enrich([self])
+        return self
+
     def ward_details(self):
-        if self.electoral_ward not in ['ew', 'Landesliste']:
-            from bs4 import BeautifulSoup
-            import requests
-            if self.electoral_ward == 'Kreis Aachen I':
-                self.electoral_ward = 'Aachen III'
-            elif self.electoral_ward == 'Hochsauerlandkreis II – Soest III':
-                self.electoral_ward = 'Hochsauerlandkreis II'
-            elif self.electoral_ward == 'Kreis Aachen II':
-                if self.last_name in ['Wirtz', 'Weidenhaupt']:
-                    self.electoral_ward = 'Aachen IV'
-
-            URL_base = 'https://de.wikipedia.org/wiki/Landtagswahlkreis_{}'
-            URL = URL_base.format(self.electoral_ward)
-            req = requests.get(URL)
-            bsObj = BeautifulSoup(req.text, 'lxml')
-            table = bsObj.find(class_='infobox float-right toptextcells')
-            try:
-                for td in table.find_all('td'):
-                    if 'Wahlkreisnummer' in td.text:
-                        ward_no = td.find_next().text.strip()
-                        ward_no = ward_no.split(' ')[0]
-                        self.ward_no = int(ward_no)
-                    elif 'Wahlberechtigte' in td.text:
-                        voter_count = td.find_next().text.strip()
-                        if ' ' in voter_count:
-                            voter_count = ''.join(voter_count.split(' '))
-                        elif '.' in voter_count:
-                            voter_count = ''.join(voter_count.split('.'))
-                        if voter_count[-1] == ']':
-                            voter_count = voter_count[:-3]
-                        self.voter_count = int(voter_count)
-            except (AttributeError, ValueError) as e:
-                print(e)
-                print(td)
-                print(self.electoral_ward)
-                input()
-                sys.exit()
+        return self.enrich()
+
+
+def enrich(politicians) -> list:
+    '''
+    Sets ward_no and voter_count of all politicians that lack them, with
+    one lookup per distinct ward (see scraper_lib/_ward_resolver.py, which
+    keeps what it found on disk). Returns the politicians.
+    '''
+    from scraper_lib._ward_resolver import _get_ward_resolver
+
+    politicians = list(politicians)
+    todo = [politician for politician in politicians
+            if not politician.is_enriched()]
+    if todo:
+        _get_ward_resolver().fill(todo)
+    return politicians
 
 
 @dataclass
@@ -187,8 +187,6 @@ class Politician(_Peertitle_default, _Academic_title_default, _Person_default,
             self.parties.append(self.party)
         if self.minister:
             self.offices.append(self.minister)
-        if self.electoral_ward not in ['ew', 'Landesliste']:
-            _Politician_default.ward_details(self)
 
 
 @dataclass
@@ -303,10 +301,115 @@ class MdL(_MdL_default, Politician, _MdL_base, AttrDisplay):
     def __post_init__(self):
         if int(self.legislature) not in range(10, 21):
             raise NotInRange('Number for legislature not in range')
+        _get_instruments().count('MdLs constructed')
         Academic.__post_init__(self)
         Politician.__post_init__(self)
-        if self.electoral_ward not in ['ew', 'Landesliste']:
-            _Politician_default.ward_details(self)
+
+
+class MdL_record:
+    '''
+    Compact, slotted form of an MdL for loading and keeping many of them:
+    no __dict__, lists as tuples, ward_no and voter_count None if unknown.
+    Built from an MdL with from_mdl, turned back with to_mdl; as_tuple and
+    from_tuple are used by scraper_lib/_record_codec.py. The MdL store
+    loads its rows as records (MdL_Store.records) and writes records as it
+    writes MdLs.
+    '''
+    FIELDS = ('legislature', 'first_name', 'last_name', 'middle_name_1',
+              'middle_name_2', 'maiden_name', 'peer_title',
+              'peer_preposition', 'academic_title', 'gender',
+              'electoral_ward', 'ward_no', 'voter_count', 'minister', 'party',
+              'parties', 'offices', 'parl_pres', 'parl_vicePres')
+    __slots__ = FIELDS
+
+    def __init__(self, legislature, first_name, last_name,
+                 middle_name_1=None, middle_name_2=None, maiden_name=None,
+                 peer_title=None, peer_preposition=None, academic_title=None,
+                 gender='unknown', electoral_ward='ew', ward_no=None,
+                 voter_count=None, minister=None, party=None, parties=(),
+                 offices=(), parl_pres=False, parl_vicePres=False):
+        self.legislature = int(legislature)
+        self.first_name = first_name
+        self.last_name = last_name
+        self.middle_name_1 = middle_name_1
+        self.middle_name_2 = middle_name_2
+        self.maiden_name = maiden_name
+        self.peer_title = peer_title
+        self.peer_preposition = peer_preposition
+        self.academic_title = academic_title
+        self.gender = gender
+        self.electoral_ward = electoral_ward
+        self.ward_no = ward_no
+        self.voter_count = voter_count
+        self.minister = minister
+        self.party = party
+        self.parties = tuple(parties)
+        self.offices = tuple(offices)
+        self.parl_pres = bool(parl_pres)
+        self.parl_vicePres = bool(parl_vicePres)
+
+    @classmethod
+    def from_mdl(cls, mdl):
+        def known(value):
+            return None if value in ['None', None] else int(value)
+
+        return cls(mdl.legislature, mdl.first_name, mdl.last_name,
+                   mdl.middle_name_1, mdl.middle_name_2, mdl.maiden_name,
+                   mdl.peer_title, mdl.peer_preposition, mdl.academic_title,
+                   mdl.gender, mdl.electoral_ward, known(mdl.ward_no),
+                   known(mdl.voter_count), mdl.minister, mdl.party,
+                   mdl.parties, mdl.offices, mdl.parl_pres,
+                   mdl.parl_vicePres)
+
+    def to_mdl(self) -> MdL:
+        mdl = MdL(self.legislature, self.first_name, self.last_name,
+                  middle_name_1=self.middle_name_1,
+                  middle_name_2=self.middle_name_2,
+                  maiden_name=self.maiden_name, peer_title=self.peer_title,
+                  peer_preposition=self.peer_preposition, gender=self.gender,
+                  electoral_ward=self.electoral_ward, party=self.party,
+                  parl_pres=self.parl_pres, parl_vicePres=self.parl_vicePres)
+        # academic_title is already standardized, MdL would do it again
+        mdl.academic_title = self.academic_title
+        mdl.minister = self.minister
+        mdl.parties = list(self.parties)
+        mdl.offices = list(self.offices)
+        if self.ward_no is not None:
+            mdl.ward_no = self.ward_no
+        if self.voter_count is not None:
+            mdl.voter_count = self.voter_count
+        return mdl
+
+    def is_enriched(self) -> bool:
+        '''The same as Politician.is_enriched, for enrich().'''
+        return self.electoral_ward in ['ew', 'Landesliste'] or \
+            self.ward_no not in ['None', None]
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    @classmethod
+    def from_tuple(cls, values):
+        return cls(*values)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MdL_record):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __hash__(self) -> int:
+        return hash(self.as_tuple())
+
+    def __repr__(self) -> str:
+        return (f'MdL_record({self.legislature!r}, {self.first_name!r}, '
+                f'{self.last_name!r}, party={self.party!r})')
+
+    def __str__(self) -> str:
+        # same layout as AttrDisplay, in the order of FIELDS
+        attrs = [f'{name}={getattr(self, name)}' for name in self.FIELDS
+                 if getattr(self, name) and
+                 getattr(self, name) not in ['unknown', 'ew']]
+        return f'{self.__class__.__name__}:\n' + '\n'.join(attrs) + '\n'
 
 
 if __name__ == '__main__':
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Extraction of MdLs as a chain of stages, each running in its own thread:
+
+    fetch -> tables -> parse -> enrich -> persist
+
+fetch reads a term's list of MdLs (from the page cache or Wikipedia),
+tables picks the member tables, parse turns their rows into MdLs, enrich
+looks up the wards of the MdLs in small batches and persist writes every
+completed term to the MdL store. The stages are connected by bounded queues,
+so a fast stage waits for a slow one instead of piling up items, and
+looking up wards overlaps with parsing the next term.
+
+    python pipeline.py --terms 14-17
+'''
+
+import sys
+import time
+import queue
+import threading
+
+_STOP = object()
+# marks the end of a term's MdLs
+_END = 'end of term'
+
+
+class Stage(threading.Thread):
+    '''
+    Takes items from inbox, passes each to process (a generator) and puts
+    what it yields into outbox. Counts items in and out, errors and the
+    time spent in process.
+    '''
+    def __init__(self, name, inbox, outbox=None):
+        threading.Thread.__init__(self, name=name, daemon=True)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0
+
+    def process(self, item):
+        yield item
+
+    def flush(self):
+        return []
+
+    def _put(self, item) -> None:
+        if self.outbox is not None:
+            self.outbox.put(item)
+        self.items_out += 1
+
+    def run(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _STOP:
+                for out in self.flush():
+                    self._put(out)
+                if self.outbox is not None:
+                    self.outbox.put(_STOP)
+                break
+            self.items_in += 1
+            start = time.perf_counter()
+            try:
+                for out in self.process(item):
+                    # time spent waiting for a full outbox is not busy time
+                    self.busy += time.perf_counter() - start
+                    self._put(out)
+                    start = time.perf_counter()
+            except Exception as e:
+                self.errors += 1
+                print(f'{self.name}: {e!r}')
+            self.busy += time.perf_counter() - start
+
+    def throughput(self) -> float:
+        '''Items put out per second of busy time.'''
+        if not self.busy:
+            return 0.0
+        return self.items_out / self.busy
+
+
+class Fetch_Stage(Stage):
+    def process(self, legislature):
+        from extract_mdl_wiki import Collector_MdLs
+
+        collector = Collector_MdLs(str(legislature))
+        bsObj = collector._get_bsObj()
+        if bsObj is None:
+            raise ValueError(f'No page for term {legislature}')
+        yield collector, bsObj
+
+
+class Tables_Stage(Stage):
+    def process(self, item):
+        collector, bsObj = item
+        yield collector, collector.collect_tables(bsObj=bsObj)
+
+
+class Parse_Stage(Stage):
+    def process(self, item):
+        from extract_mdl_wiki import NoNameException, NoPartyException
+        from scraper_lib._ward_resolver import _normalize_ward
+
+        collector, tables = item
+        extract_tables = collector._create_dict()[collector.legislature]
+        try:
+            for mdl in extract_tables(collector, tables):
+                # stored under the normalized ward, with or without enrich
+                mdl.electoral_ward = _normalize_ward(mdl.electoral_ward,
+                                                     mdl.last_name)
+                yield collector.legislature, mdl
+        except (NoNameException, NoPartyException) as e:
+            # without _END the term's MdLs won't be persisted
+            raise ValueError(f'term {collector.legislature}: {e!r}')
+        yield collector.legislature, _END
+
+
+class Enrich_Stage(Stage):
+    '''
+    Fills in ward details for batches of MdLs, so the wards of a batch are
+    fetched concurrently by the ward resolver.
+    '''
+    def __init__(self, name, inbox, outbox, batch_size=32):
+        Stage.__init__(self, name, inbox, outbox)
+        self.batch_size = batch_size
+        self.batch = list()
+
+    def _fill(self):
+        from person import enrich
+
+        batch, self.batch = self.batch, list()
+        enrich(mdl for legislature, mdl in batch)
+        return batch
+
+    def process(self, item):
+        legislature, mdl = item
+        if mdl is _END:
+            yield from self._fill()
+            yield item
+            return
+        self.batch.append(item)
+        if len(self.batch) >= self.batch_size:
+            yield from self._fill()
+
+    def flush(self):
+        return self._fill()
+
+
+class Persist_Stage(Stage):
+    '''
+    Collects the MdLs of each term and writes a term to the MdL store in one
+    transaction as soon as it is complete.
+    '''
+    def __init__(self, name, inbox):
+        Stage.__init__(self, name, inbox)
+        self.terms = dict()
+        self.written = dict()
+
+    def process(self, item):
+        from scraper_lib._mdl_store import MdL_Store
+
+        legislature, mdl = item
+        if mdl is not _END:
+            self.terms.setdefault(legislature, list()).append(mdl)
+            return
+        mdls = self.terms.pop(legislature, list())
+        # sqlite connections must not be shared between threads
+        with MdL_Store() as store:
+            self.written[legislature] = store.write_term(legislature, mdls)
+        yield legislature
+
+
+def run(terms, queue_size=64, wards=True) -> tuple:
+    '''
+    Runs the pipeline for terms and waits for it to finish.
+    Returns the stages and the dict of terms written to the store.
+    '''
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(5)]
+    stages = [Fetch_Stage('fetch', queues[0], queues[1]),
+              Tables_Stage('tables', queues[1], queues[2]),
+              Parse_Stage('parse', queues[2], queues[3])]
+    if wards:
+        stages.append(Enrich_Stage('enrich', queues[3], queues[4]))
+        stages.append(Persist_Stage('persist', queues[4]))
+    else:
+        stages.append(Persist_Stage('persist', queues[3]))
+
+    for stage in stages:
+        stage.start()
+    for term in terms:
+        queues[0].put(term)
+    queues[0].put(_STOP)
+    for stage in stages:
+        stage.join()
+
+    return stages, stages[-1].written
+
+
+def _print_stages(stages) -> None:
+    for stage in stages:
+        print(f'{stage.name:<8} in {stage.items_in:6} out {stage.items_out:6} '
+              f'errors {stage.errors:3} busy {stage.busy:7.2f}s '
+              f'{stage.throughput():10.1f} items/s')
+
+
+def main(argv=None) -> int:
+    import argparse
+    from batch_extract import _parse_terms
+
+    parser = argparse.ArgumentParser(
+        description='Extract MdLs of several terms through a staged pipeline.')
+    parser.add_argument('--terms', type=_parse_terms, default='14-17',
+                        help="terms to extract, e.g. '14-17' or '14,16'")
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help='capacity of the queues between stages')
+    parser.add_argument('--no-wards', action='store_true',
+                        help="don't look up ward_no and voter_count")
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'],
+                        default=None, help='run under a profiler')
+    args = parser.parse_args(argv)
+
+    from scraper_lib._instrument import _get_instruments, _profiled
+
+    terms = args.terms
+    with _profiled(args.profile):
+        stages, written = run(terms, args.queue_size,
+                              wards=not args.no_wards)
+    _print_stages(stages)
+    for legislature, count in sorted(written.items()):
+        print(f'term {legislature}: {count} MdLs stored')
+    print(_get_instruments().summary())
+
+    return 0 if len(written) == len(terms) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
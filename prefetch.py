@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Downloads all cabinet pages, the lists of MdLs of all terms and the pages
+of all electoral wards of the MdL store into the page cache at once, so
+the menus, batch_extract.py and pipeline.py find everything cached.
+
+    python prefetch.py
+    python prefetch.py --only terms --per-host 2
+    python prefetch.py --base-url http://localhost:8000
+
+Requests run concurrently (asyncio, every request in a thread since the
+http client uses requests), at most --per-host at a time for each host
+and within the client's rate limit (see scraper_lib/_http_client.py).
+Connection errors, 429 and 5xx answers are retried with exponential
+backoff. Pages that are younger than the cache's ttl are skipped, the
+others are revalidated with If-None-Match/If-Modified-Since.
+--base-url replaces https://de.wikipedia.org, e.g. to run against a local
+mock server.
+'''
+
+import sys
+import time
+import random
+import asyncio
+
+WIKI = 'https://de.wikipedia.org'
+RETRY_STATUS = [429, 500, 502, 503, 504]
+
+
+def _urls(only=None, base_url=WIKI) -> list:
+    '''
+    Returns the URLs of the cabinets, terms and (from the MdL store) wards;
+    only is one of 'cabinets', 'terms', 'wards' or None for all.
+    '''
+    from wiki_scraper import CABINETS, URL_CABINET, URL_CABINETS, URL_TERM,\
+        TERMS
+    from scraper_lib._ward_resolver import URL_WARD, NO_WARD
+
+    urls = list()
+    if only in [None, 'cabinets']:
+        urls.append(URL_CABINETS)
+        urls.extend(URL_CABINET.format(cabinet) for cabinet in CABINETS)
+    if only in [None, 'terms']:
+        urls.extend(URL_TERM.format(term) for term in TERMS)
+    if only in [None, 'wards']:
+        from scraper_lib._mdl_store import MdL_Store
+        with MdL_Store() as store:
+            urls.extend(URL_WARD.format(ward)
+                        for ward in store.electoral_wards()
+                        if ward not in NO_WARD)
+
+    return [base_url + URL[len(WIKI):] if URL.startswith(WIKI) else URL
+            for URL in urls]
+
+
+class Prefetcher:
+    '''
+    Fetches URLs into the page cache concurrently. results maps every URL
+    to 'fresh' (cached and younger than ttl), 'not modified', 'fetched' or
+    'failed'.
+    '''
+    def __init__(self, per_host=4, retries=4, backoff=1.0, force=False,
+                 cache=None):
+        from scraper_lib._page_cache import _get_page_cache
+
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.force = force
+        self.cache = cache if cache is not None else _get_page_cache()
+        self.semaphores = dict()
+        self.results = dict()
+
+    def _semaphore(self, URL) -> asyncio.Semaphore:
+        from urllib.parse import urlsplit
+
+        host = urlsplit(URL).netloc
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self.semaphores[host]
+
+    def _request(self, URL, request_headers):
+        from scraper_lib._http_client import _get_http_client
+        return _get_http_client().get(URL, headers=request_headers,
+                                      timeout=30)
+
+    def _delay(self, attempt, req=None) -> float:
+        '''
+        Seconds to wait before retry number attempt + 1: Retry-After if the
+        server sent one, otherwise exponential backoff with jitter.
+        '''
+        if req is not None:
+            retry_after = req.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random() / 2)
+
+    async def fetch(self, URL) -> str:
+        import requests
+
+        if not self.force and self.cache.is_fresh(URL):
+            self.results[URL] = 'fresh'
+            return 'fresh'
+
+        meta, body = self.cache.lookup(URL)
+        request_headers = self.cache.conditional_headers(meta)
+        result = 'failed'
+        for attempt in range(self.retries + 1):
+            req = None
+            async with self._semaphore(URL):
+                try:
+                    req = await asyncio.to_thread(self._request, URL,
+                                                  request_headers)
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout) as e:
+                    print(f'{URL}: {e}')
+            if req is not None and req.status_code not in RETRY_STATUS:
+                if req.status_code == 304 and body is not None:
+                    result = 'not modified'
+                elif req.status_code == 200:
+                    result = 'fetched'
+                await asyncio.to_thread(self.cache.update, URL, req, meta,
+                                        body)
+                break
+            if attempt < self.retries:
+                await asyncio.sleep(self._delay(attempt, req))
+
+        self.results[URL] = result
+        return result
+
+    async def fetch_all(self, urls) -> dict:
+        await asyncio.gather(*(self.fetch(URL) for URL in urls))
+        return self.results
+
+    def run(self, urls) -> dict:
+        return asyncio.run(self.fetch_all(urls))
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Download cabinets, terms and wards into the page cache.')
+    parser.add_argument('--only', choices=['cabinets', 'terms', 'wards'],
+                        default=None, help='prefetch only these pages')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='concurrent requests per host')
+    parser.add_argument('--retries', type=int, default=4)
+    parser.add_argument('--force', action='store_true',
+                        help='revalidate pages younger than the ttl, too')
+    parser.add_argument('--base-url', default=WIKI,
+                        help='replaces https://de.wikipedia.org')
+    args = parser.parse_args(argv)
+
+    urls = _urls(args.only, args.base_url)
+    start = time.perf_counter()
+    prefetcher = Prefetcher(per_host=args.per_host, retries=args.retries,
+                            force=args.force)
+    results = prefetcher.run(urls)
+
+    counts = dict()
+    for URL, result in sorted(results.items()):
+        counts[result] = counts.get(result, 0) + 1
+        if result == 'failed':
+            print(f'failed: {URL}')
+    print(f'{len(urls)} pages in {time.perf_counter() - start:.2f}s: ' +
+          ', '.join(f'{count} {result}'
+                    for result, count in sorted(counts.items())))
+
+    return 1 if counts.get('failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Reads the plenary protocols of a term (text files or, with pypdf,
+pdfminer.six or pdftotext installed, pdfs) and stores their sessions,
+agenda items and contributions in the MdL store.
+
+    python protocol_ingest.py --term 17
+    python protocol_ingest.py --term 17 --dir ./protocols/ --workers 4
+
+Protocols are read and segmented by a pool of processes (see
+scraper_lib/_protocol_parser.py), speakers are resolved to MdLs of the
+term (see scraper_lib/_speaker_resolver.py) and the results are written
+in batches of --batch protocols, one transaction each. Files stored before
+and not changed since are skipped unless --force is given. Afterwards the
+fulltext index (see scraper_lib/_fulltext_index.py and search_protocols.py)
+is brought up to date.
+Exits with status 1 if any protocol failed.
+'''
+
+import os
+import sys
+import time
+import argparse
+
+PROTOCOL_LOC = './data/protocols/{}/'
+SUFFIXES = ('.txt', '.pdf')
+
+
+def _protocol_files(path) -> list:
+    if not os.path.isdir(path):
+        print(f'No protocols in {path}')
+        return []
+    return sorted(os.path.join(path, file_name)
+                  for file_name in os.listdir(path)
+                  if file_name.lower().endswith(SUFFIXES))
+
+
+def _parse_file(file_loc) -> tuple:
+    '''
+    Runs in a worker process.
+    Returns file_loc, its mtime, the result of parse_protocol (None if
+    failed) and a dict with the error, if any, and the worker's instruments.
+    '''
+    from scraper_lib._protocol_parser import read_protocol, parse_protocol
+    from scraper_lib._extract_vornamen import _get_vornamen_index
+    from scraper_lib._instrument import _get_instruments
+
+    instruments = _get_instruments()
+    before = instruments.snapshot()
+    report = dict()
+    parsed = None
+    try:
+        mtime = os.path.getmtime(file_loc)
+        with instruments.timer('read protocol'):
+            text = read_protocol(file_loc)
+        if text is None:
+            raise ValueError('no text')
+        with instruments.timer('parse protocol'):
+            parsed = parse_protocol(file_loc, text, _get_vornamen_index())
+        if parsed[0].protocol_nr == 'None/None':
+            raise ValueError('no protocol number')
+        instruments.count('contributions parsed', len(parsed[2]))
+    except Exception as e:
+        report['error'] = repr(e)
+        mtime = None
+        parsed = None
+    report['instruments'] = instruments.since(before)
+
+    return file_loc, mtime, parsed, report
+
+
+def _results(files, workers):
+    '''
+    Yields the results of _parse_file for all files, computed by a pool of
+    processes or, with workers=0, one after the other in this process.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers == 0:
+        for file_loc in files:
+            yield _parse_file(file_loc)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map keeps the protocols in order; chunks keep the overhead per
+        # protocol low
+        yield from pool.map(_parse_file, files, chunksize=4)
+
+
+def run(legislature, path=None, workers=None, batch_size=25,
+        force=False, index=True) -> int:
+    '''
+    Returns the number of protocols that failed.
+    '''
+    from scraper_lib._mdl_store import MdL_Store
+    from scraper_lib._speaker_resolver import SpeakerResolver
+    from scraper_lib._instrument import _get_instruments
+
+    instruments = _get_instruments()
+    path = path or PROTOCOL_LOC.format(legislature)
+    failed = 0
+    with MdL_Store() as store:
+        with instruments.timer('speaker index'):
+            resolver = SpeakerResolver(legislature, store)
+        stored = store.ingested_sources()
+        files = [file_loc for file_loc in _protocol_files(path)
+                 if force or stored.get(file_loc) !=
+                 os.path.getmtime(file_loc)]
+        print(f'{len(files)} protocols to read in {path}')
+
+        batch = list()
+        sessions = 0
+        contributions = 0
+        for file_loc, mtime, parsed, report in _results(files, workers):
+            if workers != 0:
+                instruments.merge(report['instruments'])
+            if parsed is None:
+                print(f'{file_loc}: failed, {report["error"]}')
+                failed += 1
+                continue
+            session = parsed[0]
+            if session.protocol_nr.split('/')[0] != str(legislature):
+                print(f'{file_loc}: protocol {session.protocol_nr} is not '
+                      f'of term {legislature}')
+            with instruments.timer('resolve speakers'):
+                for contribution in parsed[2]:
+                    contribution['key'] = \
+                        resolver.resolve(contribution['raw'])
+            batch.append((file_loc, mtime) + tuple(parsed))
+            if len(batch) >= batch_size:
+                with instruments.timer('store protocols'):
+                    contributions += store.write_sessions(batch)
+                sessions += len(batch)
+                batch = list()
+        if batch:
+            with instruments.timer('store protocols'):
+                contributions += store.write_sessions(batch)
+            sessions += len(batch)
+
+        print(f'term {legislature}: {sessions} protocols, '
+              f'{contributions} contributions stored, '
+              f'{len(resolver.cache)} speakers, '
+              f'{sum(1 for key in resolver.cache.values() if key)} '
+              f'resolved to MdLs, '
+              f'{store.count_contributions(legislature)} in the store')
+
+        if index:
+            from scraper_lib._fulltext_index import FulltextIndex
+
+            added, removed = FulltextIndex(store).update(workers=workers)
+            print(f'fulltext index: {added} contributions added, '
+                  f'{removed} removed')
+
+    return failed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Store the plenary protocols of a term.')
+    parser.add_argument('--term', type=int, required=True)
+    parser.add_argument('--dir', default=None,
+                        help=f'directory of the protocols, default '
+                             f'{PROTOCOL_LOC.format("TERM")}')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes, 0 for none')
+    parser.add_argument('--batch', type=int, default=25,
+                        help='protocols per transaction')
+    parser.add_argument('--force', action='store_true',
+                        help='read protocols stored before again')
+    parser.add_argument('--no-index', action='store_true',
+                        help="don't update the fulltext index")
+    args = parser.parse_args(argv)
+
+    from scraper_lib._instrument import _get_instruments
+
+    start = time.perf_counter()
+    failed = run(args.term, args.dir, args.workers, args.batch, args.force,
+                 index=not args.no_index)
+    print(f'done in {time.perf_counter() - start:.2f}s, {failed} failed')
+    print(_get_instruments().summary())
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,24 +1,138 @@
-def _make_list_of_cities():
-    with open('./scraper_lib/stadt_liste.txt', 'r') as fin:
+import os
+import re
+
+# stored with the pickled gazetteer; raise it whenever _Gazetteer changes
+GAZETTEER_VERSION = 2
+
+
+def _make_list_of_cities(file_loc='./scraper_lib/stadt_liste.txt'):
+    with open(file_loc, 'r') as fin:
         stadt_liste = fin.read()
 
-    list_of_cities = list()
+    # a dict keeps the order of insertion and dedupes in O(1)
+    cities = dict()
 
     for line in stadt_liste.split('\n'):
         if line.split(',')[-1] == 'Nordrhein-Westfalen':
             stadt = line.split(',')[1]
+            cities[stadt] = None
             if len(stadt.split(' ')) > 1:
-                if stadt not in list_of_cities:
-                    list_of_cities.append(stadt)
-                if stadt.split(' ')[0] not in list_of_cities:
-                    list_of_cities.append(stadt.split(' ')[0])
-            else:
-                if stadt not in list_of_cities:
-                    list_of_cities.append(stadt)
+                cities[stadt.split(' ')[0]] = None
+
+    return list(cities)
+
+
+class _Gazetteer:
+    '''
+    Cities of NRW with O(1) membership.
+    Multi-word names like "Bad Honnef" are found by their first word, which
+    points to all names starting with it (longest first). Hyphenated
+    compounds like "Rhein-Sieg-Kreis" or wards like
+    "Hochsauerlandkreis II – Soest III" are split into their parts.
+    '''
+    SEPARATORS = re.compile(r'\s*[-–—]\s*')
+
+    def __init__(self, cities):
+        self.cities = frozenset(cities)
+        compounds = dict()
+        for city in self.cities:
+            words = city.split(' ')
+            if len(words) > 1:
+                compounds.setdefault(words[0], list()).append(words)
+        self.compounds = {first: sorted(names, key=len, reverse=True)
+                          for first, names in compounds.items()}
+
+    def __contains__(self, word) -> bool:
+        return word in self.cities
+
+    def __iter__(self):
+        return iter(self.cities)
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def is_city(self, word) -> bool:
+        '''
+        True if word is a city or one of the parts of a hyphenated word is.
+        '''
+        if word in self.cities:
+            return True
+        for part in self.SEPARATORS.split(word):
+            if part in self.cities:
+                return True
+        return False
+
+    def match(self, text) -> str:
+        '''
+        Returns the longest city name text starts with, or None.
+        '''
+        words = text.split()
+        if not words:
+            return None
+        for name in self.compounds.get(words[0], []):
+            if words[:len(name)] == name:
+                return ' '.join(name)
+        if words[0] in self.cities:
+            return words[0]
+        return None
+
+    def cities_in(self, text) -> list:
+        '''
+        Returns the cities the parts of a (hyphenated) ward's name start with,
+        e.g. ['Soest'] for "Hochsauerlandkreis II – Soest III".
+        '''
+        cities = list()
+        for part in self.SEPARATORS.split(text):
+            city = self.match(part)
+            if city and city not in cities:
+                cities.append(city)
+        return cities
+
+
+_GAZETTEER = dict()
+
+
+def _get_gazetteer(file_loc='./scraper_lib/stadt_liste.txt',
+                   cache_loc='./data/cities.pickle'):
+    '''
+    Returns the gazetteer shared within this process. It is pickled to
+    cache_loc and rebuilt only when stadt_liste.txt or GAZETTEER_VERSION
+    have changed since.
+    '''
+    import pickle
+
+    mtime = os.path.getmtime(file_loc)
+    cached = _GAZETTEER.get(file_loc)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    gazetteer = None
+    try:
+        with open(cache_loc, 'rb') as fin:
+            version, stored_mtime, gazetteer = pickle.load(fin)
+        if (version, stored_mtime) != (GAZETTEER_VERSION, mtime):
+            gazetteer = None
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError,
+            AttributeError):
+        gazetteer = None
+
+    if gazetteer is None:
+        gazetteer = _Gazetteer(_make_list_of_cities(file_loc))
+        cache_dir = os.path.dirname(cache_loc)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # written aside and renamed, so a concurrent reader never loads a
+        # half written pickle
+        tmp_loc = f'{cache_loc}.{os.getpid()}.tmp'
+        with open(tmp_loc, 'wb') as fout:
+            pickle.dump((GAZETTEER_VERSION, mtime, gazetteer), fout,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_loc, cache_loc)
 
-    return list_of_cities
+    _GAZETTEER[file_loc] = (mtime, gazetteer)
+    return gazetteer
 
 
 if __name__ == '__main__':
-    list_of_cities = _make_list_of_cities(token=True)
+    list_of_cities = _make_list_of_cities()
     print(list_of_cities)
@@ -36,12 +36,70 @@ def _get_vornamenListe():
 
     vornamenListe = list()
     for name in namensListe.split('\n'):
-        if name:
+        # lines starting with '#' are the header written by namenScraper
+        if name and not name.startswith('#'):
             vornamenListe.append(name)
 
     return vornamenListe
 
 
+class _Vornamen_index:
+    '''
+    Process-wide lookup of first names built from vornamen.txt.
+    Exact matches are answered by a frozenset; hyphenated first names like
+    "Hans-Peter" are matched by their first or last part, which are looked up
+    in the same set (prefixes/suffixes of a hyphenated word).
+    '''
+    def __init__(self, file_loc):
+        self.file_loc = file_loc
+        self.mtime = None
+        self.names = frozenset()
+
+    def _load(self) -> None:
+        import os
+        mtime = os.path.getmtime(self.file_loc)
+        if mtime == self.mtime:
+            return
+        from scraper_lib._instrument import _get_instruments
+        with _get_instruments().timer('first name index load'):
+            with open(self.file_loc, 'r') as fin:
+                self.names = frozenset(
+                    line.strip() for line in fin
+                    if line.strip() and not line.startswith('#'))
+        self.mtime = mtime
+
+    def __contains__(self, word) -> bool:
+        return word in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def is_first_name(self, word) -> bool:
+        if word in self.names:
+            return True
+        elif '-' in word:
+            parts = word.split('-')
+            if parts[0] in self.names or parts[-1] in self.names:
+                return True
+        return False
+
+
+_VORNAMEN_INDEX = dict()
+
+
+def _get_vornamen_index(file_loc='./scraper_lib/vornamen.txt'):
+    '''
+    Returns the shared first name index for file_loc, built on first use and
+    rebuilt only if the file's mtime has changed since.
+    '''
+    index = _VORNAMEN_INDEX.get(file_loc)
+    if index is None:
+        index = _Vornamen_index(file_loc)
+        _VORNAMEN_INDEX[file_loc] = index
+    index._load()
+    return index
+
+
 if __name__ == '__main__':
     #vornamenListe = _get_vornamenListe()
     #print(vornamenListe)
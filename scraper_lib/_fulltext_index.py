@@ -0,0 +1,455 @@
+import re
+import heapq
+import math
+import functools
+from array import array
+
+from scraper_lib._instrument import _get_instruments
+from scraper_lib._mdl_store import _term_condition
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# the topic, details and tags of a contribution's agenda item are indexed
+# after its content, this far apart so no phrase spans both
+FIELD_GAP = 1000000
+# the postings of further terms of a query are looked up for the
+# candidates only if there are this many times fewer candidates than
+# documents with the term, otherwise all its postings are read
+CANDIDATE_LOOKUP = 8
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ft_terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT UNIQUE NOT NULL,
+    df INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ft_docs (
+    doc_id INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ft_postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_ft_postings_doc_id ON ft_postings (doc_id);
+'''
+
+STOPWORDS = frozenset('''
+aber alle allem allen aller alles als also am an andere anderem anderen
+anderer anderes auch auf aus bei bin bis bist da damit dann das dass dem
+den denn der des die dies diese diesem diesen dieser dieses doch dort du
+durch ein eine einem einen einer eines er es etwas für hat hatte hatten
+hier hin hinter ich ihm ihn ihr ihre im in ist jede jedem jeden jeder
+jedes jetzt kann man mit muss nach nicht noch nun nur ob oder ohne schon
+sehr sein seine sich sie sind so über um und uns unter vom von vor war
+waren was weil wenn wer wie wir wird wo zu zum zur
+'''.split())
+
+TOKEN = re.compile(r'\w+(?:-\w+)*')
+PHRASE = re.compile(r'"([^"]*)"|(\S+)')
+
+# CISTEM (Weissweiler, Fraser 2017), a stemmer for German
+GE_PREFIX = re.compile(r'^ge(.{4,})')
+DOUBLE = re.compile(r'(.)\1')
+UNDOUBLE = re.compile(r'(.)\*')
+SUFFIX_LONG = re.compile(r'(?:e[mr]|nd)$')
+SUFFIX_T = re.compile(r't$')
+SUFFIX_SHORT = re.compile(r'[esn]$')
+
+
+@functools.lru_cache(maxsize=500000)
+def _stem(word) -> str:
+    '''
+    Stems a lower case word: 'Schulgesetzes' and 'Schulgesetze' both
+    become 'schulgesetz'. Umlauts are folded ('Ärzte' -> 'arz').
+    Cached, the words of speeches repeat a lot.
+    '''
+    word = word.replace('ü', 'u').replace('ö', 'o').replace('ä', 'a')\
+        .replace('ß', 'ss')
+    word = GE_PREFIX.sub(r'\1', word)
+    word = word.replace('sch', '$').replace('ei', '%').replace('ie', '&')
+    word = DOUBLE.sub(r'\1*', word)
+    while len(word) > 3:
+        if len(word) > 5:
+            word, found = SUFFIX_LONG.subn('', word)
+            if found:
+                continue
+        word, found = SUFFIX_T.subn('', word)
+        if found:
+            continue
+        word, found = SUFFIX_SHORT.subn('', word)
+        if not found:
+            break
+    word = UNDOUBLE.sub(r'\1\1', word)
+    return word.replace('$', 'sch').replace('%', 'ei').replace('&', 'ie')
+
+
+def _tokens(text, offset=0):
+    '''
+    Yields (stem, position) of the words of text, stop words left out but
+    counted, so the positions of a phrase keep their distances.
+    '''
+    for position, word in enumerate(TOKEN.findall(text.lower())):
+        if word not in STOPWORDS:
+            yield _stem(word), position + offset
+
+
+def _query(text) -> list:
+    '''
+    Splits a query into clauses, each a list of (stem, distance to the
+    first word of the clause): "Land und Bund" Schule ->
+    [[('land', 0), ('bund', 2)], [('schul', 0)]]
+    '''
+    clauses = list()
+    for phrase, word in PHRASE.findall(text):
+        tokens = list(_tokens(phrase or word))
+        if tokens:
+            first = tokens[0][1]
+            clauses.append([(stem, position - first)
+                            for stem, position in tokens])
+    return clauses
+
+
+def _date_key(date) -> str:
+    '''
+    'dd.mm.yyyy', 'yyyy-mm-dd' or a datetime.date -> 'yyyymmdd'.
+    '''
+    if hasattr(date, 'strftime'):
+        return date.strftime('%Y%m%d')
+    if '.' in date:
+        day, month, year = date.split('.')
+        return f'{year}{int(month):02d}{int(day):02d}'
+    return date.replace('-', '')
+
+
+def _doc_postings(docs) -> list:
+    '''
+    Tokenizes docs, a list of (doc_id, content, text of agenda item).
+    Returns (doc_id, length, {stem: (tf, positions packed as array('I'))})
+    of every doc. Runs in worker processes, too.
+    '''
+    postings = list()
+    for doc_id, content, sub_text in docs:
+        positions = dict()
+        length = 0
+        for stem, position in _tokens(content or ''):
+            positions.setdefault(stem, array('I')).append(position)
+            length += 1
+        for stem, position in _tokens(sub_text or '', FIELD_GAP):
+            positions.setdefault(stem, array('I')).append(position)
+            length += 1
+        postings.append((doc_id, length,
+                         {stem: (len(packed), packed.tobytes())
+                          for stem, packed in positions.items()}))
+    return postings
+
+
+class FulltextIndex:
+    '''
+    Inverted index of the contributions of the MdL store, in the store's
+    database: terms with their document frequency, documents with their
+    length and per term and document the positions of the term, packed.
+    The postings of a term are stored together (WITHOUT ROWID, keyed by
+    term), so a query reads only the postings of its terms and never the
+    contributions' texts.
+    update() indexes the contributions added since the last update and
+    drops those that were replaced or deleted.
+    '''
+    def __init__(self, store):
+        self.store = store
+        self.conn = store.conn
+        self.conn.executescript(SCHEMA)
+
+    def _term_ids(self, terms) -> dict:
+        self.conn.executemany('INSERT OR IGNORE INTO ft_terms (term) '
+                              'VALUES (?)', [(term,) for term in terms])
+        term_ids = dict()
+        terms = list(terms)
+        for start in range(0, len(terms), 900):
+            chunk = terms[start:start + 900]
+            for row in self.conn.execute(
+                    'SELECT term, term_id FROM ft_terms WHERE term IN '
+                    f'({", ".join("?" for _ in chunk)})', chunk):
+                term_ids[row[0]] = row[1]
+        return term_ids
+
+    def _add(self, docs) -> None:
+        '''
+        Writes docs, a list of (doc_id, length, {stem: positions}) as
+        returned by _doc_postings.
+        '''
+        term_ids = self._term_ids({stem for _, _, positions in docs
+                                   for stem in positions})
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO ft_docs (doc_id, length) VALUES (?, ?)',
+            [(doc_id, length) for doc_id, length, _ in docs])
+        # in the order of the table's key, so pages are filled one by one
+        self.conn.executemany(
+            'INSERT INTO ft_postings (term_id, doc_id, tf, positions) '
+            'VALUES (?, ?, ?, ?)',
+            sorted((term_ids[stem], doc_id, tf, positions)
+                   for doc_id, _, doc_positions in docs
+                   for stem, (tf, positions) in doc_positions.items()))
+        df = dict()
+        for _, _, positions in docs:
+            for stem in positions:
+                df[stem] = df.get(stem, 0) + 1
+        self.conn.executemany(
+            'UPDATE ft_terms SET df = df + ? WHERE term_id = ?',
+            [(count, term_ids[stem]) for stem, count in df.items()])
+
+    def _remove(self, doc_ids) -> None:
+        for start in range(0, len(doc_ids), 900):
+            chunk = doc_ids[start:start + 900]
+            placeholders = ', '.join('?' for _ in chunk)
+            self.conn.execute(
+                'UPDATE ft_terms SET df = df - (SELECT COUNT(*) FROM '
+                f'ft_postings p WHERE p.term_id = ft_terms.term_id AND '
+                f'p.doc_id IN ({placeholders})) WHERE term_id IN (SELECT '
+                f'term_id FROM ft_postings WHERE doc_id IN ({placeholders}))',
+                chunk + chunk)
+            self.conn.execute(f'DELETE FROM ft_postings WHERE doc_id IN '
+                              f'({placeholders})', chunk)
+            self.conn.execute(f'DELETE FROM ft_docs WHERE doc_id IN '
+                              f'({placeholders})', chunk)
+
+    def _batches(self, doc_ids, batch_size):
+        '''
+        Yields lists of (doc_id, content, text of agenda item), reading the
+        texts batch by batch, never all at once.
+        '''
+        for start in range(0, len(doc_ids), batch_size):
+            chunk = doc_ids[start:start + batch_size]
+            rows = list()
+            for offset in range(0, len(chunk), 900):
+                part = chunk[offset:offset + 900]
+                rows.extend(self.conn.execute(
+                    'SELECT c.contri_id, c.content, s.topic, s.details, '
+                    's.tags FROM contributions c LEFT JOIN session_subs s '
+                    'ON s.protocol_nr = c.protocol_nr AND s.seq = c.sub_seq '
+                    f'WHERE c.contri_id IN ({", ".join("?" for _ in part)})',
+                    part))
+            yield [(row[0], row[1], ' '.join(text for text in row[2:]
+                                               if text))
+                   for row in rows]
+
+    def _postings_of_batches(self, batches, workers):
+        '''
+        Yields _doc_postings of every batch, computed by a pool of processes
+        (at most two batches per process at a time) or, with workers=0, in
+        this process.
+        '''
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+        from collections import deque
+
+        if workers == 0:
+            for batch in batches:
+                yield _doc_postings(batch)
+            return
+
+        in_flight = 2 * (workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(_doc_postings, batch))
+                if len(pending) >= in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def update(self, batch_size=1000, workers=None) -> tuple:
+        '''
+        Brings the index up to date with the contributions of the store,
+        one transaction per batch_size contributions. The texts are
+        tokenized by workers processes (0 for none).
+        Returns the number of contributions indexed and removed.
+        '''
+        instruments = _get_instruments()
+        with self.conn:
+            stale = [row[0] for row in self.conn.execute(
+                'SELECT doc_id FROM ft_docs WHERE doc_id NOT IN '
+                '(SELECT contri_id FROM contributions)')]
+            self._remove(stale)
+
+        doc_ids = [row[0] for row in self.conn.execute(
+            'SELECT contri_id FROM contributions WHERE contri_id NOT IN '
+            '(SELECT doc_id FROM ft_docs) ORDER BY contri_id')]
+        added = 0
+        batches = self._batches(doc_ids, batch_size)
+        for docs in self._postings_of_batches(batches, workers):
+            with instruments.timer('index contributions'), self.conn:
+                self._add(docs)
+            added += len(docs)
+        instruments.count('contributions indexed', added)
+
+        return added, len(stale)
+
+    def _stats(self) -> tuple:
+        count, total = self.conn.execute(
+            'SELECT COUNT(*), TOTAL(length) FROM ft_docs').fetchone()
+        return count, (total / count if count else 0.0)
+
+    def _postings(self, term_id, positions, doc_ids=None) -> dict:
+        '''
+        doc_id -> (tf, positions or None) of a term, for doc_ids or all
+        docs. The positions are read only if asked for.
+        '''
+        sql = 'SELECT doc_id, tf{} FROM ft_postings WHERE term_id = ?'.format(
+            ', positions' if positions else '')
+        if doc_ids is None:
+            rows = list(self.conn.execute(sql, (term_id,)))
+        else:
+            doc_ids = sorted(doc_ids)
+            rows = list()
+            for start in range(0, len(doc_ids), 900):
+                chunk = doc_ids[start:start + 900]
+                rows.extend(self.conn.execute(
+                    sql + f' AND doc_id IN ({", ".join("?" for _ in chunk)})',
+                    [term_id] + chunk))
+        if positions:
+            return {row[0]: (row[1], row[2]) for row in rows}
+        return {row[0]: (row[1], None) for row in rows}
+
+    def _first_postings(self, term_id, positions, conditions,
+                        params) -> tuple:
+        '''
+        The postings of the rarest term of a query for the contributions
+        that pass the filters, and the lengths of their documents.
+        '''
+        sql = 'SELECT p.doc_id, p.tf, d.length{} FROM ft_postings p ' \
+            'JOIN ft_docs d ON d.doc_id = p.doc_id'.format(
+                ', p.positions' if positions else '')
+        if conditions:
+            sql += ' JOIN contributions c ON c.contri_id = p.doc_id'
+        sql += ' WHERE p.term_id = ?' + ''.join(
+            f' AND {condition}' for condition in conditions)
+        postings = dict()
+        lengths = dict()
+        for row in self.conn.execute(sql, [term_id] + params):
+            postings[row[0]] = (row[1], row[3] if positions else None)
+            lengths[row[0]] = row[2]
+        return postings, lengths
+
+    @staticmethod
+    def _conditions(legislature, party, speaker, key, date_from,
+                    date_to) -> tuple:
+        conditions = list()
+        params = list()
+        if legislature is not None:
+            condition, terms = _term_condition(legislature, 'c.legislature')
+            conditions.append(condition)
+            params.extend(terms)
+        for column, value in [('party', party), ('last_name', speaker),
+                              ('key', key)]:
+            if value is not None:
+                conditions.append(f'c.{column} = ?')
+                params.append(value)
+        date = "substr(c.cal_date, 7, 4) || substr(c.cal_date, 4, 2) || " \
+            "substr(c.cal_date, 1, 2)"
+        if date_from is not None:
+            conditions.append(f'{date} >= ?')
+            params.append(_date_key(date_from))
+        if date_to is not None:
+            conditions.append(f'{date} <= ?')
+            params.append(_date_key(date_to))
+        return conditions, params
+
+    @staticmethod
+    def _has_phrase(clause, postings, doc_id) -> bool:
+        starts = set(array('I', postings[clause[0][0]][doc_id][1]))
+        for stem, distance in clause[1:]:
+            positions = set(array('I', postings[stem][doc_id][1]))
+            starts = {start for start in starts
+                      if start + distance in positions}
+            if not starts:
+                return False
+        return True
+
+    def search(self, query, legislature=None, party=None, speaker=None,
+               key=None, date_from=None, date_to=None, limit=20) -> list:
+        '''
+        Returns (score, row) of the best contributions for query, best
+        first; row holds everything of the contribution except its content.
+        Every word and every "quoted phrase" of query must occur (stemmed,
+        so 'Schulen' finds 'Schule'). Results can be limited to a term, a
+        range or a list of terms, party, speaker (last name), key (MdL key)
+        and dates from and to ('dd.mm.yyyy', 'yyyy-mm-dd' or
+        datetime.date).
+        '''
+        with _get_instruments().timer('fulltext search'):
+            clauses = _query(query)
+            stems = {stem for clause in clauses for stem, _ in clause}
+            in_phrases = {stem for clause in clauses if len(clause) > 1
+                          for stem, _ in clause}
+            if not stems:
+                return []
+            terms = dict()
+            chunk = list(stems)
+            for row in self.conn.execute(
+                    'SELECT term, term_id, df FROM ft_terms WHERE term '
+                    f'IN ({", ".join("?" for _ in chunk)})', chunk):
+                terms[row[0]] = (row[1], row[2])
+            if len(terms) < len(stems) or not all(df for _, df in
+                                                  terms.values()):
+                return []
+
+            # the rarest term (filtered) first, the others only for its
+            # documents
+            conditions, params = self._conditions(
+                legislature, party, speaker, key, date_from, date_to)
+            ordered = sorted(stems, key=lambda stem: terms[stem][1])
+            postings = dict()
+            postings[ordered[0]], lengths = self._first_postings(
+                terms[ordered[0]][0], ordered[0] in in_phrases, conditions,
+                params)
+            candidates = set(postings[ordered[0]])
+            for stem in ordered[1:]:
+                if not candidates:
+                    return []
+                lookup = candidates if len(candidates) * CANDIDATE_LOOKUP \
+                    < terms[stem][1] else None
+                postings[stem] = self._postings(terms[stem][0],
+                                                stem in in_phrases, lookup)
+                candidates &= postings[stem].keys()
+
+            phrases = [clause for clause in clauses if len(clause) > 1]
+            candidates = [doc_id for doc_id in candidates
+                          if all(self._has_phrase(clause, postings, doc_id)
+                                 for clause in phrases)]
+            if not candidates:
+                return []
+
+            count, average = self._stats()
+            idf = {stem: math.log(1 + (count - terms[stem][1] + 0.5) /
+                                  (terms[stem][1] + 0.5)) for stem in stems}
+            weights = [(idf[stem], postings[stem]) for stem in stems]
+            scores = list()
+            for doc_id in candidates:
+                norm = K1 * (1 - B + B * lengths[doc_id] / average)
+                score = 0.0
+                for weight, stem_postings in weights:
+                    tf = stem_postings[doc_id][0]
+                    score += weight * tf * (K1 + 1) / (tf + norm)
+                scores.append((score, doc_id))
+            best = heapq.nlargest(limit, scores)
+
+            columns = ', '.join(column for column in self._columns()
+                                if column != 'content')
+            found = {row['contri_id']: row for row in self.conn.execute(
+                f'SELECT {columns} FROM contributions WHERE contri_id IN '
+                f'({", ".join("?" for _ in best)})',
+                [doc_id for _, doc_id in best])}
+            return [(score, found[doc_id]) for score, doc_id in best]
+
+    def _columns(self) -> list:
+        return [row[1] for row in
+                self.conn.execute('PRAGMA table_info(contributions)')]
+
+    def terms(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM ft_terms '
+                                 'WHERE df > 0').fetchone()[0]
@@ -0,0 +1,126 @@
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+
+def _accept_encoding() -> str:
+    '''
+    requests decodes brotli only if one of the brotli packages is installed.
+    '''
+    for module in ['brotli', 'brotlicffi']:
+        try:
+            __import__(module)
+            return 'gzip, deflate, br'
+        except ImportError:
+            pass
+    return 'gzip, deflate'
+
+
+class TokenBucket:
+    '''
+    Allows rate requests per second on average and bursts of up to burst
+    requests. acquire() blocks until a token is available.
+    '''
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        '''Returns the seconds waited.'''
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst,
+                                  self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class HttpClient:
+    '''
+    The one way to the network for the page cache, the revision check, the
+    ward resolver (through the page cache), the prefetcher and namenScraper.
+    Keeps connections alive in a pooled session, limits the requests per
+    host with a token bucket each and sends one of the header sets of
+    data.sourceBox with every request (randomly chosen), plus
+    Accept-Encoding.
+    '''
+    def __init__(self, rate=5.0, burst=10, pool_size=16):
+        self.rate = rate
+        self.burst = burst
+        self.pool_size = pool_size
+        self.buckets = dict()
+        self.lock = threading.Lock()
+        self.session = None
+        self.header_sets = None
+        self.accept_encoding = _accept_encoding()
+
+    def _get_session(self):
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                      pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self.session = session
+            return self.session
+
+    def _bucket(self, URL) -> TokenBucket:
+        host = urlsplit(URL).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def _headers(self, headers=None) -> dict:
+        '''
+        A random header set of data.sourceBox, Accept-Encoding and headers
+        (which win).
+        '''
+        if self.header_sets is None:
+            from data.sourceBox import headers as header_sets
+            self.header_sets = list(header_sets.values())
+        request_headers = dict(random.choice(self.header_sets))
+        request_headers['Accept-Encoding'] = self.accept_encoding
+        request_headers.update(headers or {})
+        return request_headers
+
+    def get(self, URL, headers=None, timeout=30, **kwargs):
+        '''
+        requests.get through the pool and the host's rate limit.
+        '''
+        from scraper_lib._instrument import _get_instruments
+
+        waited = self._bucket(URL).acquire()
+        if waited:
+            _get_instruments().add_time('rate limit wait', waited)
+        return self._get_session().get(URL, headers=self._headers(headers),
+                                       timeout=timeout, **kwargs)
+
+
+_HTTP_CLIENT = None
+
+
+def _get_http_client() -> HttpClient:
+    '''
+    Returns the client shared within this process, so all callers share
+    its connections and rate limits.
+    '''
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = HttpClient()
+    return _HTTP_CLIENT
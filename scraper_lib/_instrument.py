@@ -0,0 +1,132 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Instruments:
+    '''
+    Counters and timers of the hot paths (fetching, parsing, extracting).
+    Counting costs a dict update under a lock, so the hooks stay in place
+    all the time; summary() shows where a run spent its time.
+    Worker processes have their own instruments, what they counted
+    since(snapshot) can be merged into the main process' ones.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = dict()
+        self.timers = dict()
+
+    def count(self, name, n=1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds) -> None:
+        with self.lock:
+            calls, total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = (calls + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'counters': dict(self.counters),
+                    'timers': dict(self.timers)}
+
+    def since(self, snapshot) -> dict:
+        '''
+        Returns what has been counted and timed since snapshot was taken.
+        '''
+        now = self.snapshot()
+        counters = {name: n - snapshot['counters'].get(name, 0)
+                    for name, n in now['counters'].items()}
+        timers = dict()
+        for name, (calls, total) in now['timers'].items():
+            old_calls, old_total = snapshot['timers'].get(name, (0, 0.0))
+            timers[name] = (calls - old_calls, total - old_total)
+        return {'counters': {name: n for name, n in counters.items() if n},
+                'timers': {name: timer for name, timer in timers.items()
+                           if timer[0]}}
+
+    def merge(self, snapshot) -> None:
+        with self.lock:
+            for name, n in snapshot['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for name, (calls, total) in snapshot['timers'].items():
+                old_calls, old_total = self.timers.get(name, (0, 0.0))
+                self.timers[name] = (old_calls + calls, old_total + total)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = dict()
+            self.timers = dict()
+
+    def summary(self) -> str:
+        snapshot = self.snapshot()
+        lines = list()
+        if snapshot['timers']:
+            lines.append(f'{"timer":<32} {"calls":>8} {"total s":>10} '
+                         f'{"mean ms":>10}')
+            for name, (calls, total) in sorted(snapshot['timers'].items(),
+                                               key=lambda item: -item[1][1]):
+                lines.append(f'{name:<32} {calls:>8} {total:>10.3f} '
+                             f'{1000 * total / calls:>10.3f}')
+        if snapshot['counters']:
+            lines.append(f'{"counter":<32} {"count":>8}')
+            for name, n in sorted(snapshot['counters'].items()):
+                lines.append(f'{name:<32} {n:>8}')
+        return '\n'.join(lines)
+
+
+_INSTRUMENTS = Instruments()
+
+
+def _get_instruments() -> Instruments:
+    '''
+    Returns the instruments shared within this process.
+    '''
+    return _INSTRUMENTS
+
+
+@contextmanager
+def _profiled(mode=None, limit=25):
+    '''
+    Runs the body of the with statement under a profiler and prints its
+    report afterwards. mode is None (no profiling), 'cprofile' or
+    'pyinstrument' (falls back to cProfile if pyinstrument isn't installed).
+    '''
+    if mode is None:
+        yield
+        return
+
+    if mode == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print('pyinstrument is not installed, using cProfile')
+            mode = 'cprofile'
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                print(profiler.output_text(unicode=True, color=False))
+            return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(limit)
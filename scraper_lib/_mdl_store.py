@@ -0,0 +1,571 @@
+import os
+import json
+import sqlite3
+
+DB_LOC = './data/mdls.db'
+SHELVE_PATH = './data/shelves/'
+
+COLUMNS = ['key', 'legislature', 'first_name', 'last_name', 'middle_name_1',
+           'middle_name_2', 'maiden_name', 'peer_title', 'peer_preposition',
+           'academic_title', 'gender', 'electoral_ward', 'ward_no',
+           'voter_count', 'minister', 'party', 'parties', 'offices',
+           'parl_pres', 'parl_vicePres']
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS mdls (
+    key TEXT PRIMARY KEY,
+    legislature INTEGER NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    middle_name_1 TEXT,
+    middle_name_2 TEXT,
+    maiden_name TEXT,
+    peer_title TEXT,
+    peer_preposition TEXT,
+    academic_title TEXT,
+    gender TEXT,
+    electoral_ward TEXT,
+    ward_no INTEGER,
+    voter_count INTEGER,
+    minister TEXT,
+    party TEXT,
+    parties TEXT,
+    offices TEXT,
+    parl_pres INTEGER,
+    parl_vicePres INTEGER,
+    person_id INTEGER REFERENCES persons (person_id)
+);
+CREATE TABLE IF NOT EXISTS persons (
+    person_id INTEGER PRIMARY KEY,
+    person_key TEXT UNIQUE NOT NULL,
+    first_name TEXT,
+    last_name TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_mdls_last_name ON mdls (last_name);
+CREATE INDEX IF NOT EXISTS ix_mdls_first_name ON mdls (first_name);
+CREATE INDEX IF NOT EXISTS ix_mdls_electoral_ward ON mdls (electoral_ward);
+CREATE INDEX IF NOT EXISTS ix_mdls_party ON mdls (party);
+CREATE INDEX IF NOT EXISTS ix_mdls_legislature ON mdls (legislature);
+CREATE INDEX IF NOT EXISTS ix_mdls_person_id ON mdls (person_id);
+CREATE INDEX IF NOT EXISTS ix_persons_last_name ON persons (last_name);
+CREATE TABLE IF NOT EXISTS mdl_parties (
+    key TEXT NOT NULL REFERENCES mdls (key) ON DELETE CASCADE,
+    party TEXT NOT NULL,
+    PRIMARY KEY (key, party)
+);
+CREATE INDEX IF NOT EXISTS ix_mdl_parties_party ON mdl_parties (party);
+CREATE VIRTUAL TABLE IF NOT EXISTS mdls_search
+    USING fts5(key UNINDEXED, content, tokenize='trigram');
+CREATE TABLE IF NOT EXISTS sessions (
+    protocol_nr TEXT PRIMARY KEY,
+    legislature INTEGER NOT NULL,
+    session_no INTEGER NOT NULL,
+    cal_date TEXT,
+    pages TEXT,
+    source TEXT,
+    mtime REAL
+);
+CREATE TABLE IF NOT EXISTS session_subs (
+    protocol_nr TEXT NOT NULL REFERENCES sessions (protocol_nr)
+        ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    url_subsession TEXT,
+    topic TEXT,
+    details TEXT,
+    page_from TEXT,
+    page_to TEXT,
+    result TEXT,
+    classification TEXT,
+    tags TEXT,
+    PRIMARY KEY (protocol_nr, seq)
+);
+CREATE TABLE IF NOT EXISTS contributions (
+    -- AUTOINCREMENT: ids of replaced contributions are never reused, the
+    -- fulltext index relies on it (see _fulltext_index)
+    contri_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    protocol_nr TEXT NOT NULL REFERENCES sessions (protocol_nr)
+        ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    sub_seq INTEGER,
+    legislature INTEGER NOT NULL,
+    session_no INTEGER NOT NULL,
+    cal_date TEXT,
+    speaker TEXT,
+    last_name TEXT,
+    first_name TEXT,
+    academic_title TEXT,
+    peer_title TEXT,
+    peer_preposition TEXT,
+    party TEXT,
+    office TEXT,
+    type_of_contri TEXT,
+    page_from TEXT,
+    page_to TEXT,
+    pages TEXT,
+    URL_salt TEXT,
+    content TEXT,
+    key TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_sessions_legislature ON sessions (legislature);
+CREATE INDEX IF NOT EXISTS ix_contributions_protocol_nr
+    ON contributions (protocol_nr, seq);
+CREATE INDEX IF NOT EXISTS ix_contributions_legislature
+    ON contributions (legislature);
+CREATE INDEX IF NOT EXISTS ix_contributions_last_name
+    ON contributions (last_name);
+CREATE INDEX IF NOT EXISTS ix_contributions_party ON contributions (party);
+CREATE INDEX IF NOT EXISTS ix_contributions_key ON contributions (key);
+'''
+
+CONTRI_COLUMNS = ['protocol_nr', 'seq', 'sub_seq', 'legislature',
+                  'session_no', 'cal_date', 'speaker', 'last_name',
+                  'first_name', 'academic_title', 'peer_title',
+                  'peer_preposition', 'party', 'office', 'type_of_contri',
+                  'page_from', 'page_to', 'pages', 'URL_salt', 'content',
+                  'key']
+
+
+def _mdl_key(mdl) -> str:
+    return f'{mdl.last_name}_{mdl.first_name}_{mdl.electoral_ward}_{mdl.legislature}'
+
+
+def _person_key(mdl) -> str:
+    '''
+    Identifies a person across terms: the MdL key without electoral ward and
+    legislature, which both may change from one term to the next.
+    '''
+    parts = [mdl.last_name, mdl.first_name, mdl.peer_preposition]
+    return '_'.join((part or '').casefold() for part in parts)
+
+
+def _term_condition(legislature, column='mdls.legislature') -> tuple:
+    '''
+    Returns the sql condition on column and its parameters for a single
+    legislature, a range of legislatures or a list or tuple of legislatures
+    (which need not be consecutive).
+    '''
+    if isinstance(legislature, range) and legislature.step == 1:
+        if not legislature:
+            return '0', []
+        return f'{column} BETWEEN ? AND ?', [legislature[0], legislature[-1]]
+    if isinstance(legislature, (range, list, tuple)):
+        terms = sorted({int(term) for term in legislature})
+        if not terms:
+            return '0', []
+        return f'{column} IN ({", ".join("?" for _ in terms)})', terms
+    return f'{column} = ?', [int(legislature)]
+
+
+def _term_clause(legislature) -> tuple:
+    '''
+    _term_condition of the MdLs, to be appended to a WHERE clause.
+    '''
+    condition, params = _term_condition(legislature)
+    return f' AND {condition}', params
+
+
+def _none_if_unknown(value):
+    # ward_no and voter_count default to the string 'None'
+    if value == 'None':
+        return None
+    return value
+
+
+class MdL_Store:
+    '''
+    SQLite store of MdLs, one row per MdL and term, with indexes on names,
+    electoral ward, party and legislature and a trigram index for substring
+    search. MdLs are stored column by column, so a query only builds the
+    MdL objects it returns.
+    All terms share one database. The rows of the same person in different
+    terms point to one entry of the persons table (see _person_key).
+    '''
+    def __init__(self, db_loc=DB_LOC):
+        db_dir = os.path.dirname(db_loc)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.db_loc = db_loc
+        self.conn = sqlite3.connect(db_loc)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self._create()
+
+    def _create(self) -> None:
+        columns = [row['name'] for row in
+                   self.conn.execute('PRAGMA table_info(mdls)')]
+        if columns and 'person_id' not in columns:
+            # databases written before persons were introduced
+            self.conn.execute('ALTER TABLE mdls ADD COLUMN person_id INTEGER')
+        sql = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' "
+            "AND name = 'contributions'").fetchone()
+        if sql and 'AUTOINCREMENT' not in sql[0].upper():
+            # databases written before contri_id was AUTOINCREMENT: the table
+            # is set aside and copied into one created by SCHEMA
+            with self.conn:
+                self.conn.execute('ALTER TABLE contributions '
+                                  'RENAME TO contributions_rowid')
+                for row in self.conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'index' "
+                        "AND tbl_name = 'contributions_rowid' "
+                        "AND sql IS NOT NULL").fetchall():
+                    self.conn.execute(f'DROP INDEX {row[0]}')
+        self.conn.executescript(SCHEMA)
+        if self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = 'contributions_rowid'").fetchone():
+            contri_columns = ', '.join(['contri_id'] + CONTRI_COLUMNS)
+            with self.conn:
+                self.conn.execute(
+                    f'INSERT INTO contributions ({contri_columns}) '
+                    f'SELECT {contri_columns} FROM contributions_rowid '
+                    'ORDER BY contri_id')
+                self.conn.execute('DROP TABLE contributions_rowid')
+                # ids may have been reused before, so the fulltext index
+                # can't be trusted; FulltextIndex.update() builds it anew
+                for table in ['ft_postings', 'ft_docs', 'ft_terms']:
+                    self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+        if columns and 'person_id' not in columns:
+            with self.conn:
+                for row in self.conn.execute('SELECT * FROM mdls').fetchall():
+                    key = row['key']
+                    person_id = self._person_id(self._to_record(row))
+                    self.conn.execute(
+                        'UPDATE mdls SET person_id = ? WHERE key = ?',
+                        (person_id, key))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _row(self, key, mdl) -> tuple:
+        return (key, int(mdl.legislature), mdl.first_name, mdl.last_name,
+                mdl.middle_name_1, mdl.middle_name_2, mdl.maiden_name,
+                mdl.peer_title, mdl.peer_preposition, mdl.academic_title,
+                mdl.gender, mdl.electoral_ward, _none_if_unknown(mdl.ward_no),
+                _none_if_unknown(mdl.voter_count), mdl.minister, mdl.party,
+                json.dumps(mdl.parties, ensure_ascii=False),
+                json.dumps(mdl.offices, ensure_ascii=False),
+                int(bool(mdl.parl_pres)), int(bool(mdl.parl_vicePres)))
+
+    def _person_id(self, mdl) -> int:
+        person_key = _person_key(mdl)
+        self.conn.execute(
+            'INSERT OR IGNORE INTO persons (person_key, first_name, last_name)'
+            ' VALUES (?, ?, ?)', (person_key, mdl.first_name, mdl.last_name))
+        return self.conn.execute(
+            'SELECT person_id FROM persons WHERE person_key = ?',
+            (person_key,)).fetchone()[0]
+
+    def _insert(self, key, mdl) -> None:
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        self.conn.execute('DELETE FROM mdls_search WHERE key = ?', (key,))
+        self.conn.execute('DELETE FROM mdl_parties WHERE key = ?', (key,))
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO mdls ({", ".join(COLUMNS)}, person_id) '
+            f'VALUES ({placeholders}, ?)',
+            self._row(key, mdl) + (self._person_id(mdl),))
+        parties = set(mdl.parties)
+        if mdl.party:
+            parties.add(mdl.party)
+        self.conn.executemany(
+            'INSERT INTO mdl_parties (key, party) VALUES (?, ?)',
+            [(key, party) for party in sorted(parties)])
+        self.conn.execute(
+            'INSERT INTO mdls_search (key, content) VALUES (?, ?)',
+            (key, key))
+
+    def write(self, key, mdl) -> None:
+        with self.conn:
+            self._insert(key, mdl)
+
+    def write_many(self, items) -> int:
+        '''
+        Writes (key, mdl) pairs in a single transaction.
+        Returns the number of MdLs written.
+        '''
+        count = 0
+        with self.conn:
+            for key, mdl in items:
+                self._insert(key, mdl)
+                count += 1
+        return count
+
+    def write_term(self, legislature, mdls) -> int:
+        '''
+        Replaces all MdLs of a term with mdls in a single transaction.
+        Returns the number of MdLs written.
+        '''
+        count = 0
+        with self.conn:
+            keys = [row[0] for row in self.conn.execute(
+                'SELECT key FROM mdls WHERE legislature = ?',
+                (int(legislature),))]
+            for key in keys:
+                self.conn.execute('DELETE FROM mdls_search WHERE key = ?',
+                                  (key,))
+                self.conn.execute('DELETE FROM mdl_parties WHERE key = ?',
+                                  (key,))
+            self.conn.execute('DELETE FROM mdls WHERE legislature = ?',
+                              (int(legislature),))
+            for mdl in mdls:
+                self._insert(_mdl_key(mdl), mdl)
+                count += 1
+        return count
+
+    def _to_record(self, row):
+        from person import MdL_record
+
+        return MdL_record(row['legislature'], row['first_name'],
+                          row['last_name'], row['middle_name_1'],
+                          row['middle_name_2'], row['maiden_name'],
+                          row['peer_title'], row['peer_preposition'],
+                          row['academic_title'], row['gender'],
+                          row['electoral_ward'], row['ward_no'],
+                          row['voter_count'], row['minister'], row['party'],
+                          json.loads(row['parties']),
+                          json.loads(row['offices']), row['parl_pres'],
+                          row['parl_vicePres'])
+
+    def _to_mdl(self, row):
+        return self._to_record(row).to_mdl()
+
+    def _query(self, sql, params=()) -> list:
+        return [(row['key'], self._to_mdl(row))
+                for row in self.conn.execute(sql, params)]
+
+    def count(self, legislature=None) -> int:
+        if legislature is None:
+            sql, params = 'SELECT COUNT(*) FROM mdls', ()
+        else:
+            sql, params = 'SELECT COUNT(*) FROM mdls WHERE legislature = ?',\
+                (int(legislature),)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def mdls(self, legislature) -> list:
+        '''Returns (key, mdl) pairs of all MdLs of a term.'''
+        return self._query(
+            'SELECT * FROM mdls WHERE legislature = ? ORDER BY rowid',
+            (int(legislature),))
+
+    def records(self, legislature) -> list:
+        '''
+        Returns (key, MdL_record) pairs of all MdLs of a term, for callers
+        that keep many of them and don't need the MdL objects.
+        '''
+        return [(row['key'], self._to_record(row)) for row in
+                self.conn.execute('SELECT * FROM mdls WHERE legislature = ? '
+                                  'ORDER BY rowid', (int(legislature),))]
+
+    def search(self, identifier, legislature=None) -> list:
+        '''
+        Returns (key, mdl) pairs whose key (last name, first name, electoral
+        ward, legislature) contains identifier.
+        '''
+        if len(identifier) >= 3:
+            # the trigram index answers substrings of three or more chars
+            sql = ('SELECT mdls.* FROM mdls_search '
+                   'JOIN mdls ON mdls.key = mdls_search.key '
+                   'WHERE mdls_search MATCH ?')
+            params = ['"' + identifier.replace('"', '""') + '"']
+        else:
+            sql = 'SELECT mdls.* FROM mdls WHERE instr(mdls.key, ?) > 0'
+            params = [identifier]
+        if legislature is not None:
+            clause, term_params = _term_clause(legislature)
+            sql += clause
+            params.extend(term_params)
+        return self._query(sql + ' ORDER BY mdls.rowid', params)
+
+    def of_party(self, party, legislature=None) -> list:
+        '''
+        Returns (key, mdl) pairs of all MdLs who were members of party,
+        in one legislature or a range of legislatures.
+        '''
+        sql = ('SELECT mdls.* FROM mdl_parties '
+               'JOIN mdls ON mdls.key = mdl_parties.key '
+               'WHERE mdl_parties.party = ?')
+        params = [party]
+        if legislature is not None:
+            clause, term_params = _term_clause(legislature)
+            sql += clause
+            params.extend(term_params)
+        return self._query(sql + ' ORDER BY mdls.legislature, mdls.rowid',
+                           params)
+
+    def persons(self, last_name, first_name=None) -> list:
+        '''
+        Returns (person_id, first_name, last_name) of all persons with that
+        name.
+        '''
+        sql = 'SELECT * FROM persons WHERE last_name = ?'
+        params = [last_name]
+        if first_name is not None:
+            sql += ' AND first_name = ?'
+            params.append(first_name)
+        return [(row['person_id'], row['first_name'], row['last_name'])
+                for row in self.conn.execute(sql, params)]
+
+    def terms_of(self, person_id, legislature=None) -> list:
+        '''
+        Returns (key, mdl) pairs of every term the person served, optionally
+        limited to one legislature or a range of legislatures.
+        '''
+        sql = 'SELECT mdls.* FROM mdls WHERE mdls.person_id = ?'
+        params = [person_id]
+        if legislature is not None:
+            clause, term_params = _term_clause(legislature)
+            sql += clause
+            params.extend(term_params)
+        return self._query(sql + ' ORDER BY mdls.legislature', params)
+
+    def electoral_wards(self) -> list:
+        '''Returns the distinct electoral wards of all stored MdLs.'''
+        return [row[0] for row in self.conn.execute(
+            'SELECT DISTINCT electoral_ward FROM mdls '
+            'WHERE electoral_ward IS NOT NULL ORDER BY electoral_ward')]
+
+    def mdls_between(self, first_term, last_term) -> list:
+        '''Returns (key, mdl) pairs of all MdLs of terms first to last.'''
+        return self._query(
+            'SELECT * FROM mdls WHERE legislature BETWEEN ? AND ? '
+            'ORDER BY legislature, rowid', (int(first_term), int(last_term)))
+
+    def _contri_row(self, legislature, session_no, cal_date,
+                    contribution) -> tuple:
+        contri = contribution['contri']
+        speaker = contribution['speaker']
+        return (contri.protocol_nr, contribution['seq'], contribution['sub'],
+                legislature, session_no, cal_date, contribution['raw'],
+                speaker.last_name, contribution['first_name'],
+                speaker.academic_title, speaker.peer_title,
+                speaker.peer_preposition, contri.party or None,
+                speaker.minister, contri.type_of_contri, contri.page_from,
+                contri.page_to, contri.pages, contri.URL_salt, contri.content,
+                contribution.get('key'))
+
+    def write_sessions(self, batch) -> int:
+        '''
+        Writes a batch of parsed protocols in a single transaction. batch
+        holds (source, mtime, session, subs, contributions) as returned by
+        _protocol_parser.parse_protocol plus the file and its mtime; the
+        rows of a protocol stored before are replaced. A contribution's
+        'key' (see _speaker_resolver) is stored if it has one.
+        Returns the number of contributions written.
+        '''
+        placeholders = ', '.join('?' for _ in CONTRI_COLUMNS)
+        count = 0
+        with self.conn:
+            for source, mtime, session, subs, contributions in batch:
+                protocol_nr = session.protocol_nr
+                legislature, session_no = \
+                    (int(nr) for nr in protocol_nr.split('/'))
+                self.conn.execute(
+                    'DELETE FROM contributions WHERE protocol_nr = ?',
+                    (protocol_nr,))
+                self.conn.execute(
+                    'DELETE FROM session_subs WHERE protocol_nr = ?',
+                    (protocol_nr,))
+                pages = contributions[0]['contri'].pages \
+                    if contributions else ''
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO sessions (protocol_nr, '
+                    'legislature, session_no, cal_date, pages, source, mtime)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (protocol_nr, legislature, session_no, session.cal_date,
+                     pages, source, mtime))
+                self.conn.executemany(
+                    'INSERT INTO session_subs (protocol_nr, seq, '
+                    'url_subsession, topic, details, page_from, page_to, '
+                    'result, classification, tags) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(protocol_nr, seq, sub.url_subsession, sub.topic,
+                      sub.details, sub.page_from, sub.page_to, sub.result,
+                      sub.classification,
+                      json.dumps(sub.tags, ensure_ascii=False))
+                     for seq, sub in enumerate(subs)])
+                self.conn.executemany(
+                    f'INSERT INTO contributions ({", ".join(CONTRI_COLUMNS)})'
+                    f' VALUES ({placeholders})',
+                    [self._contri_row(legislature, session_no,
+                                      session.cal_date, contribution)
+                     for contribution in contributions])
+                count += len(contributions)
+        return count
+
+    def ingested_sources(self, legislature=None) -> dict:
+        '''Returns {source file: mtime} of the protocols stored.'''
+        sql, params = 'SELECT source, mtime FROM sessions', ()
+        if legislature is not None:
+            sql, params = sql + ' WHERE legislature = ?', (int(legislature),)
+        return {row['source']: row['mtime']
+                for row in self.conn.execute(sql, params)}
+
+    def count_contributions(self, legislature=None) -> int:
+        if legislature is None:
+            sql, params = 'SELECT COUNT(*) FROM contributions', ()
+        else:
+            sql, params = ('SELECT COUNT(*) FROM contributions '
+                           'WHERE legislature = ?', (int(legislature),))
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def contributions(self, protocol_nr=None, legislature=None,
+                      last_name=None, party=None, key=None) -> list:
+        '''
+        Returns the stored contributions as sqlite3.Rows, in the order they
+        were held, optionally of one protocol ('17/63'), term, speaker's last
+        name, party or MdL key.
+        '''
+        sql, params = 'SELECT * FROM contributions WHERE 1 = 1', []
+        for column, value in [('protocol_nr', protocol_nr),
+                              ('legislature', legislature),
+                              ('last_name', last_name), ('party', party),
+                              ('key', key)]:
+            if value is not None:
+                sql += f' AND {column} = ?'
+                params.append(value)
+        return self.conn.execute(
+            sql + ' ORDER BY legislature, session_no, seq', params).fetchall()
+
+    def session_subs(self, protocol_nr) -> list:
+        '''Returns the Session_subs of a protocol, lineups left empty.'''
+        from person import Session_sub
+
+        subs = list()
+        for row in self.conn.execute(
+                'SELECT session_subs.*, sessions.cal_date FROM session_subs '
+                'JOIN sessions USING (protocol_nr) '
+                'WHERE protocol_nr = ? ORDER BY seq', (protocol_nr,)):
+            subs.append(Session_sub(
+                row['cal_date'], row['protocol_nr'], row['url_subsession'],
+                row['topic'], row['details'], row['page_from'],
+                row['page_to'], row['result'], row['classification'],
+                tags=json.loads(row['tags']), lineup=[]))
+        return subs
+
+    def migrate_shelves(self, path=SHELVE_PATH) -> int:
+        '''
+        Copies the MdLs of all shelves nrw_mdls_term_N in path into the store,
+        one transaction per shelve. Returns the number of MdLs copied.
+        '''
+        import shelve
+
+        if not os.path.exists(path):
+            return 0
+        db_names = set()
+        for file_name in os.listdir(path):
+            if file_name.startswith('nrw_mdls_term_'):
+                db_names.add(os.path.splitext(file_name)[0])
+
+        count = 0
+        for db_name in sorted(db_names):
+            with shelve.open(path + db_name, flag='r') as db:
+                count += self.write_many((key, db[key]) for key in db.keys())
+            print(f'Migrated {db_name}')
+
+        return count
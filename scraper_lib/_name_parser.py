@@ -0,0 +1,199 @@
+import re
+import string
+from collections import namedtuple
+
+from scraper_lib._extract_vornamen import _get_vornamen_index
+from scraper_lib._list_of_akad_titel import list_of_akad_titel
+from scraper_lib._instrument import _get_instruments
+
+PREPOSITIONS = ['von', 'van', 'de', 'auf', 'der', 'und', 'zu', 'den', 'dos']
+# last part of hyphenated names like "Müller-von Berg"
+HYPHEN_PREPOSITIONS = ['von', 'van', 'de', 'zu']
+
+Parsed_name = namedtuple('Parsed_name', ['first_name', 'middle_name_1',
+                                         'middle_name_2', 'last_name',
+                                         'preposition', 'peer_title',
+                                         'academic_title'])
+
+# Every word of a name is tagged once:
+#   A academic title, T peer title, P preposition, H hyphenated word ending
+#   with a preposition, F first name, G hyphenated first name, L the
+#   placeholder 'last_word', Y other hyphenated word, S anything else.
+# A name is resolved by the first rule whose pattern matches the string of
+# its tags; the groups of the match say which words go where, words outside
+# of them are dropped. A group in a lookahead shares its words with the one
+# that follows ('T(?=(?P<first>F))(?P<middle>F...)').
+# The rules for two to four words give the results the extractor always
+# gave, odd ones included (an academic title taken for the first name, the
+# second of four words dropped). Where they leave a name open, the rules
+# after them apply: a first name that is not in the list of first names is
+# accepted if at least two words follow, a two word name needs a known
+# first name.
+GRAMMAR = [
+    ('2: first name', r'(?P<first>[FG])(?P<last>.)'),
+    ('3: two first names',
+     r'(?P<first>[FG])(?P<middle>[FG])(?P<last>.)'),
+    ('3: preposition', r'(?P<first>.)(?P<preposition>P)(?P<last>.)'),
+    ('3: peer title first', r'(?P<peer_title>T)(?P<first>.)(?P<last>.)'),
+    ('3: peer title second', r'(?P<first>.)(?P<peer_title>T)(?P<last>.)'),
+    ('3: hyphenated preposition', r'(?P<first>.)(?P<last>H.)'),
+    ('3: placeholder', r'(?P<first>.)(?P<last>[^GHY])L'),
+    ('3: double last name', r'(?P<first>.)(?P<last>[^GHY].)'),
+    ('4: peer title and preposition',
+     r'(?P<first>[FG])(?P<peer_title>T)(?P<preposition>P)(?P<last>.)'),
+    ('4: peer title', r'(?P<first>[FG])(?P<peer_title>T)(?P<last>..)'),
+    ('4: three first names',
+     r'(?P<first>[FG])(?P<middle>[FG][FG])(?P<last>.)'),
+    ('4: two first names and preposition',
+     r'(?P<first>[FG])(?P<middle>[FG])(?P<preposition>P)(?P<last>.)'),
+    ('4: two first names', r'(?P<first>[FG])(?P<middle>[FG])(?P<last>..)'),
+    ('4: two prepositions',
+     r'(?P<first>[FG])(?P<preposition>PP)(?P<last>.)'),
+    ('4: hyphenated preposition', r'(?P<first>[FG])P(?P<last>H.)'),
+    ('4: preposition and double last name',
+     r'(?P<first>[FG])(?P<preposition>P)(?P<last>[^GY].)'),
+    ('4: preposition after a second word',
+     r'(?P<first>[FG])[^TFGP](?P<preposition>P)(?P<last>.)'),
+    ('4: peer title, two first names',
+     r'(?P<peer_title>T)(?=(?P<first>[FG]))(?P<middle>[FG][FG])'
+     r'(?P<last>.)'),
+    ('4: peer title, first name and preposition',
+     r'(?P<peer_title>T)(?=(?P<first>[FG]))(?P<middle>[FG])'
+     r'(?P<preposition>P)(?P<last>.)'),
+    ('4: peer title, first name',
+     r'(?P<peer_title>T)(?=(?P<first>[FG]))(?P<middle>[FG])(?P<last>..)'),
+    ('peer title first',
+     r'(?P<academic>A*)(?P<peer_title>T)(?P<first>[FGSYL])(?P<middle>[FG]*)'
+     r'(?P<preposition>P*)(?P<last>[FGHSYL][FGHSYLP]*)'),
+    ('peer title after first name',
+     r'(?P<academic>A*)(?P<first>[FGSYL])(?P<middle>[FG]*)(?P<peer_title>T)'
+     r'(?P<preposition>P*)(?P<last>[FGHSYL][FGHSYLP]*)'),
+    ('first name known',
+     r'(?P<academic>A*)(?P<first>[FG])(?P<middle>[FG]*)'
+     r'(?P<preposition>P*)(?P<last>[FGHSYL][FGHSYLP]*)'),
+    ('first name unknown',
+     r'(?P<academic>A*)(?P<first>[SYL])(?=..)(?P<middle>[FG]*)'
+     r'(?P<preposition>P*)(?P<last>[FGHSYL][FGHSYLP]*)'),
+]
+GRAMMAR = [(name, re.compile(pattern + '$')) for name, pattern in GRAMMAR]
+
+
+def _tokenize(text) -> list:
+    '''
+    Splits text into words and strips a leading and a trailing punctuation
+    mark from every word (the same as Collector_MdLs._standardize_words).
+    '''
+    words = [word.strip() for word in text.split(' ') if word]
+    words = [word for word in words if word]
+    words = [word[:-1] if word[-1] in string.punctuation else word
+             for word in words]
+    words = [word[1:] if word and word[0] in string.punctuation else word
+             for word in words]
+    return [word for word in words if word]
+
+
+class NameParser:
+    '''
+    Resolves the names of MdLs as found on the wiki pages into first name,
+    middle names, last name, preposition, peer title and academic title.
+    Names are tagged word for word and resolved by the rules of GRAMMAR.
+    If none fits, the first word is taken for the first name and the rest
+    for the last name, so a strange name never stops the extraction of a
+    term.
+    Results are memoized per raw string, since the same names show up in
+    several terms.
+    '''
+    def __init__(self, peertitles, prepositions=PREPOSITIONS):
+        self.first_names = _get_vornamen_index()
+        self.peertitles = frozenset(peertitles)
+        self.prepositions = frozenset(prepositions)
+        self.academic_titles = frozenset(title.rstrip('.')
+                                         for title in list_of_akad_titel)
+        self.mtime = self.first_names.mtime
+        self.cache = dict()
+
+    def tag(self, word) -> str:
+        if word.upper() in self.academic_titles:
+            return 'A'
+        elif word in self.peertitles:
+            return 'T'
+        elif word in self.prepositions:
+            return 'P'
+        elif '-' in word and word.split('-')[-1] in HYPHEN_PREPOSITIONS:
+            return 'H'
+        elif self.first_names.is_first_name(word):
+            return 'G' if '-' in word else 'F'
+        elif word == 'last_word':
+            return 'L'
+        elif '-' in word:
+            return 'Y'
+        return 'S'
+
+    def parse(self, text) -> Parsed_name:
+        '''
+        Returns a Parsed_name, None only if text has no words.
+        '''
+        try:
+            return self.cache[text]
+        except KeyError:
+            pass
+        # names parsed before vornamen.txt was changed are parsed again
+        self.first_names = _get_vornamen_index()
+        if self.first_names.mtime != self.mtime:
+            self.cache.clear()
+            self.mtime = self.first_names.mtime
+
+        words = _tokenize(text)
+        parsed = None
+        if words:
+            parsed = self._grammar(words)
+            if parsed is None:
+                _get_instruments().count('names unresolved')
+                parsed = Parsed_name(words[0] if len(words) > 1 else None,
+                                     None, None,
+                                     ' '.join(words[1:] or words),
+                                     None, None, None)
+
+        self.cache[text] = parsed
+        return parsed
+
+    def _grammar(self, words) -> Parsed_name:
+        tags = ''.join(self.tag(word) for word in words)
+        for name, pattern in GRAMMAR:
+            match = pattern.match(tags)
+            if match:
+                return self._resolve(words, match)
+        return None
+
+    def _resolve(self, words, match) -> Parsed_name:
+        def group(name) -> list:
+            if name not in match.re.groupindex:
+                return []
+            start, end = match.span(name)
+            return words[start:end]
+
+        middle = group('middle')
+        return Parsed_name(
+            first_name=' '.join(group('first')),
+            middle_name_1=middle[0] if middle else None,
+            middle_name_2=' '.join(middle[1:]) or None,
+            last_name=' '.join(group('last')),
+            preposition=' '.join(group('preposition')) or None,
+            peer_title=' '.join(group('peer_title')) or None,
+            academic_title=' '.join(group('academic')) or None)
+
+
+_NAME_PARSERS = dict()
+
+
+def _get_name_parser(peertitles) -> NameParser:
+    '''
+    Returns the parser shared within this process for that list of peer
+    titles.
+    '''
+    key = tuple(peertitles)
+    parser = _NAME_PARSERS.get(key)
+    if parser is None:
+        parser = NameParser(peertitles)
+        _NAME_PARSERS[key] = parser
+    return parser
@@ -0,0 +1,321 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+
+from scraper_lib._instrument import _get_instruments
+from scraper_lib._http_client import _get_http_client
+
+# seconds; a cache hit writes its access time only if it is older than this
+ACCESS_RESOLUTION = 3600
+
+
+class PageCache:
+    '''
+    Disk cache for downloaded pages, keyed by URL.
+    Every entry consists of the gzipped raw response body and a small json
+    file with the URL, the validators (ETag, Last-Modified) and the times of
+    fetching and last access. Tables extracted from a page can be stored
+    next to it and stay valid as long as the page's body and the version of
+    the extractor are unchanged.
+    Entries younger than ttl are served without asking the server, older
+    ones are revalidated with If-None-Match/If-Modified-Since, so an
+    unchanged page only costs a 304.
+    With offline=True nothing is requested and only cached bodies are served.
+    '''
+    def __init__(self, DIR_LOC='./data/page_cache/', ttl=24 * 3600,
+                 max_age=30 * 24 * 3600, max_bytes=500 * 2**20,
+                 offline=False, timeout=30, evict_every=600):
+        self.DIR_LOC = DIR_LOC
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.timeout = timeout
+        # evict() reads the meta data of every entry, so it runs at most
+        # once per evict_every seconds
+        self.evict_every = evict_every
+        self.evicted = 0.0
+
+    def _key(self, URL) -> str:
+        return hashlib.sha1(URL.encode('utf-8')).hexdigest()
+
+    def _meta_loc(self, URL) -> str:
+        return self.DIR_LOC + self._key(URL) + '.json'
+
+    def _body_loc(self, URL) -> str:
+        return self.DIR_LOC + self._key(URL) + '.html.gz'
+
+    def _tables_loc(self, URL) -> str:
+        return self.DIR_LOC + self._key(URL) + '.tables.json'
+
+    def meta(self, URL) -> dict:
+        try:
+            with open(self._meta_loc(URL), 'r', encoding='utf-8') as fin:
+                return json.load(fin)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _tmp_loc(self, file_loc) -> str:
+        '''
+        Name of a temporary file to write file_loc to before it is renamed
+        to file_loc (os.replace), so other processes sharing the cache never
+        read a half written file.
+        '''
+        return f'{file_loc}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+    def _write_meta(self, URL, meta) -> None:
+        file_loc = self._meta_loc(URL)
+        tmp_loc = self._tmp_loc(file_loc)
+        with open(tmp_loc, 'w', encoding='utf-8') as fout:
+            json.dump(meta, fout)
+        os.replace(tmp_loc, file_loc)
+
+    def _read_body(self, URL) -> bytes:
+        try:
+            with gzip.open(self._body_loc(URL), 'rb') as fin:
+                return fin.read()
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+            return None
+
+    def _write_body(self, URL, body) -> int:
+        file_loc = self._body_loc(URL)
+        tmp_loc = self._tmp_loc(file_loc)
+        with gzip.open(tmp_loc, 'wb', compresslevel=6) as fout:
+            fout.write(body)
+        size = os.path.getsize(tmp_loc)
+        os.replace(tmp_loc, file_loc)
+        return size
+
+    def lookup(self, URL) -> tuple:
+        '''Returns (meta, body) of a cached page or (None, None).'''
+        meta = self.meta(URL)
+        if meta is None:
+            return None, None
+        body = self._read_body(URL)
+        if body is None:
+            return None, None
+        return meta, body
+
+    def _store(self, URL, req) -> dict:
+        return self.put(URL, req.content, req.encoding or 'utf-8',
+                        req.headers.get('ETag'),
+                        req.headers.get('Last-Modified'))
+
+    def put(self, URL, body, encoding='utf-8', etag=None,
+            last_modified=None) -> dict:
+        '''
+        Stores body as the current content of URL. Returns its meta data.
+        '''
+        if not os.path.exists(self.DIR_LOC):
+            os.makedirs(self.DIR_LOC)
+        now = time.time()
+        meta = {'url': URL,
+                'etag': etag,
+                'last_modified': last_modified,
+                'encoding': encoding,
+                'revid': _revision_id(body),
+                'sha1': hashlib.sha1(body).hexdigest(),
+                'raw_size': len(body),
+                'fetched': now,
+                'accessed': now}
+        meta['size'] = self._write_body(URL, body)
+        self._write_meta(URL, meta)
+        return meta
+
+    def get(self, URL, headers=None) -> bytes:
+        '''
+        Returns the body of URL from cache or network, None if neither has it.
+        '''
+        import requests
+
+        if not os.path.exists(self.DIR_LOC):
+            os.makedirs(self.DIR_LOC)
+
+        instruments = _get_instruments()
+        meta, body = self.lookup(URL)
+        now = time.time()
+        if body is not None:
+            if self.offline or now - meta['fetched'] < self.ttl:
+                instruments.count('cache hits')
+                # the access time only matters to eviction, by the hour
+                if now - meta.get('accessed', 0) > ACCESS_RESOLUTION:
+                    meta['accessed'] = now
+                    self._write_meta(URL, meta)
+                return body
+        elif self.offline:
+            instruments.count('cache misses')
+            print(f'Offline and no cached copy of {URL}')
+            return None
+        instruments.count('cache misses' if body is None
+                          else 'cache revalidations')
+
+        request_headers = self.conditional_headers(meta, headers)
+        try:
+            with instruments.timer('fetch'):
+                req = _get_http_client().get(URL, headers=request_headers,
+                                             timeout=self.timeout)
+            instruments.count('fetches')
+            instruments.count('bytes downloaded', len(req.content))
+        except requests.exceptions.RequestException as e:
+            # connection errors, timeouts, too many redirects ...
+            instruments.count('fetch errors')
+            print(e)
+            print(f'{type(e).__name__}, serving cached copy if there is one')
+            return body
+
+        return self.update(URL, req, meta, body)
+
+    def is_fresh(self, URL) -> bool:
+        '''True if URL is cached and younger than ttl.'''
+        meta = self.meta(URL)
+        return meta is not None and \
+            time.time() - meta['fetched'] < self.ttl
+
+    def conditional_headers(self, meta, headers=None) -> dict:
+        '''
+        Returns headers plus the validators of a cached entry's meta data.
+        '''
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+        return request_headers
+
+    def update(self, URL, req, meta, body) -> bytes:
+        '''
+        Stores the response req to a (conditional) request of URL, whose
+        cached meta data and body were meta and body (None if not cached).
+        Returns the current body, the cached one if req is no success.
+        '''
+        if req.status_code == 304 and body is not None:
+            _get_instruments().count('not modified (304)')
+            meta['fetched'] = meta['accessed'] = time.time()
+            self._write_meta(URL, meta)
+            return body
+        elif req.status_code != 200:
+            print(f'{req.status_code} for {URL}')
+            return body
+
+        self._store(URL, req)
+        if time.time() - self.evicted > self.evict_every:
+            self.evicted = time.time()
+            self.evict()
+        return req.content
+
+    def urls(self) -> list:
+        '''Returns the URLs of all cached pages.'''
+        if not os.path.exists(self.DIR_LOC):
+            return list()
+        urls = list()
+        for file_name in sorted(os.listdir(self.DIR_LOC)):
+            if file_name.endswith('.json') and \
+                    not file_name.endswith('.tables.json'):
+                with open(self.DIR_LOC + file_name, 'r',
+                          encoding='utf-8') as fin:
+                    urls.append(json.load(fin)['url'])
+        return urls
+
+    def tables(self, URL, version=None) -> dict:
+        '''
+        Returns the tables stored for URL if they were extracted from the
+        body that is cached now by the given version of the extractor,
+        otherwise None.
+        '''
+        meta = self.meta(URL)
+        if meta is None:
+            return None
+        try:
+            with open(self._tables_loc(URL), 'r', encoding='utf-8') as fin:
+                stored = json.load(fin)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if stored.get('sha1') != meta.get('sha1') or \
+                stored.get('version') != version:
+            return None
+        return stored['tables']
+
+    def store_tables(self, URL, tables, version=None) -> None:
+        meta = self.meta(URL)
+        if meta is None:
+            return
+        file_loc = self._tables_loc(URL)
+        tmp_loc = self._tmp_loc(file_loc)
+        with open(tmp_loc, 'w', encoding='utf-8') as fout:
+            json.dump({'sha1': meta.get('sha1'), 'version': version,
+                       'tables': tables}, fout,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_loc, file_loc)
+
+    def text(self, URL, headers=None) -> str:
+        body = self.get(URL, headers)
+        if body is None:
+            return None
+        meta = self.meta(URL)
+        encoding = meta['encoding'] if meta else 'utf-8'
+        return body.decode(encoding, errors='replace')
+
+    def evict(self) -> None:
+        '''
+        Removes entries not accessed for max_age seconds, then the least
+        recently accessed ones until the cache is below max_bytes.
+        '''
+        now = time.time()
+        entries = list()
+        for file_name in os.listdir(self.DIR_LOC):
+            if not file_name.endswith('.json') or \
+                    file_name.endswith('.tables.json'):
+                continue
+            try:
+                with open(self.DIR_LOC + file_name, 'r',
+                          encoding='utf-8') as fin:
+                    meta = json.load(fin)
+            except (OSError, json.JSONDecodeError):
+                continue
+            entries.append(meta)
+
+        total = sum(meta['size'] for meta in entries)
+        for meta in sorted(entries, key=lambda meta: meta['accessed']):
+            if now - meta['accessed'] < self.max_age and \
+                    total <= self.max_bytes:
+                break
+            self.remove(meta['url'])
+            total -= meta['size']
+
+    def remove(self, URL) -> None:
+        for file_loc in [self._meta_loc(URL), self._body_loc(URL),
+                         self._tables_loc(URL)]:
+            try:
+                os.remove(file_loc)
+            except FileNotFoundError:
+                pass
+
+
+def _revision_id(body) -> int:
+    '''
+    Wikipedia pages carry the id of the shown revision in their inline
+    javascript config ("wgCurRevisionId":123456789).
+    '''
+    import re
+    match = re.search(rb'"wgCurRevisionId":\s*(\d+)', body)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+_PAGE_CACHE = dict()
+
+
+def _get_page_cache(DIR_LOC='./data/page_cache/'):
+    '''
+    Returns the page cache shared by all callers within this process.
+    '''
+    cache = _PAGE_CACHE.get(DIR_LOC)
+    if cache is None:
+        cache = PageCache(DIR_LOC)
+        _PAGE_CACHE[DIR_LOC] = cache
+    return cache
@@ -0,0 +1,343 @@
+import re
+
+from scraper_lib._list_of_aemter import list_of_aemter
+from scraper_lib._list_of_adelstitel import list_of_adelstitel
+from scraper_lib._list_of_akad_titel import list_of_akad_titel
+
+URL_SALT = '%2F'
+MONTHS = {'Januar': 1, 'Februar': 2, 'März': 3, 'April': 4, 'Mai': 5,
+          'Juni': 6, 'Juli': 7, 'August': 8, 'September': 9, 'Oktober': 10,
+          'November': 11, 'Dezember': 12}
+PARTIES = {'CDU': 'CDU', 'SPD': 'SPD', 'FDP': 'FDP', 'F.D.P.': 'FDP',
+           'AFD': 'AfD', 'GRÜNE': 'GRÜNE', 'DIE GRÜNEN': 'GRÜNE',
+           'BÜNDNIS 90/DIE GRÜNEN': 'GRÜNE', 'LINKE': 'LINKE',
+           'DIE LINKE': 'LINKE', 'PIRATEN': 'PIRATEN',
+           'FRAKTIONSLOS': 'fraktionslos', 'FR. LOS': 'fraktionslos'}
+PRESIDING = ['PRÄS', 'VIZEPRÄS', 'GESCHÄFTSFÜHRENDER PRÄS', 'AMTPRÄS']
+ACADEMIC_TITLES = frozenset(title.rstrip('.') for title in list_of_akad_titel)
+# list_of_adelstitel also holds the prepositions
+PEER_TITLES = frozenset(title.upper() for title in list_of_adelstitel
+                        if title.upper().startswith('FREI'))
+
+PROTOCOL_NR = re.compile(r'Plenarprotokoll\s+(\d+)\s*/\s*(\d+)')
+FILE_NR = re.compile(r'MMP(\d+)-(\d+)', re.IGNORECASE)
+DATE_LONG = re.compile(r'(\d{1,2})\.\s*(' + '|'.join(MONTHS) + r')\s+(\d{4})')
+DATE_SHORT = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')
+# the header of every page: "Landtag Nordrhein-Westfalen 15014
+# Plenarprotokoll 17/142" (in any order), the page number stands alone
+PAGE_LINE = re.compile(r'Plenarprotokoll\s+\d+\s*/\s*\d+')
+PAGE_NO = re.compile(r'(?<![\d./])(\d{1,5})(?![\d./])')
+
+NAME = r"[^\s:()\n,][^:()\n,]{0,80}?"
+# Präsident André Kuper: / Vizepräsidentin Carina Gödecke:
+CHAIR = re.compile(r'^(?P<role>(?:Vize|Alters)?[Pp]räsident(?:in)?)\s+'
+                   r'(?P<name>' + NAME + r'):\s*(?P<rest>.*)$')
+# Hendrik Wüst (CDU): / WÜST (CDU):
+MEMBER = re.compile(r'^(?P<name>' + NAME + r')\s*\((?P<party>[^()\n]{2,30})\):'
+                    r'\s*(?P<rest>.*)$')
+# Armin Laschet, Ministerpräsident: / Yvonne Gebauer, Ministerin für ...:
+MINISTER = re.compile(r'^(?P<name>' + NAME + r'),\s*(?P<office>(?:Minister|'
+                      r'Ministerin|Ministerpräsident|Ministerpräsidentin|'
+                      r'Staatssekretär|Staatssekretärin|Finanzminister|'
+                      r'Finanzministerin|Justizminister|Justizministerin|'
+                      r'Innenminister|Innenministerin)[^:\n]{0,160}):'
+                      r'\s*(?P<rest>.*)$')
+# FM LIENENKÄMPER: / PRÄS KUPER: (offices of _list_of_aemter)
+OFFICE = re.compile(r'^(?P<office>' + '|'.join(
+    re.escape(office) for office in sorted(list_of_aemter, key=len,
+                                           reverse=True)) +
+    r')\s+(?P<name>[A-ZÄÖÜ][A-ZÄÖÜß\- ]{1,60}?):\s*(?P<rest>.*)$')
+NAME_WORD = re.compile(r"^(?:[A-ZÄÖÜ][\wÄÖÜäöüß'.\-]*|von|van|vom|de|der|"
+                       r"den|zu|zur|auf|dos)$")
+DRUCKSACHE = re.compile(r'Drucksachen?\s+(\d+/\d+(?:\s*(?:,|und)\s*\d+/\d+)*)')
+RESULT = re.compile(r'[^.!?]*\b(?:angenommen|abgelehnt|überwiesen|'
+                    r'Überweisung)\b[^.!?]*[.!?]')
+# Ich rufe auf: 2 Gesetz ... / Ich rufe Tagesordnungspunkt 2 auf: Gesetz ...
+AGENDA = re.compile(r'\brufe\s+(?:(?:jetzt|nun)\s+)?(?:(?:den\s+)?'
+                    r'Tagesordnungspunkt\s+\d+\s+auf|auf)\s*:?\s*(?:\d+\s+)?'
+                    r'(?P<topic>.*)', re.DOTALL)
+
+
+def _normalize_party(party) -> str:
+    party = ' '.join(party.split())
+    return PARTIES.get(party.upper(), party)
+
+
+def _protocol_nr(file_loc, text) -> tuple:
+    '''Returns (legislature, session) from the text or the file's name.'''
+    match = PROTOCOL_NR.search(text) or FILE_NR.search(file_loc)
+    if match is None:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _session_date(text) -> str:
+    '''Returns the first date of the text as dd.mm.yyyy, or None.'''
+    match = DATE_LONG.search(text)
+    if match:
+        day, month, year = match.groups()
+        return f'{int(day):02d}.{MONTHS[month]:02d}.{year}'
+    match = DATE_SHORT.search(text)
+    if match:
+        return '.'.join(match.groups())
+    return None
+
+
+def _page_no(line) -> int:
+    '''The page number of a page header line, or None.'''
+    line = PROTOCOL_NR.sub(' ', line)
+    line = DATE_SHORT.sub(' ', DATE_LONG.sub(' ', line))
+    numbers = PAGE_NO.findall(line)
+    return int(numbers[-1]) if numbers else None
+
+
+def _is_name(name) -> bool:
+    words = name.split()
+    return 0 < len(words) <= 7 and all(NAME_WORD.match(word)
+                                       for word in words)
+
+
+def _split_name(name, first_names=None) -> dict:
+    '''
+    Splits a speaker's name into academic title, peer title, preposition,
+    first name and last name. Names in upper case (as in the indices of
+    the protocols) are last names only.
+    '''
+    words = name.split()
+    parts = {'academic_title': [], 'peer_title': [], 'peer_preposition': [],
+             'first_name': None, 'last_name': None}
+    while words and words[0].rstrip('.').upper() in ACADEMIC_TITLES:
+        parts['academic_title'].append(words.pop(0))
+    parts['peer_title'] = [word for word in words
+                           if word.upper() in PEER_TITLES]
+    words = [word for word in words if word.upper() not in PEER_TITLES]
+
+    if words and all(word.isupper() or not word[0].isalpha()
+                     for word in words):
+        parts['last_name'] = ' '.join(words)
+    elif words:
+        # "Christina Schulze Föcking": capitalized words before the last
+        # one that aren't first names belong to the last name, lower case
+        # words before it are prepositions ("Marc von Berg")
+        start = len(words) - 1
+        while start > 1 and words[start - 1][0].isupper() and \
+                not (first_names and
+                     first_names.is_first_name(words[start - 1])):
+            start -= 1
+        end_of_first = start
+        while end_of_first > 1 and words[end_of_first - 1][0].islower():
+            end_of_first -= 1
+        parts['first_name'] = words[0] if len(words) > 1 else None
+        parts['peer_preposition'] = words[end_of_first:start]
+        parts['last_name'] = ' '.join(words[start:])
+
+    return {key: (' '.join(value) or None) if isinstance(value, list)
+            else value for key, value in parts.items()}
+
+
+def _speaker_header(line):
+    '''
+    Returns a dict describing the speaker if line starts a speaker's turn,
+    otherwise None.
+    '''
+    if ':' not in line[:200]:
+        return None
+    match = CHAIR.match(line)
+    if match and _is_name(match.group('name')):
+        role = match.group('role')
+        return {'name': match.group('name'), 'party': None, 'office': role,
+                'presiding': True, 'rest': match.group('rest')}
+    match = OFFICE.match(line)
+    if match:
+        office = match.group('office')
+        return {'name': match.group('name').strip(), 'party': None,
+                'office': office, 'presiding': office in PRESIDING,
+                'rest': match.group('rest')}
+    match = MINISTER.match(line)
+    if match and _is_name(match.group('name')):
+        return {'name': match.group('name'), 'party': None,
+                'office': ' '.join(match.group('office').split()),
+                'presiding': False, 'rest': match.group('rest')}
+    match = MEMBER.match(line)
+    if match and _is_name(match.group('name')):
+        return {'name': match.group('name'),
+                'party': _normalize_party(match.group('party')),
+                'office': None, 'presiding': False,
+                'rest': match.group('rest')}
+    return None
+
+
+def _turns(lines):
+    '''
+    Yields the speakers' turns of a protocol's lines as dicts with the
+    header, the raw header line, the text and the first and last page.
+    Page headers are dropped from the text.
+    '''
+    page = None
+    turn = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if DATE_SHORT.fullmatch(line):
+            # the session's date below the page header
+            continue
+        if PAGE_LINE.search(line) and len(line) < 120:
+            number = _page_no(line)
+            if number is not None:
+                page = number
+                if turn is not None:
+                    turn['page_to'] = page
+            continue
+        header = _speaker_header(line)
+        if header is not None:
+            if turn is not None:
+                yield turn
+            turn = {'header': header, 'raw': line[:len(line) -
+                                                  len(header['rest'])],
+                    'text': [header['rest']] if header['rest'] else [],
+                    'page_from': page, 'page_to': page}
+        elif turn is not None:
+            turn['text'].append(line)
+    if turn is not None:
+        yield turn
+
+
+def parse_protocol(file_loc, text, first_names=None) -> tuple:
+    '''
+    Segments the text of a plenary protocol into speakers' turns, typed
+    contributions (speech, ZwFr, PersErkl, KurzInt) and the agenda items
+    they belong to.
+    Returns Session, list of Session_subs and a list of dicts with the
+    Contri_single, its Speaker, first_name, the raw speaker header, the
+    index of its Session_sub (None before the first agenda item) and its
+    position in the session.
+    '''
+    from person import Session, Session_sub, Contri_single, Speaker
+
+    legislature, number = _protocol_nr(file_loc, text)
+    protocol_nr = f'{legislature}/{number}'
+    session = Session(_session_date(text), protocol_nr)
+
+    turns = list(_turns(text.split('\n')))
+    pages = [turn['page_from'] for turn in turns if turn['page_from']] + \
+        [turn['page_to'] for turn in turns if turn['page_to']]
+    pages = f'{min(pages)}|{max(pages)}' if pages else ''
+
+    subs = list()
+    contributions = list()
+    announced = None
+    current_speech = None
+    for turn in turns:
+        header = turn['header']
+        content = ' '.join(turn['text'])
+        if header['presiding']:
+            agenda = AGENDA.search(content)
+            # the vote on an item is often announced in the turn that
+            # calls the next one
+            before = content[:agenda.start()] if agenda else content
+            result = RESULT.search(before)
+            if subs and result and not subs[-1].result:
+                subs[-1].result = result.group(0).strip()
+            if agenda:
+                topic = agenda.group('topic')
+                details = DRUCKSACHE.findall(topic)
+                # the topic ends where its papers are listed or at the end
+                # of the first sentence
+                title = re.split(r'\s+Drucksachen?\s|(?<=[.!?])\s',
+                                 topic, maxsplit=1)[0]
+                subs.append(Session_sub(
+                    session.cal_date, protocol_nr, '',
+                    title[:300].strip(),
+                    ', '.join(f'Drs {drs}' for drs in details),
+                    str(turn['page_from'] or ''), str(turn['page_to'] or ''),
+                    '', ''))
+                current_speech = None
+            lowered = content.lower()
+            if 'zwischenfrage' in lowered:
+                announced = 'ZwFr'
+            elif 'persönliche erklärung' in lowered or \
+                    'persönlichen erklärung' in lowered:
+                announced = 'PersErkl'
+            elif 'kurzintervention' in lowered:
+                announced = 'KurzInt'
+            if subs:
+                subs[-1].page_to = str(turn['page_to'] or subs[-1].page_to)
+            continue
+
+        name = _split_name(header['name'], first_names)
+        same_speaker = current_speech is not None and \
+            current_speech['raw'] == turn['raw']
+        if same_speaker:
+            # the speaker's answer to the chair ("Ja, bitte.") leaves an
+            # announced question pending
+            type_of_contri = 'speech'
+        else:
+            type_of_contri = announced or 'speech'
+            announced = None
+
+        # a speech interrupted by a question goes on in the same
+        # contribution
+        if subs:
+            subs[-1].page_to = str(turn['page_to'] or subs[-1].page_to)
+        if type_of_contri == 'speech' and same_speaker:
+            contri = current_speech['contri']
+            contri.content += ' ' + content
+            contri.page_to = str(turn['page_to'] or contri.page_to)
+            continue
+
+        speaker = Speaker(name['last_name'], header['party'],
+                          academic_title=name['academic_title'],
+                          peer_title=name['peer_title'],
+                          peer_preposition=name['peer_preposition'],
+                          minister=header['office'],
+                          type_of_contri=type_of_contri)
+        contri = Contri_single(protocol_nr, pages,
+                               str(turn['page_from'] or ''),
+                               str(turn['page_to'] or ''), type_of_contri,
+                               header['party'] or '', URL_SALT, content)
+        contribution = {'contri': contri, 'speaker': speaker,
+                        'first_name': name['first_name'],
+                        'raw': turn['raw'].rstrip(': '),
+                        'sub': len(subs) - 1 if subs else None,
+                        'seq': len(contributions)}
+        contributions.append(contribution)
+        if subs:
+            subs[-1].lineup.append(speaker)
+        if type_of_contri == 'speech':
+            current_speech = {'raw': turn['raw'], 'contri': contri}
+
+    return session, subs, contributions
+
+
+def _pdf_text(file_loc) -> str:
+    '''
+    Text of a pdf by pypdf, pdfminer.six or the pdftotext program,
+    whichever is there. None if none of them is.
+    '''
+    try:
+        from pypdf import PdfReader
+        return '\n'.join(page.extract_text() or ''
+                         for page in PdfReader(file_loc).pages)
+    except ImportError:
+        pass
+    try:
+        from pdfminer.high_level import extract_text
+        return extract_text(file_loc)
+    except ImportError:
+        pass
+    import shutil
+    import subprocess
+    if shutil.which('pdftotext'):
+        return subprocess.run(['pdftotext', '-layout', file_loc, '-'],
+                              capture_output=True, check=True,
+                              text=True).stdout
+    print(f'Cannot read {file_loc}: install pypdf, pdfminer.six or pdftotext')
+    return None
+
+
+def read_protocol(file_loc) -> str:
+    if file_loc.lower().endswith('.pdf'):
+        return _pdf_text(file_loc)
+    with open(file_loc, 'r', encoding='utf-8', errors='replace') as fin:
+        return fin.read()
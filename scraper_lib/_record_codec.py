@@ -0,0 +1,79 @@
+'''
+Binary form of MdL_records (see person.py).
+The records are packed column by column, each column a list of the values
+of one field, which keeps repeated values (party, ward, legislature) close
+to each other and unpacks with one call of the decoder. msgpack is used if
+installed, otherwise json; the first bytes say which one packed them. Both
+formats are independent of the Python version, so packed records can be
+kept on disk and read by any installation that has the decoder.
+'''
+
+import json
+
+MAGIC = b'MDLR'
+VERSION = 1
+MSGPACK = b'p'
+JSON = b'j'
+
+
+def _msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        return None
+
+
+def packb(records) -> bytes:
+    from person import MdL_record
+
+    columns = [list() for _ in MdL_record.FIELDS]
+    for record in records:
+        for column, value in zip(columns, record.as_tuple()):
+            column.append(value)
+    # parties and offices are lists within the columns
+    columns = [[list(value) if isinstance(value, tuple) else value
+                for value in column] for column in columns]
+    payload = {'version': VERSION, 'fields': list(MdL_record.FIELDS),
+               'columns': columns}
+
+    msgpack = _msgpack()
+    if msgpack is not None:
+        return MAGIC + MSGPACK + msgpack.packb(payload, use_bin_type=True)
+    return MAGIC + JSON + json.dumps(payload, ensure_ascii=False,
+                                     separators=(',', ':')).encode('utf-8')
+
+
+def unpackb(data) -> list:
+    '''
+    Returns the records of data, None if data can't be read here.
+    '''
+    from person import MdL_record
+
+    if data[:len(MAGIC)] != MAGIC:
+        print('Not a file of MdL records')
+        return None
+    kind, body = data[len(MAGIC):len(MAGIC) + 1], data[len(MAGIC) + 1:]
+    if kind == MSGPACK:
+        msgpack = _msgpack()
+        if msgpack is None:
+            print('The records were written with msgpack, which is not '
+                  'installed')
+            return None
+        payload = msgpack.unpackb(body, raw=False)
+    elif kind == JSON:
+        payload = json.loads(body.decode('utf-8'))
+    else:
+        print(f'Unknown format {kind!r} of MdL records')
+        return None
+
+    if payload['version'] != VERSION:
+        print(f'Version {payload["version"]} of MdL records is not supported')
+        return None
+    if sorted(payload['fields']) != sorted(MdL_record.FIELDS):
+        print('The fields of the MdL records differ from MdL_record.FIELDS')
+        return None
+    columns = [payload['columns'][payload['fields'].index(name)]
+               for name in MdL_record.FIELDS]
+    return [MdL_record.from_tuple(values) for values in zip(*columns)]
+
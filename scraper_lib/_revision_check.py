@@ -0,0 +1,72 @@
+from urllib.parse import unquote
+from scraper_lib._page_cache import _get_page_cache
+from scraper_lib._http_client import _get_http_client
+
+API_URL = 'https://de.wikipedia.org/w/api.php'
+# the API accepts up to 50 titles per query
+BATCH_SIZE = 50
+
+
+def _title(URL) -> str:
+    return unquote(URL.split('/wiki/')[-1]).replace('_', ' ')
+
+
+def _latest_revisions(URLs) -> dict:
+    '''
+    Asks the MediaWiki API for the latest revision ids of all URLs, 50 titles
+    per request, without downloading the pages themselves. Redirects are
+    followed, as they are when the page is downloaded.
+    Returns a dict URL -> revid (None if the page does not exist).
+    '''
+    import requests
+
+    titles = {_title(URL): URL for URL in URLs}
+    revisions = dict()
+    title_list = list(titles)
+    for i in range(0, len(title_list), BATCH_SIZE):
+        batch = title_list[i:i + BATCH_SIZE]
+        params = {'action': 'query', 'prop': 'info', 'format': 'json',
+                  'formatversion': '2', 'redirects': '1',
+                  'titles': '|'.join(batch)}
+        try:
+            req = _get_http_client().get(API_URL, params=params, timeout=30)
+            query = req.json()['query']
+        except (requests.exceptions.RequestException, ValueError,
+                KeyError) as e:
+            print(e)
+            print('Could not check revisions')
+            return revisions
+        # the titles asked for, by the title of the page that answers them:
+        # first normalized, then redirected
+        asked = dict()
+        for item in query.get('normalized', []):
+            asked.setdefault(item['to'], list()).append(item['from'])
+        for item in query.get('redirects', []):
+            asked.setdefault(item['to'], list()).extend(
+                asked.get(item['from'], [item['from']]))
+        for page in query.get('pages', []):
+            for title in asked.get(page['title'], [page['title']]):
+                if title in titles:
+                    revisions[titles[title]] = page.get('lastrevid')
+
+    return revisions
+
+
+def _stale_pages(URLs, cache=None) -> list:
+    '''
+    Compares the revision ids stored with the cached pages to the latest ones
+    on Wikipedia. Pages without a cached copy and pages the API did not
+    answer for count as stale.
+    Returns the list of stale URLs.
+    '''
+    cache = cache or _get_page_cache()
+    latest = _latest_revisions(URLs)
+    stale = list()
+    for URL in URLs:
+        meta = cache.meta(URL)
+        if meta is None or meta.get('revid') is None:
+            stale.append(URL)
+        elif latest.get(URL) != meta['revid']:
+            stale.append(URL)
+
+    return stale
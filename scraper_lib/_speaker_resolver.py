@@ -0,0 +1,198 @@
+from scraper_lib._wer_regiert import cabinet
+from scraper_lib._list_of_aemter import list_of_aemter
+from scraper_lib._list_of_parteien import list_of_parteien
+from scraper_lib._list_of_akad_titel import list_of_akad_titel
+from scraper_lib._list_of_adelstitel import list_of_adelstitel
+from scraper_lib._protocol_parser import _speaker_header, _split_name,\
+    _normalize_party
+from scraper_lib._extract_vornamen import _get_vornamen_index
+from scraper_lib._instrument import _get_instruments
+
+# the words of a speaker string that are neither names nor parties
+NOISE = frozenset(word.casefold() for word in list_of_aemter +
+                  list_of_akad_titel + ['Frau', 'Herr', 'Abg.'])
+PREPOSITIONS = frozenset(word.casefold() for word in list_of_adelstitel
+                         if not word.upper().startswith('FREI'))
+PARTIES = frozenset(word.casefold() for word in list_of_parteien)
+
+
+def _fold(text) -> str:
+    '''
+    'SCHLEUßER', 'Schleusser' and 'SCHLEUSSER' all become 'schleusser'.
+    '''
+    return ' '.join(text.split()).casefold() if text else ''
+
+
+def _fold_party(party) -> str:
+    return _fold(_normalize_party(party)) if party else ''
+
+
+def _capitalize(word) -> str:
+    '''
+    'MARC' becomes 'Marc', 'VON' becomes 'von', 'HANS-PETER' 'Hans-Peter'.
+    '''
+    if word.casefold() in PREPOSITIONS:
+        return word.casefold()
+    return '-'.join(part.capitalize() for part in word.split('-'))
+
+
+class SpeakerResolver:
+    '''
+    Maps the speakers of the protocols of a term ('WÜST (CDU)',
+    'Christina Schulze Föcking (CDU)', 'FM LIENENKÄMPER', 'Dr. Marc von
+    Berg (FDP)') to the key of their MdL in the MdL store.
+    The indexes are built once from the MdLs of the term and the cabinet
+    of the term (see _wer_regiert), which knows the party of ministers
+    named by office only; every speaker string is resolved only once.
+    The MdLs are kept as slotted MdL_records (see MdL_Store.records).
+    '''
+    def __init__(self, legislature, store=None):
+        self.legislature = int(legislature)
+        self.by_full_name = dict()
+        self.by_name_party = dict()
+        self.by_last_name = dict()
+        self.mdls = dict()
+        self.cache = dict()
+        self.first_names = _get_vornamen_index()
+        self.cabinet = {_fold(name): _fold_party(party)
+                        for name, party in cabinet(self.legislature).items()}
+        if store is None:
+            from scraper_lib._mdl_store import MdL_Store
+            with MdL_Store() as store:
+                self._build(store)
+        else:
+            self._build(store)
+
+    def _build(self, store) -> None:
+        for key, mdl in store.records(self.legislature):
+            self.mdls[key] = mdl
+            last_names = {_fold(mdl.last_name)}
+            if mdl.peer_preposition:
+                last_names.add(_fold(f'{mdl.peer_preposition} '
+                                     f'{mdl.last_name}'))
+            parties = {_fold_party(party)
+                       for party in list(mdl.parties) + [mdl.party] if party}
+            for last_name in last_names:
+                self.by_last_name.setdefault(last_name, set()).add(key)
+                self.by_full_name.setdefault(
+                    (_fold(mdl.first_name), last_name), set()).add(key)
+                for party in parties:
+                    self.by_name_party.setdefault(
+                        (last_name, party), set()).add(key)
+
+    @staticmethod
+    def _unique(keys):
+        if keys and len(keys) == 1:
+            return next(iter(keys))
+        return None
+
+    def resolve_name(self, last_name, first_name=None, party=None,
+                     peer_preposition=None):
+        '''
+        Returns the key of the MdL or None if there is none or more than
+        one MdL of that name.
+        '''
+        last_name = _fold(last_name)
+        surname = last_name
+        if peer_preposition:
+            last_name = _fold(f'{peer_preposition} {last_name}')
+        party = _fold_party(party) or self.cabinet.get(last_name, '')
+        if first_name:
+            key = self._unique(self.by_full_name.get((_fold(first_name),
+                                                      last_name)))
+            if key:
+                return key
+        if party:
+            key = self._unique(self.by_name_party.get((last_name, party)))
+            if key:
+                return key
+        key = self._unique(self.by_last_name.get(last_name))
+        if key is None and peer_preposition:
+            # MdLs whose preposition is missing in the store
+            key = self._unique(self.by_last_name.get(surname))
+        return key
+
+    def _is_first_name(self, word) -> bool:
+        '''
+        Looks up word in the first name index, also if it is in upper case
+        ('MARC VON BERG (FDP)').
+        '''
+        return self.first_names.is_first_name(_capitalize(word))
+
+    def _parse(self, speaker) -> tuple:
+        '''
+        Returns last name, first name, party and preposition of a speaker
+        string, with or without the colon of the protocol's header.
+        '''
+        header = _speaker_header(speaker.rstrip(': ') + ':')
+        if header is not None:
+            words = header['name'].split()
+            if len(words) > 1 and header['name'].isupper() and \
+                    self._is_first_name(words[0]):
+                # a full name in upper case: 'JOSEF MARIA NEUMANN'
+                words = [_capitalize(word) for word in words]
+            name = _split_name(' '.join(words), self.first_names)
+            return name['last_name'], name['first_name'], header['party'],\
+                name['peer_preposition']
+        # no header: drop offices and titles, take parties aside
+        words = [word for word in speaker.replace('(', ' ').replace(
+            ')', ' ').split() if word.casefold() not in NOISE]
+        party = ' '.join(word for word in words
+                         if word.casefold() in PARTIES) or None
+        words = [word for word in words if word.casefold() not in PARTIES]
+        prepositions = [word for word in words
+                        if word.casefold() in PREPOSITIONS]
+        words = [word for word in words
+                 if word.casefold() not in PREPOSITIONS]
+        prepositions = ' '.join(prepositions) or None
+        if not words:
+            return None, None, party, None
+        if len(words) > 1 and (not any(word.isupper() for word in words)
+                               or self._is_first_name(words[0])):
+            return words[-1], words[0], party, prepositions
+        return ' '.join(words), None, party, prepositions
+
+    def resolve(self, speaker):
+        '''
+        Returns the key of the MdL for a speaker string of the protocols or
+        None if it does not name exactly one MdL of the term.
+        '''
+        try:
+            return self.cache[speaker]
+        except KeyError:
+            pass
+        last_name, first_name, party, peer_preposition = self._parse(speaker)
+        key = None
+        if last_name:
+            key = self.resolve_name(last_name, first_name, party,
+                                    peer_preposition)
+        self.cache[speaker] = key
+        _get_instruments().count('speakers resolved' if key else
+                                 'speakers unresolved')
+        return key
+
+    def mdl(self, speaker):
+        '''Returns the MdL_record for a speaker string or None.'''
+        key = self.resolve(speaker)
+        return self.mdls.get(key) if key else None
+
+
+_SPEAKER_RESOLVERS = dict()
+
+
+def _get_speaker_resolver(legislature) -> SpeakerResolver:
+    '''
+    Returns the resolver of a term shared within this process, built on
+    first use. Call _reset_speaker_resolvers after the MdLs of a term have
+    been written again.
+    '''
+    legislature = int(legislature)
+    resolver = _SPEAKER_RESOLVERS.get(legislature)
+    if resolver is None:
+        resolver = SpeakerResolver(legislature)
+        _SPEAKER_RESOLVERS[legislature] = resolver
+    return resolver
+
+
+def _reset_speaker_resolvers() -> None:
+    _SPEAKER_RESOLVERS.clear()
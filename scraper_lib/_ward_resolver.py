@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from scraper_lib._page_cache import _get_page_cache
+from scraper_lib._instrument import _get_instruments
+
+URL_WARD = 'https://de.wikipedia.org/wiki/Landtagswahlkreis_{}'
+NO_WARD = ['ew', 'Landesliste']
+WARDS_LOC = './data/ward_details.json'
+
+
+def _normalize_ward(electoral_ward, last_name) -> str:
+    '''
+    Some wards are named differently on the lists of MdLs than on the pages
+    of the wards themselves.
+    '''
+    if electoral_ward == 'Kreis Aachen I':
+        electoral_ward = 'Aachen III'
+    elif electoral_ward == 'Hochsauerlandkreis II – Soest III':
+        electoral_ward = 'Hochsauerlandkreis II'
+    elif electoral_ward == 'Kreis Aachen II':
+        if last_name in ['Wirtz', 'Weidenhaupt']:
+            electoral_ward = 'Aachen IV'
+    return electoral_ward
+
+
+def _parse_ward_details(text) -> tuple:
+    '''
+    Reads number of ward and count of voters from the infobox of a
+    Landtagswahlkreis page.
+    Returns ward_no, voter_count ('None' for what could not be found).
+    '''
+    from bs4 import BeautifulSoup
+
+    ward_no = 'None'
+    voter_count = 'None'
+    bsObj = BeautifulSoup(text, 'lxml')
+    table = bsObj.find(class_='infobox float-right toptextcells')
+    for td in table.find_all('td'):
+        if 'Wahlkreisnummer' in td.text:
+            ward_no = td.find_next().text.strip()
+            ward_no = int(ward_no.split(' ')[0])
+        elif 'Wahlberechtigte' in td.text:
+            voter_count = td.find_next().text.strip()
+            if ' ' in voter_count:
+                voter_count = ''.join(voter_count.split(' '))
+            elif '.' in voter_count:
+                voter_count = ''.join(voter_count.split('.'))
+            if voter_count[-1] == ']':
+                voter_count = voter_count[:-3]
+            voter_count = int(voter_count)
+
+    return ward_no, voter_count
+
+
+class WardResolver:
+    '''
+    Looks up ward_no and voter_count of electoral wards. Every ward is
+    fetched only once and the pages of several wards are fetched
+    concurrently by a bounded pool of threads.
+    Wards that were found are kept in file_loc (None for memory only), so
+    later runs don't even have to parse the pages again.
+    '''
+    def __init__(self, max_workers=8, file_loc=WARDS_LOC):
+        self.max_workers = max_workers
+        self.file_loc = file_loc
+        self.wards = self._load()
+
+    def _load(self) -> dict:
+        import json
+
+        if self.file_loc is None:
+            return dict()
+        try:
+            with open(self.file_loc, 'r', encoding='utf-8') as fin:
+                return {ward: tuple(details)
+                        for ward, details in json.load(fin).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict()
+
+    def _save(self) -> None:
+        import os
+        import json
+
+        if self.file_loc is None:
+            return
+        dir_loc = os.path.dirname(self.file_loc)
+        if dir_loc and not os.path.exists(dir_loc):
+            os.makedirs(dir_loc)
+        # other processes may have saved wards meanwhile, theirs are kept;
+        # wards that could not be resolved are tried again next time
+        found = self._load()
+        found.update((ward, details) for ward, details in self.wards.items()
+                     if details != ('None', 'None'))
+        # written aside and renamed, so processes saving at the same time
+        # never leave a truncated or interleaved file
+        tmp_loc = f'{self.file_loc}.{os.getpid()}.tmp'
+        with open(tmp_loc, 'w', encoding='utf-8') as fout:
+            json.dump(found, fout, ensure_ascii=False,
+                      sort_keys=True)
+        os.replace(tmp_loc, self.file_loc)
+
+    def _fetch(self, electoral_ward) -> tuple:
+        instruments = _get_instruments()
+        URL = URL_WARD.format(electoral_ward)
+        with instruments.timer('ward fetch'):
+            text = _get_page_cache().text(URL)
+        if text is None:
+            instruments.count('wards unresolved')
+            return 'None', 'None'
+        try:
+            with instruments.timer('ward details parse'):
+                return _parse_ward_details(text)
+        except (AttributeError, ValueError, IndexError) as e:
+            instruments.count('wards unresolved')
+            print(e)
+            print(f'Could not read ward details of {electoral_ward}')
+            return 'None', 'None'
+
+    def resolve(self, electoral_wards) -> dict:
+        '''
+        Returns a dict electoral_ward -> (ward_no, voter_count).
+        '''
+        electoral_wards = list(electoral_wards)
+        todo = {ward for ward in electoral_wards
+                if ward not in NO_WARD and ward not in self.wards}
+        if todo:
+            todo = sorted(todo)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for ward, details in zip(todo, pool.map(self._fetch, todo)):
+                    self.wards[ward] = details
+            self._save()
+
+        return {ward: self.wards[ward] for ward in electoral_wards
+                if ward in self.wards}
+
+    def fill(self, politicians) -> list:
+        '''
+        Sets ward_no and voter_count of all politicians with one lookup per
+        distinct ward.
+        '''
+        politicians = list(politicians)
+        _get_instruments().count('ward lookups', len(politicians))
+        for politician in politicians:
+            politician.electoral_ward = _normalize_ward(
+                politician.electoral_ward, politician.last_name)
+        details = self.resolve(politician.electoral_ward
+                               for politician in politicians)
+        for politician in politicians:
+            if politician.electoral_ward in details:
+                politician.ward_no, politician.voter_count =\
+                    details[politician.electoral_ward]
+
+        return politicians
+
+
+_WARD_RESOLVER = None
+
+
+def _get_ward_resolver() -> WardResolver:
+    '''
+    Returns the resolver shared within this process, so wards looked up once
+    are known to all later callers.
+    '''
+    global _WARD_RESOLVER
+    if _WARD_RESOLVER is None:
+        _WARD_RESOLVER = WardResolver()
+    return _WARD_RESOLVER
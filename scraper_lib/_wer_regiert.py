@@ -1,85 +1,189 @@
+from types import MappingProxyType
+
+# per term: the ruling party, the parties of the Landtag and the members of
+# the cabinet (surnames in upper case, as in the protocols) with their party.
+# LIENENKÄMPER was spelled LINIENKÄMPER before, which no protocol matches.
+GOVERNMENTS = {
+    17: {'ruling': 'CDU',
+         'parties': ['CDU', 'SPD', 'FDP', 'AfD', 'GRÜNE', 'FRAKTIONSLOS',
+                     'FR. LOS'],
+         'cabinet': {'STAMP': 'FDP', 'LIENENKÄMPER': 'CDU', 'REUL': 'CDU',
+                     'PINKWART': 'FDP', 'LAUMANN': 'CDU', 'GEBAUER': 'FDP',
+                     'SCHARRENBACH': 'CDU', 'BIESENBACH': 'CDU',
+                     'WÜST': 'CDU', 'SCHULZE FÖCKING': 'CDU',
+                     'HOLTHOFF-PFÖRTNER': 'CDU',
+                     'PFEIFFER-POENSGEN': 'FRAKTIONSLOS', 'KAISER': 'CDU'}},
+    16: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'GRÜNE', 'FDP', 'LINKE', 'PIRATEN',
+                     'FRAKTIONSLOS'],
+         'cabinet': {'KRAFT': 'SPD', 'LÖHRMANN': 'GRÜNE',
+                     'WALTER-BORJANS': 'SPD', 'DUIN': 'SPD', 'JÄGER': 'SPD',
+                     'SCHNEIDER': 'SPD', 'SCHMELTZER': 'SPD',
+                     'KUTSCHATY': 'SPD', 'REMMEL': 'GRÜNE',
+                     'GROSCHEK': 'SPD', 'SCHULZE': 'SPD', 'SCHÄFER': 'SPD',
+                     'KAMPMANN': 'SPD', 'STEFFENS': 'GRÜNE',
+                     'SCHWALL-DÜREN': 'SPD', 'LERSCH-MENSE': 'SPD',
+                     'GÖDECKE': 'SPD'}},
+    15: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'GRÜNE', 'FDP', 'LINKE', 'FRAKTIONSLOS'],
+         'cabinet': {'WALTER-BORJANS': 'SPD', 'VOIGTSBERGER': 'SPD',
+                     'SCHULZE': 'SPD', 'SCHWALL-DÜREN': 'SPD',
+                     'KUTSCHATY': 'SPD', 'SCHNEIDER': 'SPD',
+                     'LÖHRMANN': 'GRÜNE', 'REMMEL': 'GRÜNE',
+                     'STEFFENS': 'GRÜNE', 'KRAFT': 'SPD', 'JÄGER': 'SPD',
+                     'SCHÄFER': 'SPD'}},
+    14: {'ruling': 'CDU',
+         'parties': ['CDU', 'SPD', 'GRÜNE', 'FDP', 'FRAKTIONSLOS'],
+         'cabinet': {'RÜTTGERS': 'CDU', 'KRAUTSCHEID': 'CDU',
+                     'LASCHET': 'CDU', 'BREUER': 'CDU', 'LAUMANN': 'CDU',
+                     'WITTKE': 'CDU', 'THOBEN': 'CDU', 'LIENENKÄMPER': 'CDU',
+                     'LINSSEN': 'CDU', 'MÜLLER-PIEPENKÖTTER': 'CDU',
+                     'SOMMER': 'CDU', 'PINKWART': 'FDP', 'WOLF': 'FDP',
+                     'UHLENBERG': 'CDU'}},
+    13: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'GRÜNE', 'FDP', 'FRAKTIONSLOS'],
+         'cabinet': {'CLEMENT': 'SPD', 'SCHARTAU': 'SPD', 'SAMLAND': 'SPD',
+                     'KRAFT': 'SPD', 'STEINBRÜCK': 'SPD', 'FISCHER': 'SPD',
+                     'BEHRENS': 'SPD', 'DIECKMANN': 'SPD', 'BEHLER': 'SPD',
+                     'VESPER': 'GRÜNE', 'KUSCHKE': 'SPD', 'HÖHN': 'GRÜNE',
+                     'SCHWANHOLD': 'SPD', 'GERHARDS': 'SPD',
+                     'SCHÄFER': 'SPD', 'HORSTMANN': 'SPD'}},
+    12: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'GRÜNE'],
+         'cabinet': {'RAU': 'SPD', 'CLEMENT': 'SPD', 'DAMMEYER': 'SPD',
+                     'HORSTMANN': 'SPD', 'BEHRENS': 'SPD',
+                     'SCHLEUSSER': 'SPD', 'BEHLER': 'SPD',
+                     'RIDDER-MELCHERS': 'SPD', 'VESPER': 'GRÜNE',
+                     'BRUSIS': 'SPD', 'KNIOLA': 'SPD', 'BRUNN': 'SPD',
+                     'MÜNTEFERING': 'SPD', 'HÖHN': 'GRÜNE', 'FISCHER': 'SPD',
+                     'HOMBACH': 'SPD', 'SCHLEUßER': 'SPD',
+                     'DIECKMANN': 'SPD', 'KRUMSIEK': 'SPD', 'SCHNOOR': 'SPD',
+                     'SCHWANHOLD': 'SPD', 'STEINBRÜCK': 'SPD'}},
+    11: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'FDP', 'DIE GRÜNEN', 'FRAKTIONSLOS'],
+         'cabinet': {'RAU': 'SPD', 'CLEMENT': 'SPD', 'SCHNOOR': 'SPD',
+                     'HEINEMANN': 'SPD', 'EINERT': 'SPD',
+                     'SCHLEUSSER': 'SPD', 'KRUMSIEK': 'SPD',
+                     'SCHWIER': 'SPD', 'RIDDER-MELCHERS': 'SPD',
+                     'MATTHIESEN': 'SPD', 'KNIOLA': 'SPD', 'BRUNN': 'SPD',
+                     'MÜNTEFERING': 'SPD'}},
+    10: {'ruling': 'SPD',
+         'parties': ['CDU', 'SPD', 'F.D.P.'],
+         'cabinet': {'RAU': 'SPD', 'POSSER': 'SPD', 'SCHNOOR': 'SPD',
+                     'HEINEMANN': 'SPD', 'EINERT': 'SPD',
+                     'SCHLEUSSER': 'SPD', 'KRUMSIEK': 'SPD',
+                     'SCHWIER': 'SPD', 'ZÖPEL': 'SPD', 'MATTHIESEN': 'SPD',
+                     'JOCHIMSEN': 'SPD', 'BRUNN': 'SPD'}},
+}
+
+
+def _surname(name) -> str:
+    '''
+    'Schleußer', 'SCHLEUßER' and 'SCHLEUSSER' all become 'SCHLEUSSER'.
+    '''
+    return ' '.join(name.split()).upper()
+
+
+def _build():
+    '''
+    Read-only views of the cabinets and the indexes by surname and by party,
+    built once at import.
+    '''
+    cabinets = dict()
+    by_surname = dict()
+    by_party = dict()
+    for term, government in sorted(GOVERNMENTS.items()):
+        cabinets[term] = MappingProxyType(government['cabinet'])
+        for name, party in government['cabinet'].items():
+            by_surname.setdefault(_surname(name), dict())[term] = party
+            by_party.setdefault(party, dict()).setdefault(term, set()).add(
+                _surname(name))
+    return cabinets, by_surname, by_party
+
+
+CABINETS, BY_SURNAME, BY_PARTY = _build()
+
+
+def _term(wahlperiode):
+    try:
+        term = int(wahlperiode)
+    except (TypeError, ValueError):
+        return None
+    return term if term in GOVERNMENTS else None
+
+
 def _wer_regiert(wahlperiode='14'):
     '''
     subfunction _wer_regiert will return the string regPartei for the ruling
     party and a dict regKabinett to make it possible to connect a name that is
     only given with his office to a party.
+    regKabinett is a read-only view shared by all callers.
     Returns: regPartei, regKabinett
     '''
-    if wahlperiode == '17':
-        regPartei = 'CDU'
-        partyList = ['CDU', 'SPD', 'FDP', 'AfD', 'GRÜNE', 'FRAKTIONSLOS',\
-                'FR. LOS']
-        regKabinett = {'STAMP': 'FDP', 'LINIENKÄMPER': 'CDU',\
-                'REUL': 'CDU', 'PINKWART': 'FDP', 'LAUMANN': 'CDU',\
-                'GEBAUER': 'FDP', 'SCHARRENBACH': 'CDU', 'BIESENBACH': 'CDU',\
-                'WÜST': 'CDU', 'SCHULZE FÖCKING': 'CDU',\
-                'HOLTHOFF-PFÖRTNER': 'CDU',\
-                'PFEIFFER-POENSGEN': 'FRAKTIONSLOS', 'KAISER': 'CDU'}
-    elif wahlperiode == '16':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'GRÜNE', 'FDP', 'LINKE', 'PIRATEN',\
-                'FRAKTIONSLOS']
-        regKabinett = {'KRAFT': 'SPD', 'LÖHRMANN': 'GRÜNE',\
-                'WALTER-BORJANS': 'SPD', 'DUIN': 'SPD', 'JÄGER': 'SPD',\
-                'SCHNEIDER': 'SPD', 'SCHMELTZER': 'SPD', 'KUTSCHATY': 'SPD',\
-                'REMMEL': 'GRÜNE', 'GROSCHEK': 'SPD', 'SCHULZE': 'SPD',\
-                'SCHÄFER': 'SPD', 'KAMPMANN': 'SPD', 'STEFFENS': 'GRÜNE',\
-                'SCHWALL-DÜREN': 'SPD', 'LERSCH-MENSE': 'SPD', \
-                'GÖDECKE': 'SPD'}
-    elif wahlperiode == '15':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'GRÜNE', 'FDP', 'LINKE', 'FRAKTIONSLOS']
-        regKabinett = {'WALTER-BORJANS': 'SPD', 'VOIGTSBERGER': 'SPD',\
-                'SCHULZE': 'SPD', 'SCHWALL-DÜREN': 'SPD', 'KUTSCHATY': 'SPD',\
-                'SCHNEIDER': 'SPD', 'LÖHRMANN': 'GRÜNE', 'REMMEL': 'GRÜNE',\
-                'STEFFENS': 'GRÜNE', 'KRAFT': 'SPD', 'JÄGER': 'SPD',\
-                'SCHÄFER': 'SPD'}
-    elif wahlperiode == '14':
-        regPartei = 'CDU'
-        partyList = ['CDU', 'SPD', 'GRÜNE', 'FDP', 'FRAKTIONSLOS']
-        regKabinett = {'RÜTTGERS': 'CDU', 'KRAUTSCHEID': 'CDU',\
-                'LASCHET': 'CDU', 'BREUER': 'CDU', 'LAUMANN': 'CDU',\
-                'WITTKE': 'CDU', 'THOBEN': 'CDU', 'LIENENKÄMPER': 'CDU',\
-                'LINSSEN': 'CDU', 'MÜLLER-PIEPENKÖTTER': 'CDU',\
-                'SOMMER': 'CDU', 'PINKWART': 'FDP', 'WOLF': 'FDP',\
-                'UHLENBERG': 'CDU'}
-    elif wahlperiode == '13':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'GRÜNE', 'FDP', 'FRAKTIONSLOS']
-        regKabinett = {'CLEMENT': 'SPD', 'SCHARTAU': 'SPD',\
-                'SAMLAND': 'SPD', 'KRAFT': 'SPD', 'STEINBRÜCK': 'SPD',\
-                'FISCHER': 'SPD', 'BEHRENS': 'SPD', 'DIECKMANN': 'SPD',\
-                'BEHLER': 'SPD', 'VESPER': 'GRÜNE', 'KUSCHKE': 'SPD',\
-                'HÖHN': 'GRÜNE', 'SCHWANHOLD': 'SPD', 'GERHARDS': 'SPD',
-                'SCHÄFER': 'SPD', 'HORSTMANN': 'SPD'}
-    elif wahlperiode == '12':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'GRÜNE']
-        regKabinett = {'RAU': 'SPD', 'CLEMENT': 'SPD',\
-                'DAMMEYER': 'SPD', 'HORSTMANN': 'SPD', 'BEHRENS': 'SPD',\
-                'SCHLEUSSER': 'SPD', 'BEHRENS': 'SPD', 'BEHLER': 'SPD',\
-                'RIDDER-MELCHERS': 'SPD', 'VESPER': 'GRÜNE', 'BRUSIS': 'SPD',\
-                'KNIOLA': 'SPD', 'BRUNN': 'SPD', 'MÜNTEFERING': 'SPD',\
-                'HÖHN': 'GRÜNE', 'FISCHER': 'SPD', 'HOMBACH': 'SPD',\
-                'SCHLEUßER': 'SPD', 'DIECKMANN': 'SPD', 'KRUMSIEK': 'SPD',\
-                'SCHNOOR': 'SPD', 'SCHWANHOLD': 'SPD', 'STEINBRÜCK': 'SPD'}
-    elif wahlperiode == '11':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'FDP', 'DIE GRÜNEN', 'FRAKTIONSLOS']
-        regKabinett = {'RAU': 'SPD', 'CLEMENT': 'SPD',\
-                'SCHNOOR': 'SPD', 'HEINEMANN': 'SPD', 'EINERT': 'SPD',\
-                'SCHLEUSSER': 'SPD', 'KRUMSIEK': 'SPD', 'SCHWIER': 'SPD',\
-                'RIDDER-MELCHERS': 'SPD', 'MATTHIESEN': 'SPD',\
-                'KNIOLA': 'SPD', 'BRUNN': 'SPD', 'MÜNTEFERING': 'SPD'}
-    elif wahlperiode == '10':
-        regPartei = 'SPD'
-        partyList = ['CDU', 'SPD', 'F.D.P.']
-        regKabinett = {'RAU': 'SPD', 'POSSER': 'SPD', 'SCHNOOR': 'SPD',\
-                'HEINEMANN': 'SPD', 'EINERT': 'SPD', 'SCHLEUSSER': 'SPD',\
-                'KRUMSIEK': 'SPD', 'SCHWIER': 'SPD', 'ZÖPEL': 'SPD',\
-                'MATTHIESEN': 'SPD', 'JOCHIMSEN': 'SPD', 'BRUNN': 'SPD'}
-    else:
+    term = _term(wahlperiode)
+    if term is None:
         print('Wahlperiode not in range between 10 and 17!')
         return None, None
 
-    return regPartei, regKabinett
+    return GOVERNMENTS[term]['ruling'], CABINETS[term]
+
+
+def ruling_party(wahlperiode) -> str:
+    '''The ruling party of a term or None.'''
+    term = _term(wahlperiode)
+    return GOVERNMENTS[term]['ruling'] if term is not None else None
+
+
+def parties_of_term(wahlperiode) -> list:
+    '''The parties of the Landtag in a term as named in the protocols.'''
+    term = _term(wahlperiode)
+    return list(GOVERNMENTS[term]['parties']) if term is not None else []
+
+
+def cabinet(wahlperiode):
+    '''Surname -> party of the cabinet of a term, empty if unknown.'''
+    term = _term(wahlperiode)
+    return CABINETS[term] if term is not None else MappingProxyType({})
+
+
+def party_of_minister(surname, wahlperiode=None) -> str:
+    '''
+    The party of the member of the cabinet of a term called surname, or of
+    the latest term with such a member if wahlperiode is None. None if
+    there is none.
+    '''
+    terms = BY_SURNAME.get(_surname(surname))
+    if not terms:
+        return None
+    if wahlperiode is None:
+        return terms[max(terms)]
+    return terms.get(_term(wahlperiode))
+
+
+def terms_of_minister(surname) -> dict:
+    '''term -> party of every cabinet a member called surname belonged to.'''
+    return dict(BY_SURNAME.get(_surname(surname), {}))
+
+
+def ministers_of_party(party, wahlperiode=None) -> list:
+    '''
+    Sorted surnames of the members of the cabinets of party, in one term,
+    a range of terms (range, list or tuple) or all terms.
+    '''
+    terms = BY_PARTY.get(party, {})
+    if wahlperiode is None:
+        selected = terms.keys()
+    elif isinstance(wahlperiode, (range, list, tuple)):
+        selected = [int(term) for term in wahlperiode]
+    else:
+        selected = [_term(wahlperiode)]
+    names = set()
+    for term in selected:
+        names |= terms.get(term, set())
+    return sorted(names)
+
+
+def terms_ruled_by(party) -> list:
+    '''The terms in which party was the ruling party.'''
+    return [term for term, government in sorted(GOVERNMENTS.items())
+            if government['ruling'] == party]
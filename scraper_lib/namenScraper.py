@@ -1,47 +1,103 @@
 # -*- coding: UTF-8 -*-
 
-import requests
+import os
+import re
 import json
 from bs4 import BeautifulSoup
-from scraper_data.sourceBox import headers, reden_url
+from scraper_data.sourceBox import reden_url
+from scraper_lib._http_client import _get_http_client
+
+URL_YEAR = 'https://www.beliebte-vornamen.de/jahrgang/j{}'
+YEARS = range(1890, 2017)
+YEAR_LOC = './scraper_data/beliebteVornamen/'
+LEXICON_LOC = './scraper_lib/vornamen.txt'
+# version of the layout of vornamen.txt (see build_lexicon)
+LEXICON_VERSION = 1
+
+# <a href="/anna.htm">Anna</a></li>, several names separated by '/'
+NAME_LINE = re.compile(r'^<a href="/.*htm">(.*?)</a>.*</li>$')
+# <li><a href="/wiki/Adalbert" title="Adalbert">Adalbert</a></li>, variants
+# of a name in <i>
+WIKI_LINE = re.compile(r'^<li><a href="/wiki/.*">(.*?)</a></li>$')
+ITALICS = re.compile(r'<i>(.*?)</i>')
+
+
+def _year_loc(year) -> str:
+    return f'{YEAR_LOC}j{year}.html'
+
+
+def _fetch_year(year) -> bool:
+    URL = URL_YEAR.format(year)
+    try:
+        req = _get_http_client().get(URL)
+    except Exception as e:
+        print(e)
+        print(f'Could not download {URL}')
+        return False
+    if req.status_code != 200:
+        print(f'{req.status_code} for {URL}')
+        return False
+    bsObj = BeautifulSoup(req.text, 'lxml')
+    # written to a temporary file first, so an interrupted run never
+    # leaves a truncated page that would be skipped next time
+    with open(_year_loc(year) + '.part', 'w') as fout:
+        fout.write(str(bsObj))
+    os.replace(_year_loc(year) + '.part', _year_loc(year))
+    return True
 
 
-def get_bsObj():
+def get_bsObj(years=YEARS, max_workers=8) -> list:
     '''
-    Download bsObjs for beliebte-Vornamen.de from 1890 to 2017
+    Download bsObjs for beliebte-Vornamen.de from 1890 to 2016, one file per
+    year. Years that have been downloaded before are skipped.
+    Returns the years downloaded now.
     '''
-    url = 'https://www.beliebte-vornamen.de/jahrgang/j{}'
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not os.path.exists(YEAR_LOC):
+        os.makedirs(YEAR_LOC)
+    todo = [year for year in years if not os.path.isfile(_year_loc(year))]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        done = list(pool.map(_fetch_year, todo))
 
-    year = 1890
-    for year in range (1890, 2017):
-        session = requests.Session()
-        URL = url.format(year)
-        req = requests.get(URL, headers=headers[1])
-        bsObj = BeautifulSoup(req.text, 'lxml')
-        with open('./scraper_data/beliebteVornamen.soup', 'a') as fout:
-            fout.write(str(bsObj))
-        year += 1
+    return [year for year, ok in zip(todo, done) if ok]
+
+
+def _names_of_page(file_loc):
+    '''
+    Yields the names of a page of beliebte-vornamen.de, reading it line by
+    line.
+    '''
+    with open(file_loc, 'r') as fin:
+        for line in fin:
+            line = line.rstrip('\n')
+            if not line.endswith('</a></li>'):
+                continue
+            match = NAME_LINE.match(line)
+            if match:
+                for name in match.group(1).split('/'):
+                    name = name.replace(' ', '')
+                    if name:
+                        yield name
 
 
 def extract_names():
-    with open('./scraper_data/beliebteVornamen.soup', 'r') as fin:
-        bsObj = fin.read()
-
-    nameList = list()
-    for line in bsObj.split('\n'):
-        if line.startswith('<a href="/') and line.endswith('</a></li>'):
-            if '.htm' in line:
-                name = line.split('htm">')[-1].split('</a>')[0]
-                if name:
-                    if len(name.split('/')) > 1:
-                        for item in name.split('/'):
-                            if item.replace(' ', '') not in nameList:
-                                nameList.append(item.replace(' ', ''))
-                    elif name not in nameList:
-                        nameList.append(name.replace(' ', ''))
-
-    sorted_nameList = sorted(nameList)
-    return sorted_nameList
+    '''
+    Yields every name of all downloaded years (and of the single
+    beliebteVornamen.soup written by earlier versions, if it is there)
+    once. The files are streamed, only the set of names seen is kept.
+    '''
+    file_locs = [_year_loc(year) for year in YEARS
+                 if os.path.isfile(_year_loc(year))]
+    if os.path.isfile('./scraper_data/beliebteVornamen.soup'):
+        file_locs.append('./scraper_data/beliebteVornamen.soup')
+
+    seen = set()
+    for file_loc in file_locs:
+        for name in _names_of_page(file_loc):
+            if name not in seen:
+                seen.add(name)
+                yield name
 
 
 def get_wiki_bsObj():
@@ -50,41 +106,65 @@ def get_wiki_bsObj():
     '''
     url = 'https://de.wikipedia.org/wiki/Liste_deutscher_Vornamen_germanischer_Herkunft'
 
-    session = requests.Session()
-    req = requests.get(url, headers=headers[1])
+    req = _get_http_client().get(url)
     bsObj = BeautifulSoup(req.text, 'lxml')
     with open('./scraper_data/germanischeVornamen.soup', 'w') as fout:
         fout.write(str(bsObj))
 
 
 def extract_names_from_wiki_bsObj():
+    '''
+    Yields every name of the wiki's list of germanic first names once,
+    streaming the file: the linked name or, if the line has any, the
+    variants in <i>.
+    '''
+    seen = set()
     with open('./scraper_data/germanischeVornamen.soup', 'r') as fin:
-        bsObj = fin.read()
-
-    nameList = list()
-    for line in bsObj.split('\n'):
-        if line.startswith('<li><a href="/wiki/') and \
-                line.endswith('</a></li>'):
-                    name = line.split('">')[-1].split('</a>')[0]
-                    if '<i>' in line:
-                        names = line.split('<i>')[-1]
-                        while '<i>' in names:
-                            name = names.split('</i>')[0]
-                            if name not in nameList:
-                                nameList.append(name.replace(' ', ''))
-                            names = names.split('</i>')[-1]
-                    elif name not in nameList:
-                        nameList.append(name.replace(' ', ''))
-
-    sorted_nameList = sorted(nameList)
-    return sorted_nameList
+        for line in fin:
+            line = line.rstrip('\n')
+            match = WIKI_LINE.match(line)
+            if not match:
+                continue
+            names = ITALICS.findall(line) or [match.group(1)]
+            for name in names:
+                name = name.replace(' ', '')
+                if name and name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def build_lexicon(file_loc=LEXICON_LOC, keep_existing=True) -> int:
+    '''
+    Writes the names of beliebte-vornamen.de and of the wiki's list of
+    germanic first names to file_loc, sorted, one per line, after a header
+    of '#' lines (which _get_vornamenListe and _get_vornamen_index skip).
+    With keep_existing the names already in file_loc are kept, so names
+    added by hand don't get lost. Returns the number of names.
+    '''
+    import datetime
+
+    names = set(extract_names())
+    if os.path.isfile('./scraper_data/germanischeVornamen.soup'):
+        names |= set(extract_names_from_wiki_bsObj())
+    if keep_existing and os.path.isfile(file_loc):
+        with open(file_loc, 'r') as fin:
+            names |= {line.strip() for line in fin
+                      if line.strip() and not line.startswith('#')}
+
+    header = [f'# vornamen.txt version {LEXICON_VERSION}',
+              f'# built {datetime.date.today().isoformat()} from '
+              f'beliebte-vornamen.de ({YEARS[0]}-{YEARS[-1]}) and '
+              f'de.wikipedia.org',
+              f'# {len(names)} names']
+    with open(file_loc + '.part', 'w') as fout:
+        fout.write('\n'.join(header + sorted(names)) + '\n')
+    os.replace(file_loc + '.part', file_loc)
+
+    return len(names)
 
 
 if __name__ == '__main__':
-    nameList_1 = extract_names()
-    nameList_2 = extract_names_from_wiki_bsObj()
-    for name in nameList_2:
-        if name not in nameList_1:
-            nameList_1.append(name)
-    print(sorted(nameList_1))
-    print(len(nameList_1))
+    print(f'downloaded {len(get_bsObj())} years')
+    if not os.path.isfile('./scraper_data/germanischeVornamen.soup'):
+        get_wiki_bsObj()
+    print(f'{build_lexicon()} names in {LEXICON_LOC}')
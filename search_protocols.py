@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+'''
+Searches the contributions of the plenary protocols in the MdL store (see
+protocol_ingest.py), best matches first.
+
+    python search_protocols.py Schulgesetz
+    python search_protocols.py '"Land und Bund" Finanzen' --term 16-17
+    python search_protocols.py Windenergie --party FDP --from 01.01.2018
+
+Words are stemmed ('Schulen' finds 'Schule'), every word and every
+"quoted phrase" must occur.
+'''
+
+import sys
+import time
+import argparse
+
+
+def main(argv=None) -> int:
+    from batch_extract import _parse_terms
+    from scraper_lib._mdl_store import MdL_Store
+    from scraper_lib._fulltext_index import FulltextIndex
+
+    parser = argparse.ArgumentParser(
+        description='Search the contributions of the plenary protocols.')
+    parser.add_argument('query')
+    parser.add_argument('--term', type=_parse_terms, default=None,
+                        help="terms to search, e.g. '17' or '14-17'")
+    parser.add_argument('--party', default=None)
+    parser.add_argument('--speaker', default=None, help='last name')
+    parser.add_argument('--from', dest='date_from', default=None,
+                        help='dd.mm.yyyy or yyyy-mm-dd')
+    parser.add_argument('--to', dest='date_to', default=None)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with MdL_Store() as store:
+        index = FulltextIndex(store)
+        start = time.perf_counter()
+        results = index.search(args.query, legislature=args.term,
+                               party=args.party, speaker=args.speaker,
+                               date_from=args.date_from,
+                               date_to=args.date_to, limit=args.limit)
+        elapsed = time.perf_counter() - start
+        for score, row in results:
+            print(f'{score:6.2f}  {row["protocol_nr"]:>7}  {row["cal_date"]}'
+                  f'  S. {row["page_from"] or "?"}  {row["type_of_contri"]:8}'
+                  f'  {row["speaker"]}')
+    print(f'{len(results)} contributions in {elapsed * 1000:.1f} ms')
+
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
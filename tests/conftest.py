@@ -0,0 +1,31 @@
+import os
+import sys
+import types
+
+import pytest
+
+# the scripts and scraper_lib live in the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURE_LOC = os.path.join(ROOT, 'fixtures') + os.sep
+
+# scraper_lib/list_of_peertitles.py is kept out of the repository; the
+# extractor and the name parser only need the titles themselves
+try:
+    import scraper_lib.list_of_peertitles  # noqa: F401
+except ImportError:
+    _peertitles = types.ModuleType('scraper_lib.list_of_peertitles')
+    _peertitles.peertitles = ['Freiherr', 'Freifrau', 'Graf', 'Gräfin',
+                              'Prinz']
+    sys.modules['scraper_lib.list_of_peertitles'] = _peertitles
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _in_root():
+    # vornamen.txt, stadt_liste.txt and ./data/ are found relative to the
+    # root, as when the scripts are run
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)
+        yield
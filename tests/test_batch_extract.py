@@ -0,0 +1,89 @@
+import os
+import time
+import argparse
+
+import pytest
+
+import batch_extract
+from person import MdL, MdL_record
+from scraper_lib._mdl_store import MdL_Store
+from scraper_lib._record_codec import packb
+
+
+def test_parse_terms():
+    assert batch_extract._parse_terms('14-17') == [14, 15, 16, 17]
+    assert batch_extract._parse_terms('14,16') == [14, 16]
+    for text in ['14-', 'x', '17-14', '']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            batch_extract._parse_terms(text)
+
+
+def test_invalid_terms_are_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as e:
+        batch_extract.main(['--terms', 'vierzehn'])
+    assert e.value.code == 2
+    assert 'invalid terms' in capsys.readouterr().err
+
+
+def test_wards_are_normalized_without_enrich(tmp_path, monkeypatch):
+    mdl = MdL(15, 'Hans', 'Wirtz', party='CDU',
+              electoral_ward='Kreis Aachen II')
+    report = {'rows': 1, 'parse': 0.0, 'extract': 0.0}
+    packed = packb([MdL_record.from_mdl(mdl)])
+    monkeypatch.setattr(batch_extract, '_reports',
+                        lambda terms, workers: [(15, packed, report)])
+    monkeypatch.chdir(tmp_path)
+
+    assert batch_extract.run([15], workers=0, wards=False) == 0
+    with MdL_Store() as store:
+        assert [mdl.electoral_ward for key, mdl in store.mdls(15)] == \
+            ['Aachen IV']
+
+
+def _dying_worker(legislature):
+    if legislature == 15:
+        os._exit(1)
+    time.sleep(0.5)
+    return legislature, packb([]), {
+        'rows': 0, 'parse': 0.0, 'extract': 0.0,
+        'instruments': {'counters': {}, 'timers': {}}}
+
+
+def test_a_dying_worker_fails_its_term(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(batch_extract, '_extract_term', _dying_worker)
+    monkeypatch.chdir(tmp_path)
+
+    failed = batch_extract.run([14, 15], workers=2, wards=False)
+    assert 1 <= failed <= 2
+    assert 'term 15: failed, BrokenProcessPool' in capsys.readouterr().out
+
+
+def test_records_are_enriched_and_stored(tmp_path, monkeypatch):
+    records = [MdL_record(17, 'Hendrik', 'Wüst', party='CDU',
+                          parties=['CDU'], electoral_ward='Borken I'),
+               MdL_record(17, 'Thomas', 'Kutschaty', party='SPD',
+                          parties=['SPD'], electoral_ward='Landesliste')]
+    report = {'rows': 2, 'parse': 0.0, 'extract': 0.0}
+    monkeypatch.setattr(batch_extract, '_reports', lambda terms, workers: [
+        (17, packb(records), report), (16, b'garbage', {})])
+    filled = list()
+
+    def enrich(mdls):
+        for mdl in mdls:
+            if not mdl.is_enriched():
+                mdl.ward_no, mdl.voter_count = 71, 100000
+                filled.append(mdl.last_name)
+
+    monkeypatch.setattr('person.enrich', enrich)
+    monkeypatch.chdir(tmp_path)
+
+    assert batch_extract.run([16, 17], workers=0) == 1
+    assert filled == ['Wüst']
+    with MdL_Store() as store:
+        assert [(key, record.ward_no, record.parties)
+                for key, record in store.records(17)] == [
+            ('Wüst_Hendrik_Borken I_17', 71, ('CDU',)),
+            ('Kutschaty_Thomas_Landesliste_17', None, ('SPD',))]
+        wuest = store.mdls(17)[0][1]
+        assert (wuest.ward_no, wuest.voter_count, wuest.parties) == \
+            (71, 100000, ['CDU'])
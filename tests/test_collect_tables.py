@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import FIXTURE_LOC
+
+from extract_mdl_wiki import Collector_MdLs
+
+PAGE = ('Liste_der_Mitglieder_des_Landtages_Nordrhein-Westfalen_'
+        '({}._Wahlperiode)')
+ROWS = {14: 215, 15: 216, 16: 217, 17: 218}
+
+
+def _collector(legislature):
+    # the table parsers need neither the gazetteer nor the network
+    collector = Collector_MdLs.__new__(Collector_MdLs)
+    collector.legislature = str(legislature)
+    return collector
+
+
+def _page(legislature) -> str:
+    with open(FIXTURE_LOC + PAGE.format(legislature) + '.html', 'r',
+              encoding='utf-8') as fin:
+        return fin.read()
+
+
+@pytest.mark.parametrize('legislature', sorted(ROWS))
+def test_soup_and_iterparse_give_the_same_rows(legislature):
+    collector = _collector(legislature)
+    bsObj = _page(legislature)
+
+    soup = collector._soup_tables(bsObj)
+    streamed = collector._stream_tables(bsObj)
+    assert len(soup['Abgeordnete']) == ROWS[legislature]
+    assert 'Ausgeschiedene Abgeordnete' in soup
+    assert streamed == soup
+
+
+def test_heading_text_inside_a_span():
+    bsObj = ('<html><body><h2><span class="mw-headline">Abgeordnete</span>'
+             '</h2><table><tr><td><a href="#">Wüst</a></td></tr></table>'
+             '</body></html>')
+    collector = _collector(17)
+
+    assert collector._stream_tables(bsObj) == \
+        collector._soup_tables(bsObj)
+    assert collector._stream_tables(bsObj)['Abgeordnete'][0][0]['links'] == \
+        ['Wüst']
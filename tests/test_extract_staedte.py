@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+
+from scraper_lib._extract_staedte import _get_gazetteer, _GAZETTEER
+
+STADT_LISTE = os.path.join(ROOT, 'scraper_lib', 'stadt_liste.txt')
+
+
+@pytest.fixture(scope='module')
+def gazetteer(tmp_path_factory):
+    cache_loc = str(tmp_path_factory.mktemp('gazetteer') / 'cities.pickle')
+    return _get_gazetteer(STADT_LISTE, cache_loc)
+
+
+def test_gazetteer_is_pickled_and_reloaded(tmp_path):
+    cache_loc = str(tmp_path / 'data' / 'cities.pickle')
+
+    gazetteer = _get_gazetteer(STADT_LISTE, cache_loc)
+    assert os.listdir(tmp_path / 'data') == ['cities.pickle']
+    _GAZETTEER.clear()
+    reloaded = _get_gazetteer(STADT_LISTE, cache_loc)
+    assert reloaded is not gazetteer
+    assert reloaded.cities == gazetteer.cities
+
+
+def test_is_city(tmp_path):
+    gazetteer = _get_gazetteer(STADT_LISTE, str(tmp_path / 'cities.pickle'))
+    assert gazetteer.is_city('Soest')
+    assert gazetteer.is_city('Soest-Süd')
+    assert not gazetteer.is_city('Wüst')
+
+
+def test_stale_pickles_are_rebuilt(tmp_path):
+    import pickle
+
+    cache_loc = str(tmp_path / 'cities.pickle')
+    with open(cache_loc, 'wb') as fout:
+        pickle.dump((os.path.getmtime(STADT_LISTE), object()), fout)
+    _GAZETTEER.clear()
+    assert _get_gazetteer(STADT_LISTE, cache_loc).match('Soest I') == 'Soest'
+
+
+@pytest.mark.parametrize('text, city', [
+    ('Soest III', 'Soest'),
+    ('Bad Honnef I', 'Bad Honnef'),
+    ('Mülheim an der Ruhr I', 'Mülheim an der Ruhr'),
+    ('Wüst I', None),
+    ('Hochsauerlandkreis II', None),
+    ('', None)])
+def test_match_finds_the_longest_city(gazetteer, text, city):
+    assert gazetteer.match(text) == city
+
+
+@pytest.mark.parametrize('text, cities', [
+    ('Hochsauerlandkreis II – Soest III', ['Soest']),
+    ('Hochsauerlandkreis II—Soest III', ['Soest']),
+    ('Mülheim an der Ruhr I – Essen IV', ['Mülheim an der Ruhr', 'Essen']),
+    ('Soest-Süd', ['Soest']),
+    ('Rhein-Sieg-Kreis I', [])])
+def test_cities_in_compound_wards(gazetteer, text, cities):
+    assert gazetteer.cities_in(text) == cities
+
+
+@pytest.mark.parametrize('text, is_city, electoral_ward', [
+    ('Soest I', True, 'Soest I'),
+    ('Bad Honnef I', True, 'Bad Honnef I'),
+    ('Mülheim an der Ruhr II', True, 'Mülheim an der Ruhr II'),
+    ('Hochsauerlandkreis II – Soest III', True,
+     'Hochsauerlandkreis II – Soest III'),
+    ('Hochsauerlandkreis II-Soest III', True,
+     'Hochsauerlandkreis II – Soest III'),
+    ('Mülheim an der Ruhr I—Essen IV', True,
+     'Mülheim an der Ruhr I – Essen IV'),
+    ('Rhein-Sieg-Kreis I', False, 'Rhein-Sieg-Kreis I'),
+    ('Landesliste', False, 'ew')])
+def test_wards_of_the_extractor(gazetteer, text, is_city, electoral_ward):
+    from extract_mdl_wiki import Collector_MdLs
+
+    collector = Collector_MdLs.__new__(Collector_MdLs)
+    assert collector._is_city(gazetteer, text) == is_city
+    assert collector.mk_electoral_ward(gazetteer, text) == electoral_ward
@@ -0,0 +1,137 @@
+import sqlite3
+
+import pytest
+
+from scraper_lib._mdl_store import MdL_Store, SCHEMA
+from scraper_lib import _fulltext_index
+from scraper_lib._fulltext_index import FulltextIndex, _stem
+
+
+def _add_contribution(conn, legislature, content):
+    protocol_nr = f'{legislature}/1'
+    conn.execute('INSERT OR IGNORE INTO sessions (protocol_nr, legislature, '
+                 'session_no) VALUES (?, ?, 1)', (protocol_nr, legislature))
+    seq = conn.execute('SELECT COUNT(*) FROM contributions').fetchone()[0]
+    return conn.execute(
+        'INSERT INTO contributions (protocol_nr, seq, legislature, '
+        'session_no, cal_date, speaker, last_name, content) '
+        "VALUES (?, ?, ?, 1, '01.02.2018', 'WÜST (CDU)', 'Wüst', ?)",
+        (protocol_nr, seq, legislature, content)).lastrowid
+
+
+def test_stem():
+    assert _stem('schulgesetzes') == _stem('schulgesetze') == 'schulgesetz'
+    assert _stem('ärzte') == 'arz'
+
+
+def test_lists_of_terms_are_not_ranges(tmp_path):
+    with MdL_Store(str(tmp_path / 'mdls.db')) as store:
+        with store.conn:
+            for legislature in [14, 15, 16]:
+                _add_contribution(store.conn, legislature,
+                                  'Das Schulgesetz ist beschlossen.')
+        index = FulltextIndex(store)
+        index.update(workers=0)
+
+        def terms(legislature):
+            return sorted(row['legislature'] for _, row in
+                          index.search('Schulgesetz', legislature))
+
+        assert terms(None) == [14, 15, 16]
+        assert terms([14, 16]) == [14, 16]
+        assert terms((16,)) == [16]
+        assert terms(range(15, 17)) == [15, 16]
+
+
+@pytest.fixture
+def old_db(tmp_path):
+    '''A store written before contri_id was AUTOINCREMENT.'''
+    db_loc = str(tmp_path / 'mdls.db')
+    conn = sqlite3.connect(db_loc)
+    conn.executescript(SCHEMA.replace(' AUTOINCREMENT', ''))
+    with conn:
+        for content in ['Windenergie im Land', 'Schulgesetz im Land',
+                        'Haushalt im Land']:
+            _add_contribution(conn, 17, content)
+    # an index that may hold the text of a contribution whose id was reused
+    conn.executescript(_fulltext_index.SCHEMA)
+    with conn:
+        conn.execute('INSERT INTO ft_docs (doc_id, length) VALUES (3, 1)')
+    conn.close()
+    return db_loc
+
+
+def test_contributions_are_migrated_to_autoincrement(old_db):
+    with MdL_Store(old_db) as store:
+        sql = store.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'contributions'"
+        ).fetchone()[0]
+        assert 'AUTOINCREMENT' in sql
+        assert [row[0] for row in store.conn.execute(
+            'SELECT contri_id FROM contributions ORDER BY contri_id')] == \
+            [1, 2, 3]
+        index_names = {row[0] for row in store.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'contributions'")}
+        assert 'ix_contributions_legislature' in index_names
+
+        index = FulltextIndex(store)
+        assert index.update(workers=0) == (3, 0)
+        # a replaced contribution gets a new id, its text is indexed again
+        with store.conn:
+            store.conn.execute('DELETE FROM contributions WHERE contri_id = 3')
+            assert _add_contribution(store.conn, 17,
+                                     'Windenergie und Schulgesetz') == 4
+        assert index.update(workers=0) == (1, 1)
+        assert not index.search('Haushalt')
+        assert len(index.search('Schulgesetz')) == 2
+
+    with MdL_Store(old_db) as store:
+        assert store.count_contributions() == 3
+
+
+def _old_schema(person_id):
+    schema = SCHEMA.replace(' AUTOINCREMENT', '')
+    if not person_id:
+        schema = schema.replace(
+            ',\n    person_id INTEGER REFERENCES persons (person_id)', '')
+        schema = schema.replace('CREATE INDEX IF NOT EXISTS ix_mdls_person_id'
+                                ' ON mdls (person_id);', '')
+    return schema
+
+
+def _write_old_db(db_loc, person_id):
+    conn = sqlite3.connect(db_loc)
+    conn.executescript(_old_schema(person_id))
+    with conn:
+        conn.execute("INSERT INTO mdls (key, legislature, first_name, "
+                     "last_name, parties, offices) VALUES "
+                     "('Wüst_Hendrik_Borken I_17', 17, 'Hendrik', 'Wüst', "
+                     "'[\"CDU\"]', '[]')")
+        if person_id:
+            conn.execute("INSERT INTO persons (person_id, person_key) "
+                         "VALUES (42, 'kept')")
+            conn.execute('UPDATE mdls SET person_id = 42')
+        _add_contribution(conn, 17, 'Schulgesetz im Land')
+    conn.close()
+
+
+@pytest.mark.parametrize('person_id', [False, True])
+def test_person_ids_and_contributions_are_migrated_together(tmp_path,
+                                                            person_id):
+    db_loc = str(tmp_path / 'mdls.db')
+    _write_old_db(db_loc, person_id)
+
+    with MdL_Store(db_loc) as store:
+        person_ids = [row[0] for row in store.conn.execute(
+            'SELECT person_id FROM mdls')]
+        if person_id:
+            # the backfill of person ids must not run again
+            assert person_ids == [42]
+        else:
+            assert person_ids[0] is not None
+            assert store.persons('Wüst', 'Hendrik')
+        assert 'AUTOINCREMENT' in store.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'contributions'"
+        ).fetchone()[0]
+        assert store.count_contributions(17) == 1
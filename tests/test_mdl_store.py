@@ -0,0 +1,43 @@
+import pytest
+
+from person import MdL
+from scraper_lib._mdl_store import MdL_Store, _term_clause
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MdL_Store(str(tmp_path / 'mdls.db')) as store:
+        for legislature in [14, 15, 16]:
+            store.write_term(legislature, [
+                MdL(legislature, 'Hendrik', 'Wüst', party='CDU',
+                    parties=['CDU'], electoral_ward='Borken I')])
+        yield store
+
+
+def test_term_clause():
+    assert _term_clause(17) == (' AND mdls.legislature = ?', [17])
+    assert _term_clause(range(14, 18)) == \
+        (' AND mdls.legislature BETWEEN ? AND ?', [14, 17])
+    assert _term_clause([16, 14]) == \
+        (' AND mdls.legislature IN (?, ?)', [14, 16])
+    assert _term_clause(range(14, 18, 2))[1] == [14, 16]
+    assert _term_clause([]) == (' AND 0', [])
+
+
+@pytest.mark.parametrize('legislature, terms', [
+    (15, [15]), (range(14, 16), [14, 15]), ([14, 16], [14, 16]),
+    ((16, 14), [14, 16]), ([], [])])
+def test_lists_of_terms_are_not_ranges(store, legislature, terms):
+    found = store.search('Wüst', legislature)
+    assert sorted(mdl.legislature for key, mdl in found) == terms
+    found = store.of_party('CDU', legislature)
+    assert sorted(mdl.legislature for key, mdl in found) == terms
+
+
+def test_records_are_the_stored_mdls(store):
+    from person import MdL_record
+
+    records = store.records(15)
+    assert [(key, record) for key, record in records] == \
+        [(key, MdL_record.from_mdl(mdl)) for key, mdl in store.mdls(15)]
+    assert not hasattr(records[0][1], '__dict__')
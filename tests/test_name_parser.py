@@ -0,0 +1,185 @@
+import string
+import itertools
+
+import pytest
+
+from scraper_lib.list_of_peertitles import peertitles
+from scraper_lib._extract_vornamen import _get_vornamen_index
+from scraper_lib._name_parser import NameParser, _tokenize
+
+# first names, surnames, prepositions, a peer title, hyphenated names, an
+# academic title and the placeholder the old code knew
+WORDS = ['Hendrik', 'Marc', 'Wüst', 'Xyzzy', 'von', 'de', 'Freiherr',
+         'Müller-von', 'Müller-Lüdenscheidt', 'Hans-Peter', 'Dr.',
+         'last_word']
+
+
+class _Unresolved(Exception):
+    pass
+
+
+def _old_extract_names(text):
+    '''
+    Collector_MdLs._extract_names before NameParser, raising _Unresolved
+    where it raised NoNameException, IndexError or UnboundLocalError.
+    '''
+    first_names = _get_vornamen_index()
+
+    def _is_first_name(word):
+        return first_names.is_first_name(_tokenize(word)[0])
+
+    def _is_preposition(word):
+        return word in ['von', 'van', 'de', 'auf', 'der', 'und', 'zu', 'den',
+                        'dos']
+
+    words = _tokenize(text)
+    middle_name_1 = None
+    middle_name_2 = None
+    preposition = None
+    peer_title = None
+    first_name = None
+    last_name = None
+    if len(words) < 2:
+        raise _Unresolved
+    word_1 = words[0]
+    word_2 = words[1]
+
+    if len(words) == 2:
+        if _is_first_name(word_1):
+            first_name = word_1
+            last_name = word_2
+        else:
+            raise _Unresolved
+    elif len(words) == 3:
+        word_3 = words[-1]
+        if _is_first_name(word_1) and _is_first_name(word_2):
+            first_name = word_1
+            middle_name_1 = word_2
+            last_name = word_3
+        elif _is_preposition(word_2):
+            first_name = word_1
+            preposition = word_2
+            last_name = word_3
+        elif word_1 in peertitles:
+            peer_title = word_1
+            first_name = word_2
+            last_name = word_3
+        elif word_2 in peertitles:
+            first_name = word_1
+            peer_title = word_2
+            last_name = word_3
+        elif '-' in word_2:
+            first_name = word_1
+            words_2 = word_2.split('-')
+            if words_2[-1] in ['von', 'van', 'de', 'zu']:
+                last_name = ' '.join([word_2, word_3])
+        elif word_3 == 'last_word':
+            first_name = word_1
+            last_name = word_2
+        else:
+            first_name = word_1
+            last_name = ' '.join([word_2, word_3])
+    elif len(words) == 4:
+        word_3 = words[2]
+        if word_3[0] in string.punctuation:
+            word_3 = word_3[1:]
+        word_4 = words[-1]
+        if _is_first_name(word_1):
+            first_name = word_1
+        elif word_1 in peertitles:
+            peer_title = word_1
+            if _is_first_name(word_2):
+                first_name = word_2
+        if word_2 in peertitles:
+            peer_title = word_2
+            if _is_preposition(word_3):
+                preposition = word_3
+                last_name = word_4
+            else:
+                last_name = ' '.join([word_3, word_4])
+        elif _is_first_name(word_2):
+            middle_name_1 = word_2
+            if _is_first_name(word_3):
+                middle_name_2 = word_3
+                last_name = word_4
+            elif _is_preposition(word_3):
+                preposition = word_3
+                last_name = word_4
+            else:
+                last_name = ' '.join([word_3, word_4])
+        elif _is_preposition(word_2):
+            if _is_preposition(word_3):
+                preposition = ' '.join([word_2, word_3])
+                last_name = word_4
+            elif '-' in word_3:
+                words_3 = word_3.split('-')
+                if words_3[-1] in ['von', 'van', 'de', 'zu']:
+                    last_name = ' '.join([word_3, word_4])
+            else:
+                preposition = word_2
+                last_name = ' '.join([word_3, word_4])
+        elif not _is_preposition(word_2) and _is_preposition(word_3):
+            preposition = word_3
+            last_name = word_4
+
+    if first_name is None or last_name is None:
+        raise _Unresolved
+    return first_name, middle_name_1, middle_name_2, last_name, \
+        preposition, peer_title
+
+
+def _names():
+    for length in [2, 3, 4]:
+        for words in itertools.product(WORDS, repeat=length):
+            yield ' '.join(words)
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return NameParser(peertitles)
+
+
+def test_same_result_as_before_on_every_shape(parser):
+    checked = 0
+    for text in _names():
+        parsed = parser.parse(text)
+        assert parsed is not None, text
+        try:
+            expected = _old_extract_names(text)
+        except _Unresolved:
+            continue
+        assert tuple(parsed[:6]) == expected, text
+        checked += 1
+    assert checked > 1000
+
+
+@pytest.mark.parametrize('text, last_name, preposition, peer_title', [
+    ('Xyzzy Hendrik Wüst', 'Hendrik Wüst', None, None),
+    ('Hendrik Xyzzy von Wüst', 'Wüst', 'von', None),
+    ('Hendrik von Müller-von Wüst', 'Müller-von Wüst', None, None),
+    ('Hendrik Hendrik Freiherr Wüst', 'Freiherr Wüst', None, None),
+    ('Hendrik Dr. Wüst', 'Dr Wüst', None, None),
+    ('Freiherr Hendrik Freiherr Wüst', 'Freiherr Wüst', None, 'Freiherr'),
+    ('Hendrik von Freiherr Wüst', 'Freiherr Wüst', 'von', None),
+    ('Müller-von Wüst Xyzzy', 'Wüst Xyzzy', None, None),
+])
+def test_names_seen_in_review(parser, text, last_name, preposition,
+                              peer_title):
+    parsed = parser.parse(text)
+    assert (parsed.last_name, parsed.preposition, parsed.peer_title) == \
+        (last_name, preposition, peer_title)
+
+
+def test_longer_names_use_the_grammar(parser):
+    parsed = parser.parse('Dr. Marc Hendrik Xyzzy von Wüst')
+    assert parsed.academic_title == 'Dr'
+    assert parsed.first_name == 'Marc'
+    assert parsed.middle_name_1 == 'Hendrik'
+    assert parsed.last_name == 'Xyzzy von Wüst'
+
+
+def test_unresolved_names_fall_back(parser):
+    assert parser.parse('Xyzzy Wüst')[:4] == (
+        'Xyzzy', None, None, 'Wüst')
+    assert parser.parse('Wüst').last_name == 'Wüst'
+    assert parser.parse(' ') is None
@@ -0,0 +1,120 @@
+import time
+import threading
+import http.server
+
+import pytest
+
+from scraper_lib import _page_cache
+from scraper_lib._page_cache import PageCache
+from scraper_lib._http_client import HttpClient
+
+ETAG = '"rev-1"'
+BODY = b'<html>"wgCurRevisionId":1 Landtag</html>'
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    '''
+    Stands in for Wikipedia: 200 with an ETag, 304 if the request carries
+    it, /slow answers after the client has given up.
+    '''
+    hits = list()
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/slow':
+            time.sleep(1)
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    _Handler.hits = list()
+    client = HttpClient(rate=1000, burst=1000)
+    client.header_sets = [{'User-Agent': 'page cache test'}]
+    monkeypatch.setattr(_page_cache, '_get_http_client', lambda: client)
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_200_is_stored_and_served_from_cache(server, tmp_path):
+    cache = PageCache(str(tmp_path) + '/')
+    URL = server + '/page'
+
+    assert cache.get(URL) == BODY
+    assert cache.get(URL) == BODY
+    assert _Handler.hits == [('/page', None)]
+    meta = cache.meta(URL)
+    assert meta['etag'] == ETAG
+    assert meta['revid'] == 1
+    assert not [file_name for file_name in tmp_path.iterdir()
+                if file_name.name.endswith('.tmp')]
+
+
+def test_304_revalidates_the_cached_body(server, tmp_path):
+    cache = PageCache(str(tmp_path) + '/', ttl=0)
+    URL = server + '/page'
+
+    assert cache.get(URL) == BODY
+    fetched = cache.meta(URL)['fetched']
+    assert cache.get(URL) == BODY
+    assert _Handler.hits == [('/page', None), ('/page', ETAG)]
+    assert cache.meta(URL)['fetched'] >= fetched
+
+
+def test_timeout_serves_the_cached_body(server, tmp_path):
+    cache = PageCache(str(tmp_path) + '/', ttl=0, timeout=0.2)
+    URL = server + '/slow'
+
+    assert cache.get(URL) is None
+    cache.put(URL, BODY, etag='"other"')
+    assert cache.get(URL) == BODY
+    assert cache.meta(URL)['etag'] == '"other"'
+
+
+def test_hits_do_not_rewrite_the_meta_data(server, tmp_path):
+    cache = PageCache(str(tmp_path) + '/')
+    URL = server + '/page'
+
+    cache.get(URL)
+    accessed = cache.meta(URL)['accessed']
+    cache.get(URL)
+    assert cache.meta(URL)['accessed'] == accessed
+
+
+def test_eviction_runs_once_per_interval(server, tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path) + '/', ttl=0)
+    evictions = list()
+    monkeypatch.setattr(cache, 'evict', lambda: evictions.append(1))
+
+    for path in ['/a', '/b', '/c']:
+        cache.get(server + path)
+    assert len(evictions) == 1
+
+
+def test_tables_depend_on_body_and_version(tmp_path):
+    cache = PageCache(str(tmp_path) + '/')
+    URL = 'http://example.org/page'
+    tables = {'Abgeordnete': [['Name', 'Partei']]}
+
+    assert cache.tables(URL, 1) is None
+    cache.put(URL, BODY)
+    cache.store_tables(URL, tables, 1)
+    assert cache.tables(URL, 1) == tables
+    assert cache.tables(URL, 2) is None
+    cache.put(URL, BODY + b' ')
+    assert cache.tables(URL, 1) is None
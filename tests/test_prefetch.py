@@ -0,0 +1,152 @@
+import time
+import threading
+import http.server
+
+import pytest
+
+import prefetch
+from prefetch import Prefetcher
+from scraper_lib import _http_client
+from scraper_lib._page_cache import PageCache
+from scraper_lib._http_client import HttpClient
+
+ETAG = '"rev-1"'
+BODY = b'<html>"wgCurRevisionId":1 Kabinett</html>'
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    '''
+    Stands in for Wikipedia: /slow/... takes a while, /flaky/... fails
+    twice with 503, /busy answers 429 with Retry-After first, /down always
+    500. Every page has an ETag and is not modified if asked with it.
+    '''
+    lock = threading.Lock()
+    hits = list()
+    in_flight = dict()
+    most_in_flight = dict()
+
+    def _answer(self, attempt):
+        if self.path.startswith('/flaky') and attempt < 2:
+            return 503, {}
+        if self.path == '/busy' and attempt == 0:
+            return 429, {'Retry-After': '1'}
+        if self.path == '/down':
+            return 500, {}
+        if self.headers.get('If-None-Match') == ETAG:
+            return 304, {}
+        return 200, {'ETag': ETAG}
+
+    def do_GET(self):
+        host = self.headers.get('Host')
+        with self.lock:
+            attempt = sum(1 for path, at in self.hits if path == self.path)
+            self.hits.append((self.path, time.monotonic()))
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.most_in_flight[host] = max(self.most_in_flight.get(host, 0),
+                                            self.in_flight[host])
+        try:
+            if self.path.startswith('/slow'):
+                time.sleep(0.2)
+            status, headers = self._answer(attempt)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status == 200:
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(BODY)))
+            else:
+                self.send_header('Content-Length', '0')
+            self.end_headers()
+            if status == 200:
+                self.wfile.write(BODY)
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    _Handler.hits = list()
+    _Handler.in_flight = dict()
+    _Handler.most_in_flight = dict()
+    client = HttpClient(rate=1000, burst=1000)
+    client.header_sets = [{'User-Agent': 'prefetch test'}]
+    monkeypatch.setattr(_http_client, '_get_http_client', lambda: client)
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(str(tmp_path) + '/')
+
+
+def _paths(path):
+    return [hit[0] for hit in _Handler.hits if hit[0] == path]
+
+
+def test_requests_per_host_are_limited(server, cache):
+    # two names of the same server are two hosts to the prefetcher
+    urls = [f'http://{host}:{server}/slow/{number}'
+            for host in ['127.0.0.1', 'localhost'] for number in range(6)]
+    results = Prefetcher(per_host=2, cache=cache).run(urls)
+
+    assert set(results.values()) == {'fetched'}
+    assert _Handler.most_in_flight == {f'127.0.0.1:{server}': 2,
+                                       f'localhost:{server}': 2}
+
+
+def test_5xx_are_retried_with_backoff(server, cache):
+    URL = f'http://127.0.0.1:{server}/flaky/page'
+    prefetcher = Prefetcher(backoff=0.05, cache=cache)
+    start = time.monotonic()
+
+    assert prefetcher.run([URL]) == {URL: 'fetched'}
+    assert len(_paths('/flaky/page')) == 3
+    # 0.05 and 0.1 seconds at least, plus jitter
+    assert time.monotonic() - start >= 0.15
+
+
+def test_retry_after_is_honored(server, cache):
+    URL = f'http://127.0.0.1:{server}/busy'
+    assert Prefetcher(backoff=0.01, cache=cache).run([URL]) == \
+        {URL: 'fetched'}
+    first, second = [at for path, at in _Handler.hits if path == '/busy']
+    assert second - first >= 0.9
+
+
+def test_giving_up_after_the_retries(server, cache):
+    URL = f'http://127.0.0.1:{server}/down'
+    assert Prefetcher(retries=2, backoff=0.01, cache=cache).run([URL]) == \
+        {URL: 'failed'}
+    assert len(_paths('/down')) == 3
+    assert cache.lookup(URL) == (None, None)
+
+
+def test_pages_are_written_into_the_page_cache(server, cache):
+    URL = f'http://127.0.0.1:{server}/slow/cabinet'
+    assert Prefetcher(cache=cache).run([URL]) == {URL: 'fetched'}
+    meta, body = cache.lookup(URL)
+    assert body == BODY
+    assert (meta['etag'], meta['revid']) == (ETAG, 1)
+
+    # younger than the ttl: not requested again
+    assert Prefetcher(cache=cache).run([URL]) == {URL: 'fresh'}
+    assert len(_paths('/slow/cabinet')) == 1
+    # forced: revalidated with the ETag
+    assert Prefetcher(force=True, cache=cache).run([URL]) == \
+        {URL: 'not modified'}
+    assert len(_paths('/slow/cabinet')) == 2
+    assert cache.get(URL) == BODY
+
+
+def test_base_url_replaces_wikipedia():
+    urls = prefetch._urls('terms', 'http://127.0.0.1:8000')
+    assert urls
+    assert all(URL.startswith('http://127.0.0.1:8000/wiki/') for URL in urls)
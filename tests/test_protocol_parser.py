@@ -0,0 +1,119 @@
+import pytest
+
+from conftest import FIXTURE_LOC
+from scraper_lib._mdl_store import MdL_Store
+from scraper_lib._extract_vornamen import _get_vornamen_index
+from scraper_lib._protocol_parser import parse_protocol, read_protocol
+
+PROTOCOL = FIXTURE_LOC + 'MMP17-142.txt'
+
+
+@pytest.fixture(scope='module')
+def parsed():
+    return parse_protocol(PROTOCOL, read_protocol(PROTOCOL),
+                          _get_vornamen_index())
+
+
+def test_session(parsed):
+    session, subs, contributions = parsed
+    assert (session.protocol_nr, session.cal_date) == ('17/142',
+                                                       '15.09.2021')
+    assert {contribution['contri'].pages
+            for contribution in contributions} == {'15001|15002'}
+
+
+def test_contributions_are_merged_and_typed(parsed):
+    session, subs, contributions = parsed
+    assert [(contribution['seq'], contribution['raw'],
+             contribution['contri'].type_of_contri)
+            for contribution in contributions] == [
+        (0, 'Hendrik Wüst (CDU)', 'speech'),
+        (1, 'Josef Neumann (SPD)', 'ZwFr'),
+        (2, 'Dr. Marc von Berg (FDP)', 'PersErkl'),
+        (3, 'Lutz Lienenkämper, Minister der Finanzen', 'speech')]
+    # the speech goes on after the question, the answer to the chair
+    # included
+    assert contributions[0]['contri'].content == (
+        'Herr Präsident! Meine Damen und Herren! Die Kommunen brauchen '
+        'unsere Unterstützung. Ja, bitte. Aus dem Landeshaushalt, und zwar '
+        'auf Dauer. (Beifall von der CDU)')
+    assert contributions[1]['contri'].content == \
+        'Herr Kollege, wie wollen Sie das finanzieren?'
+
+
+def test_speakers(parsed):
+    session, subs, contributions = parsed
+    berg = contributions[2]
+    assert (berg['first_name'], berg['speaker'].last_name,
+            berg['speaker'].peer_preposition,
+            berg['speaker'].academic_title) == ('Marc', 'Berg', 'von', 'Dr.')
+    minister = contributions[3]
+    assert (minister['speaker'].last_name, minister['speaker'].minister,
+            minister['contri'].party) == ('Lienenkämper',
+                                          'Minister der Finanzen', '')
+
+
+def test_pages_across_page_breaks(parsed):
+    session, subs, contributions = parsed
+    assert [(contribution['contri'].page_from, contribution['contri'].page_to)
+            for contribution in contributions] == [
+        ('15001', '15002'), ('15001', '15001'), ('15002', '15002'),
+        ('15002', '15002')]
+    # the page header and the date below it are not part of the speech
+    assert 'Plenarprotokoll' not in contributions[0]['contri'].content
+    assert [(sub.page_from, sub.page_to) for sub in subs] == [
+        ('15001', '15002'), ('15002', '15002')]
+
+
+def test_agenda_items_and_results(parsed):
+    session, subs, contributions = parsed
+    assert [(sub.topic, sub.details, sub.result) for sub in subs] == [
+        ('Gesetz zur Stärkung der Kommunen Gesetzentwurf der '
+         'Landesregierung', 'Drs 17/14000',
+         'Der Gesetzentwurf Drucksache 17/14000 ist damit angenommen.'),
+        ('Fragestunde', 'Drs 17/14100',
+         'Der Antrag wird an den Haushaltsausschuss überwiesen.')]
+    assert [contribution['sub'] for contribution in contributions] == \
+        [0, 0, 0, 1]
+    assert [[speaker.last_name for speaker in sub.lineup]
+            for sub in subs] == [['Wüst', 'Neumann', 'Berg'],
+                                 ['Lienenkämper']]
+
+
+def test_write_sessions_round_trip(parsed, tmp_path):
+    session, subs, contributions = parsed
+    contributions = [dict(contribution) for contribution in contributions]
+    contributions[0]['key'] = 'Wüst_Hendrik_Borken I_17'
+    with MdL_Store(str(tmp_path / 'mdls.db')) as store:
+        batch = [(PROTOCOL, 1.0, session, subs, contributions)]
+        assert store.write_sessions(batch) == 4
+        # writing a protocol again replaces its rows
+        assert store.write_sessions(batch) == 4
+        assert store.ingested_sources(17) == {PROTOCOL: 1.0}
+        assert store.count_contributions(17) == 4
+
+        rows = store.contributions('17/142')
+        assert [(row['seq'], row['sub_seq'], row['last_name'],
+                 row['first_name'], row['party'], row['type_of_contri'],
+                 row['page_from'], row['page_to'], row['key'])
+                for row in rows] == [
+            (0, 0, 'Wüst', 'Hendrik', 'CDU', 'speech', '15001',
+             '15002', 'Wüst_Hendrik_Borken I_17'),
+            (1, 0, 'Neumann', 'Josef', 'SPD', 'ZwFr', '15001', '15001',
+             None),
+            (2, 0, 'Berg', 'Marc', 'FDP', 'PersErkl', '15002', '15002',
+             None),
+            (3, 1, 'Lienenkämper', 'Lutz', None, 'speech', '15002',
+             '15002', None)]
+        assert [row['content'] for row in rows] == \
+            [contribution['contri'].content
+             for contribution in contributions]
+        assert rows[2]['peer_preposition'] == 'von'
+        assert rows[3]['office'] == 'Minister der Finanzen'
+        assert rows[0]['speaker'] == 'Hendrik Wüst (CDU)'
+
+        stored = store.session_subs('17/142')
+        assert [(sub.cal_date, sub.topic, sub.details, sub.page_from,
+                 sub.page_to, sub.result) for sub in stored] == \
+            [(sub.cal_date, sub.topic, sub.details, sub.page_from,
+              sub.page_to, sub.result) for sub in subs]
@@ -0,0 +1,35 @@
+import json
+
+from person import MdL_record
+from scraper_lib import _record_codec
+from scraper_lib._record_codec import packb, unpackb, MAGIC, JSON, MSGPACK
+
+RECORDS = [MdL_record(17, 'Hendrik', 'Wüst', party='CDU', parties=['CDU'],
+                      electoral_ward='Borken I', ward_no=71),
+           MdL_record(17, 'Thomas', 'Kutschaty', party='SPD',
+                      parties=['SPD'], offices=['Fraktionsvorsitzender'])]
+
+
+def test_records_survive_packing():
+    assert unpackb(packb(RECORDS)) == RECORDS
+
+
+def test_records_are_hashable():
+    assert len({RECORDS[0], MdL_record.from_tuple(RECORDS[0].as_tuple()),
+                RECORDS[1]}) == 2
+
+
+def test_without_msgpack_records_are_packed_as_json(monkeypatch):
+    monkeypatch.setattr(_record_codec, '_msgpack', lambda: None)
+    data = packb(RECORDS)
+    assert data.startswith(MAGIC + JSON)
+    # no Python specific bytes, any installation can read it
+    json.loads(data[len(MAGIC) + 1:].decode('utf-8'))
+    assert unpackb(data) == RECORDS
+
+
+def test_unreadable_data_is_rejected(monkeypatch):
+    monkeypatch.setattr(_record_codec, '_msgpack', lambda: None)
+    assert unpackb(b'PK\x03\x04') is None
+    assert unpackb(MAGIC + b'x' + b'{}') is None
+    assert unpackb(MAGIC + MSGPACK + b'\x80') is None
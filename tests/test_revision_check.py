@@ -0,0 +1,61 @@
+from scraper_lib import _revision_check
+from scraper_lib._page_cache import PageCache
+from scraper_lib._revision_check import _latest_revisions, _stale_pages
+
+WIKI = 'https://de.wikipedia.org/wiki/'
+URL_RAU = WIKI + 'Kabinett_Rau_V'
+URL_REDIRECT = WIKI + 'landesregierung_NRW'
+URL_GONE = WIKI + 'Kabinett_Niemand'
+
+
+class _Answer:
+    def __init__(self, query):
+        self.query = query
+
+    def json(self):
+        return {'query': self.query}
+
+
+class _Client:
+    '''Answers like the MediaWiki API and remembers the parameters.'''
+    def __init__(self, query):
+        self.query = query
+        self.params = list()
+
+    def get(self, URL, params=None, timeout=None):
+        self.params.append(params)
+        return _Answer(self.query)
+
+
+QUERY = {
+    'normalized': [{'from': 'landesregierung NRW',
+                    'to': 'Landesregierung NRW'}],
+    'redirects': [{'from': 'Landesregierung NRW',
+                   'to': 'Landesregierung (Nordrhein-Westfalen)'}],
+    'pages': [{'title': 'Kabinett Rau V', 'lastrevid': 11},
+              {'title': 'Landesregierung (Nordrhein-Westfalen)',
+               'lastrevid': 22}]}
+
+
+def test_redirects_are_followed(monkeypatch):
+    client = _Client(QUERY)
+    monkeypatch.setattr(_revision_check, '_get_http_client', lambda: client)
+
+    assert _latest_revisions([URL_RAU, URL_REDIRECT, URL_GONE]) == \
+        {URL_RAU: 11, URL_REDIRECT: 22}
+    assert client.params[0]['redirects'] == '1'
+
+
+def test_stale_pages(monkeypatch, tmp_path):
+    monkeypatch.setattr(_revision_check, '_get_http_client',
+                        lambda: _Client(QUERY))
+    cache = PageCache(str(tmp_path) + '/')
+    cache.put(URL_RAU, b'"wgCurRevisionId":11')
+    cache.put(URL_REDIRECT, b'"wgCurRevisionId":21')
+    cache.put(URL_GONE, b'"wgCurRevisionId":33')
+
+    # changed, not answered by the API; Rau V is unchanged
+    assert _stale_pages([URL_RAU, URL_REDIRECT, URL_GONE], cache) == \
+        [URL_REDIRECT, URL_GONE]
+    cache.put(URL_REDIRECT, b'"wgCurRevisionId":22')
+    assert _stale_pages([URL_RAU, URL_REDIRECT], cache) == []
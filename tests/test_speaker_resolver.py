@@ -0,0 +1,74 @@
+import pytest
+
+from person import MdL
+from scraper_lib._mdl_store import MdL_Store
+from scraper_lib._speaker_resolver import SpeakerResolver
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    with MdL_Store(str(tmp_path / 'mdls.db')) as store:
+        store.write_term(17, [
+            MdL(17, 'Josef', 'Neumann', party='SPD', parties=['SPD']),
+            MdL(17, 'Marc', 'Berg', peer_preposition='von', party='FDP',
+                parties=['FDP']),
+            MdL(17, 'Christina', 'Schulze Föcking', party='CDU',
+                parties=['CDU']),
+            MdL(17, 'Lutz', 'Lienenkämper', party='CDU', parties=['CDU']),
+            MdL(17, 'Joachim', 'Stamp', party='FDP', parties=['FDP']),
+            MdL(17, 'Anna', 'Müller', party='CDU', parties=['CDU']),
+            MdL(17, 'Bernd', 'Müller', party='SPD', parties=['SPD']),
+            MdL(17, 'Klaus', 'Kaiser', party='CDU', parties=['CDU']),
+            MdL(17, 'Eva', 'Kaiser', party='SPD', parties=['SPD']),
+            # the preposition got lost when the MdLs were extracted
+            MdL(17, 'Jens', 'Hoff', party='CDU', parties=['CDU'])])
+        yield SpeakerResolver(17, store)
+
+
+@pytest.mark.parametrize('speaker, key', [
+    ('Josef Neumann (SPD)', 'Neumann_Josef_ew_17'),
+    ('Josef Maria Neumann (SPD)', 'Neumann_Josef_ew_17'),
+    ('JOSEF MARIA NEUMANN (SPD)', 'Neumann_Josef_ew_17'),
+    ('NEUMANN (SPD)', 'Neumann_Josef_ew_17'),
+    ('Dr. Marc von Berg (FDP):', 'Berg_Marc_ew_17'),
+    ('MARC VON BERG (FDP)', 'Berg_Marc_ew_17'),
+    ('VON BERG (FDP)', 'Berg_Marc_ew_17'),
+    ('Christina Schulze Föcking (CDU)', 'Schulze Föcking_Christina_ew_17'),
+    ('SCHULZE FÖCKING (CDU)', 'Schulze Föcking_Christina_ew_17'),
+    ('Jens von Hoff (CDU)', 'Hoff_Jens_ew_17'),
+    ('VON HOFF', 'Hoff_Jens_ew_17')])
+def test_members(resolver, speaker, key):
+    assert resolver.resolve(speaker) == key
+
+
+@pytest.mark.parametrize('speaker, key', [
+    ('FM LIENENKÄMPER', 'Lienenkämper_Lutz_ew_17'),
+    ('FM LIENENKÄMPER:', 'Lienenkämper_Lutz_ew_17'),
+    ('Lutz Lienenkämper, Minister der Finanzen', 'Lienenkämper_Lutz_ew_17'),
+    ('MIN STAMP', 'Stamp_Joachim_ew_17')])
+def test_ministers(resolver, speaker, key):
+    assert resolver.resolve(speaker) == key
+
+
+def test_the_cabinet_tells_the_party_of_an_ambiguous_minister(resolver):
+    # KAISER is a CDU minister of term 17
+    assert resolver.resolve('MIN KAISER') == 'Kaiser_Klaus_ew_17'
+    assert resolver.resolve('KAISER') == 'Kaiser_Klaus_ew_17'
+    assert resolver.resolve('KAISER (SPD)') == 'Kaiser_Eva_ew_17'
+
+
+@pytest.mark.parametrize('speaker, key', [
+    ('MÜLLER', None),
+    ('Müller (FDP)', None),
+    ('MÜLLER (CDU)', 'Müller_Anna_ew_17'),
+    ('Bernd Müller', 'Müller_Bernd_ew_17'),
+    ('Schmidt (SPD)', None)])
+def test_ambiguous_and_unknown_surnames(resolver, speaker, key):
+    assert resolver.resolve(speaker) == key
+
+
+def test_speakers_are_resolved_once(resolver, monkeypatch):
+    assert resolver.resolve('NEUMANN (SPD)') == 'Neumann_Josef_ew_17'
+    monkeypatch.setattr(resolver, '_parse', None)
+    assert resolver.resolve('NEUMANN (SPD)') == 'Neumann_Josef_ew_17'
+    assert resolver.mdl('NEUMANN (SPD)').first_name == 'Josef'
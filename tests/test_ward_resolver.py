@@ -0,0 +1,35 @@
+import os
+import json
+
+from scraper_lib._ward_resolver import WardResolver, _normalize_ward
+
+
+def test_saved_wards_are_merged_and_written_aside(tmp_path, monkeypatch):
+    file_loc = str(tmp_path / 'data' / 'ward_details.json')
+    first = WardResolver(file_loc=file_loc)
+    second = WardResolver(file_loc=file_loc)
+    monkeypatch.setattr(WardResolver, '_fetch',
+                        lambda self, ward: (len(ward), 1000))
+
+    first.resolve(['Borken I'])
+    second.resolve(['Soest I', 'Landesliste'])
+    with open(file_loc, 'r', encoding='utf-8') as fin:
+        assert json.load(fin) == {'Borken I': [8, 1000],
+                                  'Soest I': [7, 1000]}
+    assert os.listdir(tmp_path / 'data') == ['ward_details.json']
+    assert WardResolver(file_loc=file_loc).wards['Borken I'] == (8, 1000)
+
+
+def test_unresolved_wards_are_not_saved(tmp_path, monkeypatch):
+    file_loc = str(tmp_path / 'ward_details.json')
+    monkeypatch.setattr(WardResolver, '_fetch',
+                        lambda self, ward: ('None', 'None'))
+    WardResolver(file_loc=file_loc).resolve(['Essen II'])
+    with open(file_loc, 'r', encoding='utf-8') as fin:
+        assert json.load(fin) == {}
+
+
+def test_normalize_ward():
+    assert _normalize_ward('Kreis Aachen I', 'Schmitz') == 'Aachen III'
+    assert _normalize_ward('Kreis Aachen II', 'Wirtz') == 'Aachen IV'
+    assert _normalize_ward('Kreis Aachen II', 'Schmitz') == 'Kreis Aachen II'
@@ -0,0 +1,129 @@
+import pytest
+
+from scraper_lib import _wer_regiert as wer
+
+# term: (ruling party, cabinet) as given by the original _wer_regiert, only
+# LINIENKÄMPER is spelled LIENENKÄMPER now
+PINNED = {
+    10: ('SPD', {
+        'BRUNN': 'SPD', 'EINERT': 'SPD', 'HEINEMANN': 'SPD',
+        'JOCHIMSEN': 'SPD', 'KRUMSIEK': 'SPD', 'MATTHIESEN': 'SPD',
+        'POSSER': 'SPD', 'RAU': 'SPD', 'SCHLEUSSER': 'SPD', 'SCHNOOR': 'SPD',
+        'SCHWIER': 'SPD', 'ZÖPEL': 'SPD'}),
+    11: ('SPD', {
+        'BRUNN': 'SPD', 'CLEMENT': 'SPD', 'EINERT': 'SPD', 'HEINEMANN': 'SPD',
+        'KNIOLA': 'SPD', 'KRUMSIEK': 'SPD', 'MATTHIESEN': 'SPD',
+        'MÜNTEFERING': 'SPD', 'RAU': 'SPD', 'RIDDER-MELCHERS': 'SPD',
+        'SCHLEUSSER': 'SPD', 'SCHNOOR': 'SPD', 'SCHWIER': 'SPD'}),
+    12: ('SPD', {
+        'BEHLER': 'SPD', 'BEHRENS': 'SPD', 'BRUNN': 'SPD', 'BRUSIS': 'SPD',
+        'CLEMENT': 'SPD', 'DAMMEYER': 'SPD', 'DIECKMANN': 'SPD',
+        'FISCHER': 'SPD', 'HOMBACH': 'SPD', 'HORSTMANN': 'SPD',
+        'HÖHN': 'GRÜNE', 'KNIOLA': 'SPD', 'KRUMSIEK': 'SPD',
+        'MÜNTEFERING': 'SPD', 'RAU': 'SPD', 'RIDDER-MELCHERS': 'SPD',
+        'SCHLEUSSER': 'SPD', 'SCHLEUßER': 'SPD', 'SCHNOOR': 'SPD',
+        'SCHWANHOLD': 'SPD', 'STEINBRÜCK': 'SPD', 'VESPER': 'GRÜNE'}),
+    13: ('SPD', {
+        'BEHLER': 'SPD', 'BEHRENS': 'SPD', 'CLEMENT': 'SPD',
+        'DIECKMANN': 'SPD', 'FISCHER': 'SPD', 'GERHARDS': 'SPD',
+        'HORSTMANN': 'SPD', 'HÖHN': 'GRÜNE', 'KRAFT': 'SPD',
+        'KUSCHKE': 'SPD', 'SAMLAND': 'SPD', 'SCHARTAU': 'SPD',
+        'SCHWANHOLD': 'SPD', 'SCHÄFER': 'SPD', 'STEINBRÜCK': 'SPD',
+        'VESPER': 'GRÜNE'}),
+    14: ('CDU', {
+        'BREUER': 'CDU', 'KRAUTSCHEID': 'CDU', 'LASCHET': 'CDU',
+        'LAUMANN': 'CDU', 'LIENENKÄMPER': 'CDU', 'LINSSEN': 'CDU',
+        'MÜLLER-PIEPENKÖTTER': 'CDU', 'PINKWART': 'FDP', 'RÜTTGERS': 'CDU',
+        'SOMMER': 'CDU', 'THOBEN': 'CDU', 'UHLENBERG': 'CDU', 'WITTKE': 'CDU',
+        'WOLF': 'FDP'}),
+    15: ('SPD', {
+        'JÄGER': 'SPD', 'KRAFT': 'SPD', 'KUTSCHATY': 'SPD',
+        'LÖHRMANN': 'GRÜNE', 'REMMEL': 'GRÜNE', 'SCHNEIDER': 'SPD',
+        'SCHULZE': 'SPD', 'SCHWALL-DÜREN': 'SPD', 'SCHÄFER': 'SPD',
+        'STEFFENS': 'GRÜNE', 'VOIGTSBERGER': 'SPD', 'WALTER-BORJANS': 'SPD'}),
+    16: ('SPD', {
+        'DUIN': 'SPD', 'GROSCHEK': 'SPD', 'GÖDECKE': 'SPD', 'JÄGER': 'SPD',
+        'KAMPMANN': 'SPD', 'KRAFT': 'SPD', 'KUTSCHATY': 'SPD',
+        'LERSCH-MENSE': 'SPD', 'LÖHRMANN': 'GRÜNE', 'REMMEL': 'GRÜNE',
+        'SCHMELTZER': 'SPD', 'SCHNEIDER': 'SPD', 'SCHULZE': 'SPD',
+        'SCHWALL-DÜREN': 'SPD', 'SCHÄFER': 'SPD', 'STEFFENS': 'GRÜNE',
+        'WALTER-BORJANS': 'SPD'}),
+    17: ('CDU', {
+        'BIESENBACH': 'CDU', 'GEBAUER': 'FDP', 'HOLTHOFF-PFÖRTNER': 'CDU',
+        'KAISER': 'CDU', 'LAUMANN': 'CDU', 'LIENENKÄMPER': 'CDU',
+        'PFEIFFER-POENSGEN': 'FRAKTIONSLOS', 'PINKWART': 'FDP', 'REUL': 'CDU',
+        'SCHARRENBACH': 'CDU', 'SCHULZE FÖCKING': 'CDU', 'STAMP': 'FDP',
+        'WÜST': 'CDU'}),
+}
+
+
+@pytest.mark.parametrize('term', sorted(PINNED))
+def test_cabinet_of_every_term_is_pinned(term):
+    ruling, cabinet = PINNED[term]
+    assert wer._wer_regiert(str(term)) == (ruling, cabinet)
+    assert wer._wer_regiert(term)[1] is wer.CABINETS[term]
+    assert wer.ruling_party(term) == ruling
+    assert wer.cabinet(str(term)) == cabinet
+    assert wer.parties_of_term(term) == wer.GOVERNMENTS[term]['parties']
+
+
+def test_unknown_terms():
+    assert wer._wer_regiert('9') == (None, None)
+    assert wer._wer_regiert('x') == (None, None)
+    assert wer.ruling_party(18) is None
+    assert wer.parties_of_term(None) == []
+    assert dict(wer.cabinet(9)) == {}
+    assert wer.party_of_minister('Stamp', 9) is None
+
+
+def test_cabinets_are_read_only():
+    with pytest.raises(TypeError):
+        wer.cabinet(17)['STAMP'] = 'CDU'
+    wer.parties_of_term(17).append('X')
+    assert 'X' not in wer.GOVERNMENTS[17]['parties']
+
+
+def test_indexes_by_surname_and_party():
+    assert wer.BY_SURNAME['LIENENKÄMPER'] == {14: 'CDU', 17: 'CDU'}
+    assert 'LINIENKÄMPER' not in wer.BY_SURNAME
+    # both spellings of the term 12 cabinet fall together
+    assert wer.BY_SURNAME['SCHLEUSSER'][12] == 'SPD'
+    assert 'SCHLEUßER' not in wer.BY_SURNAME
+    assert wer.BY_PARTY['FDP'] == {
+        14: {'PINKWART', 'WOLF'}, 17: {'GEBAUER', 'PINKWART', 'STAMP'}}
+    assert set(wer.BY_PARTY) == {party
+                                 for _, cabinet in PINNED.values()
+                                 for party in cabinet.values()}
+
+
+def test_party_of_minister():
+    assert wer.party_of_minister('LÖHRMANN', '16') == 'GRÜNE'
+    assert wer.party_of_minister('löhrmann') == 'GRÜNE'
+    assert wer.party_of_minister('Schulze  Föcking') == 'CDU'
+    assert wer.party_of_minister('Pfeiffer-Poensgen') == 'FRAKTIONSLOS'
+    assert wer.party_of_minister('Pinkwart', 16) is None
+    assert wer.party_of_minister('Müller') is None
+
+
+def test_terms_of_minister():
+    assert wer.terms_of_minister('Pinkwart') == {14: 'FDP', 17: 'FDP'}
+    assert wer.terms_of_minister('Kraft') == {13: 'SPD', 15: 'SPD',
+                                           16: 'SPD'}
+    assert wer.terms_of_minister('Müller') == {}
+
+
+def test_ministers_of_party():
+    assert wer.ministers_of_party('FDP', '17') == ['GEBAUER', 'PINKWART',
+                                                  'STAMP']
+    assert wer.ministers_of_party('FDP', range(14, 16)) == ['PINKWART',
+                                                           'WOLF']
+    assert wer.ministers_of_party('FDP', [14, 17]) == \
+        wer.ministers_of_party('FDP')
+    assert wer.ministers_of_party('GRÜNE', 17) == []
+    assert wer.ministers_of_party('PIRATEN') == []
+
+
+def test_terms_ruled_by():
+    assert wer.terms_ruled_by('CDU') == [14, 17]
+    assert wer.terms_ruled_by('SPD') == [10, 11, 12, 13, 15, 16]
+    assert wer.terms_ruled_by('FDP') == []
@@ -1,11 +1,33 @@
 #!/usr/bin/env python
 
+CABINETS = ['Amelunxen I', 'Amelunxen II', 'Arnold I', 'Arnold II',
+            'Arnold III', 'Steinhoff', 'Meyers I', 'Meyers II',
+            'Meyers III', 'Kühn I', 'Kühn II', 'Kühn III', 'Rau I',
+            'Rau II', 'Rau III', 'Rau IV', 'Rau V', 'Clement I',
+            'Clement II', 'Steinbrück', 'Rüttgers', 'Kraft I',
+            'Kraft II', 'Laschet']
+URL_CABINET = 'https://de.wikipedia.org/wiki/Kabinett_{}'
+URL_CABINETS = 'https://de.wikipedia.org/wiki/Landesregierung_von_Nordrhein-Westfalen'
+URL_TERM = 'https://de.wikipedia.org/wiki/Liste_der_Mitglieder_des_Landtages_Nordrhein-Westfalen_({}._Wahlperiode)'
+TERMS = range(10, 18)
+
+
 class Reader:
     '''
-    Checks disk for soup object and prints out the result.
+    Checks page cache (or disk for an older soup object) and prints out the
+    result.
     '''
     def show_file_content(self, URL) -> bool:
         import os
+        from scraper_lib._page_cache import _get_page_cache
+
+        meta, body = _get_page_cache().lookup(URL)
+        if body is not None:
+            text = body.decode(meta['encoding'], errors='replace')
+            for line in text.split('\n'):
+                print(line)
+            return True
+
         file_name = URL.split('/')[-1] + '.soup'
         file_name = file_name
 
@@ -22,30 +44,20 @@ class Reader:
 
 class Loader:
     '''
-    Downloads pages about parliament of NRW and save as bs_objects.
+    Downloads pages about parliament of NRW into the page cache, which keeps
+    the original html gzipped.
     '''
     def download_bsObj(self, URL) -> bool:
-        import requests
-        import random
-        from bs4 import BeautifulSoup
-        from data.sourceBox import headers
-
-        ix = random.randint(1, 6)
-
-        file_name = URL.split('/')[-1] + '.soup'
-        file_loc = './data/soup_objects/' + file_name
-
-        try:
-            req = requests.get(URL, headers[ix])
-        except requests.exceptions.ConnectionError as e:
-            print(e)
-            print('ConnectionError, no download')
+        from scraper_lib._page_cache import _get_page_cache
+        from scraper_lib._instrument import _get_instruments
+
+        # the http client sends one of the header sets of data.sourceBox
+        with _get_instruments().timer('download_bsObj'):
+            body = _get_page_cache().get(URL)
+        if body is None:
+            print('No download')
             return False
 
-        bsObj = BeautifulSoup(req.text, 'lxml')
-        with open(file_loc, 'w', encoding='utf-8') as fout:
-            fout.write(str(bsObj))
-
         return True
 
 
@@ -59,7 +71,8 @@ class Menu(Loader, Reader):
                 "2": self.cabinets_nrw,
                 "3": self.specific_cabinet,
                 "4": self.mdls_of_term,
-                "5": self.quit
+                "5": self.stale_pages,
+                "6": self.quit
                 }
         self.DIR_LOC = './data/soup_objects/'
 
@@ -67,11 +80,12 @@ class Menu(Loader, Reader):
         print("""
     Menu to display contents of a specific legislature and its MdLs
 
-    1. Show content of ./data/soup_objects/
+    1. Show downloaded pages (./data/page_cache/, ./data/soup_objects/)
     2. Show wikipage of cabinets of NRW (downloads if not on disk)
     3. Show wikipage of a specific cabinet (downloads if not on disk)
     4. Show wikipage of MdLs of chosen legislature (downloads if not on disk)
-    5. Quit
+    5. Check which wikipages of cabinets and legislatures have changed
+    6. Quit
     """)
 
     def run(self) -> None:
@@ -91,8 +105,12 @@ class Menu(Loader, Reader):
 
     def show_directory(self) -> None:
         import os
-        for directory in sorted(os.listdir(self.DIR_LOC)):
-            print(directory)
+        from scraper_lib._page_cache import _get_page_cache
+        for URL in _get_page_cache().urls():
+            print(URL.split('/')[-1])
+        if os.path.exists(self.DIR_LOC):
+            for directory in sorted(os.listdir(self.DIR_LOC)):
+                print(directory)
 
     def show_file_content(self, URL):
         return Reader.show_file_content(self, URL)
@@ -122,14 +140,8 @@ class Menu(Loader, Reader):
         return self.choice
 
     def specific_cabinet(self) -> bool:
-        CABINETS = ['Amelunxen I', 'Amelunxen II', 'Arnold I', 'Arnold II',
-                    'Arnold III', 'Steinhoff', 'Meyers I', 'Meyers II',
-                    'Meyers III', 'Kühn I', 'Kühn II', 'Kühn III', 'Rau I',
-                    'Rau II', 'Rau III', 'Rau IV', 'Rau V', 'Clement I',
-                    'Clement II', 'Steinbrück', 'Rüttgers', 'Kraft I',
-                    'Kraft II', 'Laschet']
         print(CABINETS)
-        URL = 'https://de.wikipedia.org/wiki/Kabinett_{}'
+        URL = URL_CABINET
         choice = input('Which cabinet?')
         while True:
             if choice in CABINETS:
@@ -153,8 +165,12 @@ class Menu(Loader, Reader):
                 return False
 
     def cabinets_nrw(self) -> bool:
-        URL = 'https://de.wikipedia.org/wiki/Landesregierung_von_Nordrhein-Westfalen'
-        if self.wiki_file_size_change(URL):
+        from scraper_lib._page_cache import _get_page_cache
+
+        URL = URL_CABINETS
+        if _get_page_cache().meta(URL) is None:
+            print('Wiki entry not on disk yet.')
+        elif self.wiki_file_size_change(URL):
             print('Wiki entry has changed.')
         else:
             print('Wiki entry is same as on disk.')
@@ -171,7 +187,7 @@ class Menu(Loader, Reader):
 
     def mdls_of_term(self) -> bool:
         term = self.choose_term()
-        URL = f'https://de.wikipedia.org/wiki/Liste_der_Mitglieder_des_Landtages_Nordrhein-Westfalen_({term}._Wahlperiode)'
+        URL = URL_TERM.format(term)
         print(URL)
         if self.show_file_content(URL):
             return True
@@ -184,39 +200,27 @@ class Menu(Loader, Reader):
                 return False
 
     def wiki_file_size_change(self, URL) -> bool:
-        import os
-        file_name_disk = URL.split('/')[-1] + '.soup'
-        file_loc_disk = self.DIR_LOC + file_name_disk
-        if os.path.exists(self.DIR_LOC):
-            if os.path.isfile(file_loc_disk):
-                size_on_disk = os.path.getsize(file_loc_disk)
-
-        import requests
-        import random
-        from bs4 import BeautifulSoup
-        from data.sourceBox import headers
-
-        ix = random.randint(1, 6)
-        file_name_wiki = 'bsObj.tmp'
-        file_loc_wiki = './data/soup_objects/' + file_name_wiki
-
-        try:
-            req = requests.get(URL, headers[ix])
-        except requests.exceptions.ConnectionError as e:
-            print(e)
-            print('ConnectionError, no download')
-            return False
-
-        bsObj = BeautifulSoup(req.text, 'lxml')
-        with open(file_loc_wiki, 'w', encoding='utf-8') as fout:
-            fout.write(str(bsObj))
-
-        size_wiki_tmp = os.path.getsize(file_loc_wiki)
-
-        if size_wiki_tmp != size_on_disk:
-            return True
-        else:
-            return False
+        '''
+        Returns True if the wiki page has a newer revision than the copy on
+        disk (or there is no copy on disk). Only the revision id is fetched.
+        '''
+        from scraper_lib._revision_check import _stale_pages
+        return URL in _stale_pages([URL])
+
+    def stale_pages(self) -> list:
+        '''
+        Checks all cabinet pages and lists of MdLs in one pass and prints
+        those that have changed since they were downloaded.
+        '''
+        from scraper_lib._revision_check import _stale_pages
+        URLs = [URL_CABINETS]
+        URLs.extend(URL_CABINET.format(cabinet) for cabinet in CABINETS)
+        URLs.extend(URL_TERM.format(term) for term in TERMS)
+        stale = _stale_pages(URLs)
+        for URL in stale:
+            print(URL)
+        print(f'{len(stale)} of {len(URLs)} pages have changed.')
+        return stale
 
 
 if __name__ == '__main__':